@@ -1,8 +1,20 @@
 from django.urls import path
 
+from api.v1.views.async_uploader import AsyncFileUploadView
+from api.v1.views.chunked_uploads import UploadSessionCompleteView, UploadSessionCreateView, UploadSessionView
+from api.v1.views.error_reports import UploadReportView
+from api.v1.views.upload_jobs import UploadJobView
 from api.v1.views.uploader import FileUploadView
+from api.v1.views.users import UserListView
 
 urlpatterns = [
     # Define your URL patterns here
     path('upload-file/', FileUploadView.as_view(), name='upload-file'),
+    path('async/upload-file/', AsyncFileUploadView.as_view(), name='async-upload-file'),
+    path('upload-jobs/<uuid:job_id>/', UploadJobView.as_view(), name='upload-job'),
+    path('upload-reports/<uuid:report_id>/', UploadReportView.as_view(), name='upload-report'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-sessions'),
+    path('uploads/<uuid:upload_id>/', UploadSessionView.as_view(), name='upload-session'),
+    path('uploads/<uuid:upload_id>/complete/', UploadSessionCompleteView.as_view(), name='upload-session-complete'),
+    path('users/', UserListView.as_view(), name='users'),
 ]
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from rest_framework import serializers
+
+from core.validators import FileValidator
+from core.constants import MAX_RESUMABLE_FILE_SIZE, ALLOWED_EXTENSION
+
+
+class UploadSessionSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(
+        min_value=1,
+        help_text='Total size of the file in bytes.'
+    )
+    upsert = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Update name and age of users whose email already exists instead of skipping them.'
+    )
+
+    def validate(self, attrs):
+        """
+        Check the declared file against the same rules as a direct upload,
+        before any bytes are sent.
+
+        Raises:
+            ValidationError: if the extension is not allowed or the file is too large.
+        """
+        FileValidator(max_size=MAX_RESUMABLE_FILE_SIZE, allowed_extensions=ALLOWED_EXTENSION)(
+            SimpleNamespace(name=attrs['filename'], size=attrs['size'])
+        )
+        return attrs
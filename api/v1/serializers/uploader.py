@@ -1,10 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
-import pandas as pd
-import re
 
+from api.v1.services.importer import CsvReadError, REQUIRED_COLUMNS, import_csv, missing_columns, read_header
+from api.v1.services.prevalidation import prevalidate
+from api.v1.services.timing import UploadTimer
 from core.validators import FileValidator
 from core.constants import MAX_FILE_SIZE, ALLOWED_EXTENSION
-from models.models import User
 
 class FileUploadSerializer(serializers.Serializer):
     csv_file = serializers.FileField(
@@ -14,6 +15,16 @@ class FileUploadSerializer(serializers.Serializer):
             'required': 'Please upload a file.'
         }
     )
+    upsert = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Update name and age of users whose email already exists instead of skipping them.'
+    )
+    dry_run = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Validate the whole file and report what would be saved, without writing anything.'
+    )
     
     
     def validate(self, attrs):
@@ -21,11 +32,16 @@ class FileUploadSerializer(serializers.Serializer):
         """
         Validate the uploaded CSV file.
         
-        if the file is valid, it reads the CSV into a pandas DataFrame and checks for required columns.
-        It also prepares the DataFrame for further processing in the save() method.
+        Only the header row is read here to check for the required columns;
+        the rows themselves are streamed in chunks by the save() method.
+        Unless ``dry_run`` is set, the first rows and a random sample are
+        validated too (see prevalidation.prevalidate) and the upload is
+        rejected if more than PREVALIDATION_MAX_ERROR_RATE of them fail;
+        the sample's report is then left in ``self.prevalidation``.
 
         Raises:
-            serializers.ValidationError: if it is not a valid CSV file or missing required columns.
+            serializers.ValidationError: if it is not a valid CSV file, is missing required columns
+                or too many of the sampled rows are invalid.
 
         Returns:
             vaidation errors if any
@@ -33,75 +49,56 @@ class FileUploadSerializer(serializers.Serializer):
         
         file = attrs.get("csv_file")
         try:
-            df = pd.read_csv(file)
-        except Exception as e:
+            columns = read_header(file)
+        except CsvReadError as e:
             raise serializers.ValidationError(f"Error reading CSV file: {str(e)}")
 
-        required_columns = {'name', 'email', 'age'}
-        if not required_columns.issubset(set(df.columns)):
+        if missing_columns(columns):
             raise serializers.ValidationError(
-                f"CSV file must contain the following columns: {', '.join(required_columns)}"
+                f"CSV file must contain the following columns: {', '.join(REQUIRED_COLUMNS)}"
             )
 
-        attrs["dataframe"] = df  # pass df to save()
+        max_error_rate = settings.PREVALIDATION_MAX_ERROR_RATE
+        if max_error_rate is not None and not attrs.get("dry_run"):
+            timer = self.context.get("timer") or UploadTimer()
+            try:
+                with timer.stage("prevalidate"):
+                    report = prevalidate(
+                        file,
+                        head_rows=settings.PREVALIDATION_HEAD_ROWS,
+                        sample_rows=settings.PREVALIDATION_SAMPLE_ROWS,
+                    )
+            except CsvReadError as e:
+                raise serializers.ValidationError(f"Error reading CSV file: {str(e)}")
+            if report.rows >= settings.PREVALIDATION_MIN_ROWS and report.error_rate > max_error_rate:
+                self.prevalidation = report.as_dict(settings.PREVALIDATION_MAX_ERRORS)
+                raise serializers.ValidationError(
+                    f"{report.error_rate:.0%} of {report.rows} sampled rows are invalid "
+                    f"(at most {max_error_rate:.0%} allowed); the file was not imported."
+                )
+
         return attrs
     
     def save(self, **kwargs):
         """
-        Process the DataFrame, validate each row, and save valid records to the database.
+        Stream the CSV in chunks, validate all rows column-wise, and save valid records to the database.
         It collects errors for invalid rows and returns a summary of the operation.
+        An UploadTimer passed in the ``timer`` context entry gets the time spent per stage.
+        With ``dry_run`` nothing is written and the summary reports what would have been saved.
+
+        Raises:
+            serializers.ValidationError: if a later chunk of the file cannot be parsed.
         
         Returns:
-            dict: Summary of saved records, failed records, and errors."""
-        
-        df = self.validated_data.get("dataframe")
+            dict: Summary of saved, updated and conflicting records, failed records, skipped duplicates, and errors."""
         
-        errors = []
-        valid_instances = []
-        seen_emails = set()
-        
-        for index, row in df.iterrows():
-            row_errors = {}
-            name = row.get('name')
-            email = row.get('email')
-            age = row.get('age')
-            
-            # --- Name validation ---
-            if pd.isna(name) or not isinstance(name, str) or not name.strip():
-                row_errors['name'] = "Name must be a non-empty string."
-                
-            # ---- Email validation ---
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if pd.isna(email) or not re.match(email_pattern, str(email)):
-                row_errors['email'] = "Invalid email format."
-            elif email in seen_emails or User.objects.filter(email=email).exists():
-                continue # Skip duplicate emails without errors
-            else:
-                seen_emails.add(email)
-            
-            # --- Age validation ---
-            if pd.isna(age):
-                row_errors['age'] = 'Age is required.'
-            else:
-                try:
-                    age = int(age)
-                    if age <= 0 or age > 120:
-                        row_errors['age'] = 'Age must be between 1 and 120.'
-                except ValueError:
-                    row_errors['age'] = 'Age must be an integer.'
-            
-            if row_errors:
-                errors.append({"row": index + 2, "errors": row_errors})  # +2 for header and 0-index
-            else:
-                valid_instances.append(User(name=name.strip(), email=email.strip(), age=int(age)))
-
-        # bulk create after validation finishes
-        if valid_instances:
-            User.objects.bulk_create(valid_instances, ignore_conflicts=True)
-            
-        result = {
-            'saved_records': len(valid_instances),
-            'failed_records': len(errors),
-            'errors': errors
-        }
-        return result
\ No newline at end of file
+        file = self.validated_data.get("csv_file")
+        try:
+            return import_csv(
+                file,
+                upsert=self.validated_data.get("upsert", False),
+                timer=self.context.get("timer"),
+                dry_run=self.validated_data.get("dry_run", False),
+            )
+        except CsvReadError as e:
+            raise serializers.ValidationError(f"Error reading CSV file: {str(e)}")
@@ -0,0 +1,51 @@
+from rest_framework import serializers
+
+from api.v1.services.users import USER_FIELDS
+from models.models import User
+
+
+class UserQuerySerializer(serializers.Serializer):
+    email = serializers.EmailField(
+        required=False,
+        help_text='Only the user with exactly this email.'
+    )
+    age_min = serializers.IntegerField(required=False, min_value=0)
+    age_max = serializers.IntegerField(required=False, min_value=0)
+    fields = serializers.CharField(
+        required=False,
+        help_text='Comma separated fields to return, out of id, name, email and age (default: all).'
+    )
+
+    def validate_fields(self, value):
+        fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+        unknown = [field for field in fields if field not in USER_FIELDS]
+        if unknown or not fields:
+            raise serializers.ValidationError(f"Fields must be some of: {', '.join(USER_FIELDS)}.")
+        return fields
+
+    def validate(self, attrs):
+        """
+        Raises:
+            serializers.ValidationError: if age_min is greater than age_max.
+        """
+        if attrs.get('age_min') is not None and attrs.get('age_max') is not None \
+                and attrs['age_min'] > attrs['age_max']:
+            raise serializers.ValidationError('age_min must not be greater than age_max.')
+        attrs.setdefault('fields', USER_FIELDS)
+        return attrs
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """
+    Serializes the ``fields`` passed in (default: all), so the deferred
+    fields of an ``.only()`` queryset are never loaded.
+    """
+
+    class Meta:
+        model = User
+        fields = USER_FIELDS
+
+    def __init__(self, *args, fields=USER_FIELDS, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
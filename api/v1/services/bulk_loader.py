@@ -0,0 +1,159 @@
+import csv
+import io
+
+from django.db import connections
+
+from api.v1.services.duplicates import find_existing_emails
+from core.constants import BULK_INSERT_BATCH_SIZE
+from models.models import User
+
+STAGE_TABLE = 'user_import_stage'
+
+
+class BulkLoadResult:
+    """
+    What the database actually did with a batch of rows.
+
+    inserted: new rows written.
+    updated: existing rows overwritten (upsert mode only).
+    conflicts: rows dropped because their email already existed.
+    """
+
+    def __init__(self, inserted=0, updated=0, conflicts=0):
+        self.inserted = inserted
+        self.updated = updated
+        self.conflicts = conflicts
+
+
+def _columns(connection):
+    quote = connection.ops.quote_name
+    table = quote(User._meta.db_table)
+    name, email, age = (quote(User._meta.get_field(field).column) for field in ('name', 'email', 'age'))
+    return table, name, email, age
+
+
+def _conflict_clause(connection, upsert):
+    _, name, email, age = _columns(connection)
+    if upsert:
+        return f"ON CONFLICT ({email}) DO UPDATE SET {name} = excluded.{name}, {age} = excluded.{age}"
+    return f"ON CONFLICT ({email}) DO NOTHING"
+
+
+def _rows_per_statement(connection):
+    max_params = connection.features.max_query_params
+    if max_params:
+        return max(1, min(BULK_INSERT_BATCH_SIZE, max_params // 3))
+    return BULK_INSERT_BATCH_SIZE
+
+
+def _load_multirow(connection, names, emails, ages, upsert, using):
+    """
+    Batched multi-row INSERT ... ON CONFLICT, used on SQLite.
+    """
+    table, name, email, age = _columns(connection)
+    conflict = _conflict_clause(connection, upsert)
+    existing = find_existing_emails(emails, using=using) if upsert else ()
+    size = _rows_per_statement(connection)
+    written = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(emails), size):
+            batch = list(zip(names[start:start + size], emails[start:start + size], ages[start:start + size]))
+            values = ', '.join(['(%s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} ({name}, {email}, {age}) VALUES {values} {conflict}",
+                [value for row in batch for value in row],
+            )
+            written += cursor.rowcount
+    if upsert:
+        updated = len(existing)
+        return BulkLoadResult(inserted=written - updated, updated=updated)
+    return BulkLoadResult(inserted=written, conflicts=len(emails) - written)
+
+
+def _copy_to_stage(cursor, names, emails, ages):
+    raw = cursor.cursor
+    columns = 'name, email, age'
+    if hasattr(raw, 'copy'):  # psycopg 3
+        with raw.copy(f"COPY {STAGE_TABLE} ({columns}) FROM STDIN") as copy:
+            for row in zip(names, emails, ages):
+                copy.write_row(row)
+    else:  # psycopg2
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(zip(names, emails, ages))
+        buffer.seek(0)
+        raw.copy_expert(f"COPY {STAGE_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _load_copy(connection, names, emails, ages, upsert):
+    """
+    COPY into a session temp table, then one INSERT ... SELECT ... ON CONFLICT, used on PostgreSQL.
+    """
+    table, name, email, age = _columns(connection)
+    conflict = _conflict_clause(connection, upsert)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} "
+            f"(name varchar(100), email varchar(254), age integer)"
+        )
+        cursor.execute(f"TRUNCATE {STAGE_TABLE}")
+        _copy_to_stage(cursor, names, emails, ages)
+        insert = (
+            f"INSERT INTO {table} ({name}, {email}, {age}) "
+            f"SELECT name, email, age FROM {STAGE_TABLE} {conflict}"
+        )
+        if upsert:
+            cursor.execute(f"{insert} RETURNING (xmax = 0)")
+            flags = [inserted for (inserted,) in cursor.fetchall()]
+            return BulkLoadResult(inserted=sum(flags), updated=len(flags) - sum(flags))
+        cursor.execute(insert)
+        return BulkLoadResult(inserted=cursor.rowcount, conflicts=len(emails) - cursor.rowcount)
+
+
+def _load_orm(names, emails, ages, upsert, using):
+    """
+    Fallback for other databases; counts are what was handed to the database.
+    """
+    instances = [User(name=n, email=e, age=a) for n, e, a in zip(names, emails, ages)]
+    if upsert:
+        existing = find_existing_emails(emails, using=using)
+        User.objects.using(using).bulk_create(
+            instances, batch_size=BULK_INSERT_BATCH_SIZE,
+            update_conflicts=True, unique_fields=['email'], update_fields=['name', 'age'],
+        )
+        return BulkLoadResult(inserted=len(instances) - len(existing), updated=len(existing))
+    User.objects.using(using).bulk_create(instances, batch_size=BULK_INSERT_BATCH_SIZE, ignore_conflicts=True)
+    return BulkLoadResult(inserted=len(instances))
+
+
+def load_users(names, emails, ages, upsert=False, using='default'):
+    """
+    Write validated column arrays straight to the users table.
+
+    No model instances are built on SQLite or PostgreSQL: SQLite gets
+    batched multi-row INSERT ... ON CONFLICT statements, PostgreSQL a COPY
+    into a temp table followed by one INSERT ... SELECT. Rows whose email
+    already exists are dropped and counted as conflicts, or with ``upsert``
+    have their name and age updated.
+
+    Returns:
+        BulkLoadResult
+    """
+    if not emails:
+        return BulkLoadResult()
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        return _load_multirow(connection, names, emails, ages, upsert, using)
+    if connection.vendor == 'postgresql':
+        return _load_copy(connection, names, emails, ages, upsert)
+    return _load_orm(names, emails, ages, upsert, using)
+
+
+def count_users(emails, upsert=False, using='default'):
+    """
+    What load_users would do with ``emails``, without writing anything.
+
+    Returns:
+        BulkLoadResult
+    """
+    updated = len(find_existing_emails(emails, using=using)) if upsert else 0
+    return BulkLoadResult(inserted=len(emails) - updated, updated=updated)
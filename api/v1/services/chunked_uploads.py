@@ -0,0 +1,203 @@
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ChunkError(Exception):
+    """
+    A chunk that cannot be appended; ``offset`` is where the client should resume.
+    """
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+class SessionBusy(Exception):
+    """
+    Another chunk for the same upload is being written.
+    """
+
+
+class TooManySessions(Exception):
+    """
+    UPLOAD_SESSION_MAX_OPEN unfinished uploads already have a part file.
+    """
+
+
+def _session_key(upload_id):
+    return f'upload-session-{upload_id}'
+
+
+def _lock_key(upload_id):
+    return f'upload-session-lock-{upload_id}'
+
+
+def session_path(upload_id):
+    return Path(settings.UPLOAD_SESSION_DIR) / f'{upload_id}.part'
+
+
+def _sweep(directory):
+    """
+    Remove part files that got no chunk for UPLOAD_SESSION_TTL; their
+    sessions have expired by then.
+
+    Returns:
+        int: number of part files left
+    """
+    cutoff = time.time() - settings.UPLOAD_SESSION_TTL
+    left = 0
+    for path in directory.glob('*.part'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+            else:
+                left += 1
+        except OSError:
+            pass
+    return left
+
+
+def create_session(filename, size, upsert=False):
+    """
+    Start a resumable upload with an empty part file, removing the part
+    files of abandoned uploads first.
+
+    Raises:
+        TooManySessions: if UPLOAD_SESSION_MAX_OPEN uploads are unfinished.
+
+    Returns:
+        dict: the session state
+    """
+    directory = Path(settings.UPLOAD_SESSION_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    if _sweep(directory) >= settings.UPLOAD_SESSION_MAX_OPEN:
+        raise TooManySessions()
+    upload_id = str(uuid.uuid4())
+    path = session_path(upload_id)
+    path.touch()
+    session = {'upload_id': upload_id, 'filename': filename, 'size': size, 'upsert': upsert}
+    cache.set(_session_key(upload_id), session, timeout=settings.UPLOAD_SESSION_TTL)
+    return {**session, 'offset': 0}
+
+
+def get_session(upload_id):
+    """
+    Returns: dict with the session state and the bytes received so far as
+    ``offset``, or None if the session is unknown or expired.
+    """
+    session = cache.get(_session_key(upload_id))
+    if session is None:
+        return None
+    try:
+        offset = os.path.getsize(session_path(upload_id))
+    except OSError:
+        return None
+    return {**session, 'offset': offset}
+
+
+def parse_content_range(header, size):
+    """
+    Parse ``Content-Range: bytes <first>-<last>/<total>``.
+
+    Raises:
+        ValueError: if the header is missing, malformed or disagrees with the declared size.
+
+    Returns:
+        tuple: (first, last) byte positions, inclusive
+    """
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise ValueError("Content-Range header must look like 'bytes <first>-<last>/<total>'.")
+    first, last, total = int(match[1]), int(match[2]), match[3]
+    if last < first:
+        raise ValueError("Content-Range end is before its start.")
+    if total != '*' and int(total) != size:
+        raise ValueError(f"Content-Range total {total} does not match the upload size {size}.")
+    if last >= size:
+        raise ValueError(f"Content-Range ends past the upload size {size}.")
+    return first, last
+
+
+def write_chunk(upload_id, stream, first, last):
+    """
+    Append bytes ``first``..``last`` read from ``stream`` to the part file.
+
+    Chunks must arrive in order. Bytes the server already has are read and
+    dropped, so re-sending a chunk after a lost response is harmless; a gap
+    raises ChunkError with the offset to resume from. The part file's size
+    is the only record of progress, so nothing is lost if a worker dies
+    mid-chunk.
+
+    Raises:
+        SessionBusy: if another request is writing to this upload.
+        ChunkError: if the chunk starts past the received bytes or the body is short.
+
+    Returns:
+        int: the new offset
+    """
+    lock = _lock_key(upload_id)
+    if not cache.add(lock, 1, timeout=settings.UPLOAD_SESSION_LOCK_TIMEOUT):
+        raise SessionBusy(upload_id)
+    try:
+        path = session_path(upload_id)
+        offset = os.path.getsize(path)
+        if first > offset:
+            raise ChunkError(f"Chunk starts at byte {first} but only {offset} bytes were received.", offset)
+        skip = offset - first
+        remaining = last - first + 1
+        with open(path, 'ab') as destination:
+            while remaining:
+                data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                if skip >= len(data):
+                    skip -= len(data)
+                    continue
+                destination.write(data[skip:])
+                skip = 0
+        offset = os.path.getsize(path)
+        if remaining:
+            raise ChunkError("Request body is shorter than its Content-Range.", offset)
+        return offset
+    finally:
+        cache.delete(lock)
+
+
+def claim_session(upload_id):
+    """
+    End the session so its upload can be completed, atomically: of
+    concurrent callers only one gets True, and chunks can no longer be
+    written. The part file is left for the caller.
+
+    Raises:
+        SessionBusy: if a chunk is being written.
+
+    Returns:
+        bool: whether this caller claimed the session
+    """
+    lock = _lock_key(upload_id)
+    if not cache.add(lock, 1, timeout=settings.UPLOAD_SESSION_LOCK_TIMEOUT):
+        raise SessionBusy(upload_id)
+    try:
+        return bool(cache.delete(_session_key(upload_id)))
+    finally:
+        cache.delete(lock)
+
+
+def delete_session(upload_id, remove_file=True):
+    cache.delete(_session_key(upload_id))
+    if remove_file:
+        try:
+            os.remove(session_path(upload_id))
+        except OSError:
+            pass
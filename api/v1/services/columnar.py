@@ -0,0 +1,160 @@
+import codecs
+import json
+import os
+
+import pandas as pd
+
+from api.v1.services.spooled import memory_bytes, spooled_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for Parquet and Arrow uploads
+    pa = None
+
+# suffix -> input format, for files that are not CSV
+FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+
+class ColumnarReadError(Exception):
+    """Raised when a Parquet, Arrow or NDJSON upload cannot be read."""
+
+
+def input_format(name):
+    """
+    Returns: 'parquet', 'arrow', 'ndjson', or 'csv' for anything else.
+    """
+    lowered = name.lower()
+    for suffix, fmt in FORMATS.items():
+        if lowered.endswith(suffix):
+            return fmt
+    return 'csv'
+
+
+def _require_pyarrow(fmt):
+    if pa is None:
+        raise ColumnarReadError(f"{fmt.capitalize()} uploads need the pyarrow package.")
+
+
+def _source(file):
+    """
+    Memory-map files that are on disk so Arrow reads them without copying;
+    uploads Django kept in memory are wrapped in place.
+    """
+    path = spooled_path(file)
+    if path is not None:
+        return pa.memory_map(path)
+    data = memory_bytes(file)
+    if data is not None:
+        return pa.BufferReader(data)
+    file.seek(0)
+    return pa.PythonFile(file, mode='r')
+
+
+def _open_arrow(source):
+    """
+    Arrow IPC comes as a random access file (.arrow / Feather v2) or as a
+    stream; try the file layout first.
+    """
+    try:
+        reader = pa.ipc.open_file(source)
+        return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        source.seek(0)
+        reader = pa.ipc.open_stream(source)
+        return reader.schema, iter(reader)
+
+
+def read_columns(file, fmt):
+    """
+    Returns: the column names of a Parquet / Arrow file, or the keys of the
+    first NDJSON record, without reading any rows.
+    """
+    if fmt == 'ndjson':
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as handle:
+                line = handle.readline()
+        else:
+            file.seek(0)
+            line = file.readline()
+            file.seek(0)
+        try:
+            record = json.loads(line or b'{}')
+        except ValueError as e:
+            raise ColumnarReadError(str(e)) from e
+        if not isinstance(record, dict):
+            raise ColumnarReadError("NDJSON records must be objects.")
+        return list(record)
+
+    _require_pyarrow(fmt)
+    try:
+        with _source(file) as source:
+            if fmt == 'parquet':
+                return pq.ParquetFile(source).schema_arrow.names
+            schema, _ = _open_arrow(source)
+            return schema.names
+    except (pa.ArrowException, OSError) as e:
+        raise ColumnarReadError(str(e)) from e
+
+
+def _project(batch, columns):
+    """
+    Keep only ``columns`` of a record batch, adding missing ones as nulls.
+    """
+    present = set(batch.schema.names)
+    arrays = [
+        batch.column(column) if column in present else pa.nulls(batch.num_rows)
+        for column in columns
+    ]
+    return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+
+
+def iter_frames(file, fmt, columns, chunk_size):
+    """
+    Yield the upload as DataFrames of at most ``chunk_size`` rows holding
+    only ``columns``.
+
+    Parquet and Arrow are read batch by batch with their types intact and
+    only the projected columns are decoded; NDJSON is parsed by pandas in
+    line chunks. The index keeps counting across chunks, as for CSV.
+    """
+    start = 0
+    if fmt == 'ndjson':
+        if not isinstance(file, (str, os.PathLike)):
+            file.seek(0)
+            file = codecs.getreader('utf-8')(file)
+        try:
+            reader = pd.read_json(file, lines=True, chunksize=chunk_size, dtype=False)
+            with reader:
+                for chunk in reader:
+                    chunk = chunk.reindex(columns=list(columns))
+                    chunk.index = pd.RangeIndex(start, start + len(chunk))
+                    start += len(chunk)
+                    yield chunk
+        except ValueError as e:
+            raise ColumnarReadError(str(e)) from e
+        return
+
+    _require_pyarrow(fmt)
+    try:
+        with _source(file) as source:
+            if fmt == 'parquet':
+                parquet = pq.ParquetFile(source)
+                wanted = [column for column in columns if column in parquet.schema_arrow.names]
+                batches = parquet.iter_batches(batch_size=chunk_size, columns=wanted)
+            else:
+                _, batches = _open_arrow(source)
+            for batch in batches:
+                for offset in range(0, batch.num_rows, chunk_size):
+                    chunk = _project(batch.slice(offset, chunk_size), columns).to_pandas()
+                    chunk.index = pd.RangeIndex(start, start + len(chunk))
+                    start += len(chunk)
+                    yield chunk
+    except (pa.ArrowException, OSError) as e:
+        raise ColumnarReadError(str(e)) from e
@@ -0,0 +1,139 @@
+import bz2
+import gzip
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+
+from django.template.defaultfilters import filesizeformat
+
+from core.constants import MAX_DECOMPRESSED_SIZE
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .csv.zst uploads
+    zstandard = None
+
+# compound suffix -> compression, longest first so 'csv.gz' wins over 'csv'
+SUFFIXES = (
+    ('.csv.gz', 'gzip'),
+    ('.csv.bz2', 'bz2'),
+    ('.csv.zst', 'zstd'),
+    ('.zip', 'zip'),
+    ('.csv', None),
+    # columnar formats, read by api.v1.services.columnar
+    ('.parquet', None),
+    ('.arrow', None),
+    ('.feather', None),
+    ('.ndjson', None),
+    ('.jsonl', None),
+)
+
+
+class DecompressionError(Exception):
+    """Raised when a compressed upload cannot be opened or is too large once decompressed."""
+
+
+def upload_name(file):
+    return os.fspath(file) if isinstance(file, (str, os.PathLike)) else getattr(file, 'name', '') or ''
+
+
+def upload_suffix(name):
+    """
+    Returns: the recognised suffix of ``name`` ('.csv', '.csv.gz', ...), '.csv' if none matches.
+    """
+    lowered = name.lower()
+    for suffix, _ in SUFFIXES:
+        if lowered.endswith(suffix):
+            return suffix
+    return '.csv'
+
+
+def compression_for(name):
+    return dict(SUFFIXES)[upload_suffix(name)]
+
+
+class LimitedReader(io.RawIOBase):
+    """
+    Pass bytes through from ``stream`` until more than ``limit`` have been read.
+    """
+
+    def __init__(self, stream, limit):
+        self._stream = stream
+        self._limit = limit
+        self._read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        self._read += len(data)
+        if self._read > self._limit:
+            raise DecompressionError(
+                f"Decompressed file is larger than the {filesizeformat(self._limit)} limit."
+            )
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            super().close()
+
+
+def _zip_member(archive):
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    if len(members) != 1:
+        raise DecompressionError(f"ZIP upload must contain exactly one file, found {len(members)}.")
+    member = members[0]
+    if not member.filename.lower().endswith('.csv'):
+        raise DecompressionError(f"ZIP upload must contain a .csv file, found {member.filename}.")
+    if member.file_size > MAX_DECOMPRESSED_SIZE:
+        raise DecompressionError(
+            f"Decompressed file is larger than the {filesizeformat(MAX_DECOMPRESSED_SIZE)} limit."
+        )
+    return archive.open(member)
+
+
+def _decompressor(raw, compression):
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if compression == 'bz2':
+        return bz2.BZ2File(raw, mode='rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise DecompressionError(".csv.zst uploads need the zstandard package.")
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+    try:
+        return _zip_member(zipfile.ZipFile(raw))
+    except zipfile.BadZipFile as e:
+        raise DecompressionError(str(e)) from e
+
+
+@contextmanager
+def open_csv(file, name=None):
+    """
+    Open ``file`` for the CSV parser, decompressing it on the fly.
+
+    ``file`` is an uploaded file or a path; the compression is picked from
+    ``name`` (default: the file's own name). Plain CSVs are handed back
+    unchanged. Compressed ones come back as a buffered stream that
+    decompresses as the parser reads and raises DecompressionError once
+    more than MAX_DECOMPRESSED_SIZE bytes come out, so neither the whole
+    file nor a zip bomb ever lands in memory.
+    """
+    compression = compression_for(name or upload_name(file))
+    if compression is None:
+        yield file
+        return
+    is_path = isinstance(file, (str, os.PathLike))
+    raw = open(file, 'rb') if is_path else file
+    try:
+        stream = io.BufferedReader(LimitedReader(_decompressor(raw, compression), MAX_DECOMPRESSED_SIZE))
+        with stream:
+            yield stream
+    finally:
+        if is_path:
+            raw.close()
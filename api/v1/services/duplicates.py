@@ -0,0 +1,34 @@
+from django.db import connections
+
+from core.constants import EMAIL_LOOKUP_BATCH_SIZE
+from models.models import User
+
+
+def lookup_batch_size(using='default', batch_size=None):
+    """
+    Clamp ``batch_size`` to the number of bound parameters the database accepts
+    in a single query (999 on older SQLite builds).
+    """
+    batch_size = batch_size or EMAIL_LOOKUP_BATCH_SIZE
+    max_params = connections[using].features.max_query_params
+    if max_params:
+        return max(1, min(batch_size, max_params))
+    return batch_size
+
+
+def find_existing_emails(emails, using='default', batch_size=None):
+    """
+    Look up which of ``emails`` already exist, one ``email__in`` query per batch.
+
+    Returns:
+        set: emails that are already stored in the database
+    """
+    emails = list(dict.fromkeys(emails))
+    size = lookup_batch_size(using, batch_size)
+    existing = set()
+    for start in range(0, len(emails), size):
+        batch = emails[start:start + size]
+        existing.update(
+            User.objects.using(using).filter(email__in=batch).values_list('email', flat=True)
+        )
+    return existing
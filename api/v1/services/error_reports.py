@@ -0,0 +1,186 @@
+import csv
+import io
+import os
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.renderers import dumps, loads
+
+CSV_FIELDS = ('row', 'name', 'email', 'age')
+
+
+def error_keys(error):
+    """
+    Returns: one "field: message" key per failed field of a row error, for counting by type.
+    """
+    return [f"{field}: {message}" for field, message in error['errors'].items()]
+
+
+def _report_key(report_id):
+    return f'upload-report-{report_id}'
+
+
+def report_path(report_id):
+    return Path(settings.UPLOAD_REPORT_DIR) / f'{report_id}.ndjson'
+
+
+def _sweep(directory):
+    """
+    Remove reports older than UPLOAD_REPORT_TTL; their cache entries are gone by then.
+    """
+    cutoff = time.time() - settings.UPLOAD_REPORT_TTL
+    for path in directory.glob('*.ndjson'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+class ErrorReport:
+    """
+    Row errors of one import, counted by type.
+
+    The first ``inline`` errors are kept in memory for the response. Once
+    there are more, all of them go to an NDJSON file in UPLOAD_REPORT_DIR,
+    one row error per line, and only the counts stay in memory. The byte
+    offset of every UPLOAD_REPORT_PAGE_SIZE-th line is recorded so a page
+    can be read without scanning the lines before it.
+    """
+
+    def __init__(self, inline=None, page_size=None):
+        self.inline = settings.UPLOAD_INLINE_ERRORS if inline is None else inline
+        self.page_size = page_size or settings.UPLOAD_REPORT_PAGE_SIZE
+        self.errors = []
+        self.total = 0
+        self.counts = Counter()
+        self.report_id = None
+        self._file = None
+        self._pages = []
+        self._written = 0
+
+    def _open(self):
+        directory = Path(settings.UPLOAD_REPORT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        _sweep(directory)
+        self.report_id = str(uuid.uuid4())
+        self._file = open(report_path(self.report_id), 'wb')
+        buffered, self.errors = self.errors, self.errors[:self.inline]
+        self._write(buffered)
+
+    def _write(self, errors):
+        for error in errors:
+            if self._written % self.page_size == 0:
+                self._pages.append(self._file.tell())
+            self._file.write(dumps(error) + b'\n')
+            self._written += 1
+
+    def extend(self, errors):
+        self.total += len(errors)
+        for error in errors:
+            self.counts.update(error_keys(error))
+        if self._file is not None:
+            self._write(errors)
+            return
+        self.errors.extend(errors)
+        if len(self.errors) > self.inline:
+            self._open()
+
+    def close(self):
+        """
+        Finish the file, if one was written, and make it available for
+        UPLOAD_REPORT_TTL seconds.
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        cache.set(_report_key(self.report_id), {
+            'report_id': self.report_id,
+            'total': self.total,
+            'page_size': self.page_size,
+            'pages': self._pages,
+            'error_counts': dict(self.counts.most_common()),
+        }, timeout=settings.UPLOAD_REPORT_TTL)
+
+    def discard(self):
+        """
+        Drop the file of an import that failed.
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(report_path(self.report_id))
+        except OSError:
+            pass
+
+
+def get_report(report_id):
+    """
+    Returns: dict describing a stored report, or None if it is unknown or expired.
+    """
+    report = cache.get(_report_key(report_id))
+    if report is None or not report_path(report_id).exists():
+        return None
+    return report
+
+
+def page_range(report, page=None):
+    """
+    Returns: (start, end) byte offsets of ``page`` (1-based) of ``report``,
+    the whole file when ``page`` is None, or None if there is no such page.
+    """
+    pages = report['pages']
+    if page is None:
+        return 0, None
+    if not 1 <= page <= len(pages):
+        return None
+    end = pages[page] if page < len(pages) else None
+    return pages[page - 1], end
+
+
+def iter_ndjson(report_id, start, end, block_size=64 * 1024):
+    """
+    Yield the bytes of the report file between ``start`` and ``end`` (None
+    for the end of the file) in blocks, without decoding them.
+    """
+    with open(report_path(report_id), 'rb') as handle:
+        handle.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            block = handle.read(block_size if remaining is None else min(block_size, remaining))
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+            yield block
+
+
+def iter_csv(report_id, start, end):
+    """
+    Yield the same lines as iter_ndjson as CSV rows of row number and the
+    message for each failing field, after a header row.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    with open(report_path(report_id), 'rb') as handle:
+        handle.seek(start)
+        for line in handle:
+            if end is not None and start >= end:
+                break
+            start += len(line)
+            error = loads(line)
+            writer.writerow([error['row']] + [error['errors'].get(field, '') for field in CSV_FIELDS[1:]])
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,111 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadhandler import FileUploadHandler
+
+from api.v1.services.spooled import sha256
+from core.middlewares.rate_limit_policies import api_key_checker, client_ip
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an Idempotency-Key comes back with a different upload."""
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Hash every uploaded file while Django streams it in.
+
+    Chunks are passed on untouched to the next handler; the hex digest of
+    each file is left in ``request.upload_digests`` keyed by field name, so
+    the content fingerprint costs no extra read of the file.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self._hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_digests'):
+            self.request.upload_digests = {}
+        self.request.upload_digests[self.field_name] = self._hash.hexdigest()
+        return None
+
+
+def upload_digest(request, field_name, upload):
+    """
+    Return the sha256 of ``upload``, from the upload handler when it ran,
+    otherwise by hashing the file once (see spooled.sha256).
+    """
+    digest = getattr(request, 'upload_digests', {}).get(field_name)
+    if digest is None:
+        digest = sha256(upload)
+    return digest
+
+
+def client_scope(request):
+    """
+    Who cached upload results belong to: the authenticated user, an
+    X-Api-Key accepted by RATE_LIMIT_API_KEYS, or else the client IP.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user-{user.pk}'
+    api_key = request.META.get('HTTP_X_API_KEY')
+    if api_key and api_key_checker(settings.RATE_LIMIT_API_KEYS)(api_key):
+        return 'key-' + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return f'ip-{client_ip(request)}'
+
+
+def upload_fingerprint(digest, **options):
+    """
+    Returns: str identifying the content and processing options of an upload.
+    """
+    flags = ','.join(f'{name}={int(bool(value))}' for name, value in sorted(options.items()))
+    return f'{digest}-{flags}'
+
+
+def result_cache_keys(client, fingerprint, idempotency_key=None):
+    """
+    Cache keys for an upload of ``client`` (see client_scope): one for its
+    fingerprint, plus one for the client's Idempotency-Key if it sent one.
+    Clients never see each other's results.
+    """
+    scope = hashlib.sha256(client.encode()).hexdigest()[:16]
+    keys = [f'upload-result-{scope}-{fingerprint}']
+    if idempotency_key:
+        keys.insert(0, f'upload-idempotency-{scope}-' + hashlib.sha256(idempotency_key.encode()).hexdigest())
+    return keys
+
+
+def get_cached_result(keys, fingerprint):
+    """
+    Raises:
+        IdempotencyKeyReused: if the Idempotency-Key was used for an upload
+            with another fingerprint.
+
+    Returns: (status, body) of an earlier identical upload, or None.
+    """
+    if not settings.UPLOAD_RESULT_CACHE_TTL:
+        return None
+    for key in keys:
+        cached = cache.get(key)
+        if cached is not None:
+            if cached['fingerprint'] != fingerprint:
+                raise IdempotencyKeyReused(
+                    'This Idempotency-Key was already used for a different file or options.'
+                )
+            return cached['status'], cached['body']
+    return None
+
+
+def store_result(keys, fingerprint, status, body):
+    if settings.UPLOAD_RESULT_CACHE_TTL:
+        cache.set_many(
+            {key: {'fingerprint': fingerprint, 'status': status, 'body': body} for key in keys},
+            timeout=settings.UPLOAD_RESULT_CACHE_TTL,
+        )
@@ -0,0 +1,242 @@
+from django.db import transaction
+from django.urls import reverse
+import pandas as pd
+
+from api.v1.services import columnar
+from api.v1.services.bulk_loader import count_users, load_users
+from api.v1.services.compression import open_csv, upload_name
+from api.v1.services.duplicates import find_existing_emails
+from api.v1.services.error_reports import ErrorReport
+from api.v1.services.parallel import check_chunk
+from api.v1.services.parsing import read_csv_chunks
+from api.v1.services.spooled import parse_source
+from api.v1.services.timing import UploadTimer
+from api.v1.services.users import invalidate_user_pages
+from api.v1.services.validation import validate_dataframe
+from core.constants import CSV_CHUNK_SIZE
+from core.metrics import registry
+
+REQUIRED_COLUMNS = ('name', 'email', 'age')
+
+UPLOAD_ROWS = registry.counter(
+    'upload_rows', 'Rows of committed imports, by outcome.', ('result',)
+)
+UPLOAD_SIZE_BYTES = registry.histogram(
+    'upload_size_bytes', 'Size of accepted uploads as sent, by how they were uploaded.', ('source',),
+    buckets=(1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2, 1024 ** 3, 10 * 1024 ** 3),
+)
+
+
+class CsvReadError(Exception):
+    """Raised when the upload cannot be parsed as CSV."""
+
+
+class ImportSummary:
+    """
+    Running totals of an import, merged chunk by chunk.
+
+    Row errors go to an ErrorReport: only the first UPLOAD_INLINE_ERRORS
+    are returned inline, the full list is written to a report file.
+    """
+
+    def __init__(self):
+        self.saved_records = 0
+        self.updated_records = 0
+        self.conflicting_records = 0
+        self.skipped_duplicates = 0
+        self.report = ErrorReport()
+
+    @property
+    def errors(self):
+        return self.report.errors
+
+    @property
+    def failed_records(self):
+        return self.report.total
+
+    def add(self, outcome, loaded):
+        self.saved_records += loaded.inserted + loaded.updated
+        self.updated_records += loaded.updated
+        self.conflicting_records += loaded.conflicts
+        self.skipped_duplicates += outcome.duplicates
+        self.report.extend(outcome.errors)
+
+    def as_dict(self):
+        summary = {
+            'saved_records': self.saved_records,
+            'updated_records': self.updated_records,
+            'conflicting_records': self.conflicting_records,
+            'failed_records': self.failed_records,
+            'skipped_duplicates': self.skipped_duplicates,
+            'errors': self.errors,
+            'error_counts': dict(self.report.counts.most_common()),
+        }
+        if self.report.report_id is not None:
+            summary['error_report'] = {
+                'report_id': self.report.report_id,
+                'url': reverse('upload-report', kwargs={'report_id': self.report.report_id}),
+            }
+        return summary
+
+    def observe(self):
+        """
+        Count the rows of this import in upload_rows_total.
+        """
+        UPLOAD_ROWS.inc(self.saved_records - self.updated_records, result='imported')
+        UPLOAD_ROWS.inc(self.updated_records, result='updated')
+        UPLOAD_ROWS.inc(self.conflicting_records, result='conflict')
+        UPLOAD_ROWS.inc(self.failed_records, result='failed')
+        UPLOAD_ROWS.inc(self.skipped_duplicates, result='duplicate')
+
+
+def read_header(file, name=None):
+    """
+    Read only the header row of ``file`` and rewind it.
+
+    The format is recognised by ``name`` (default: the file's own name):
+    compressed CSVs are only decompressed as far as the header, Parquet and
+    Arrow files only have their schema read. Uploads Django spooled to disk
+    are read from their path.
+
+    Raises:
+        CsvReadError: if the header cannot be parsed.
+
+    Returns:
+        list: column names
+    """
+    name = name or upload_name(file)
+    fmt = columnar.input_format(name)
+    source = parse_source(file)
+    try:
+        if fmt != 'csv':
+            return columnar.read_columns(source, fmt)
+        with open_csv(source, name) as stream:
+            return list(pd.read_csv(stream, nrows=0).columns)
+    except Exception as e:
+        raise CsvReadError(str(e)) from e
+    finally:
+        if hasattr(file, 'seek'):
+            file.seek(0)
+
+
+def missing_columns(columns):
+    return [column for column in REQUIRED_COLUMNS if column not in columns]
+
+
+def iter_chunks(file, chunk_size=None):
+    """
+    Yield the CSV as DataFrames of at most ``chunk_size`` rows, holding only
+    the required columns (see parsing.read_csv_chunks for the parse options).
+
+    The index keeps counting across chunks, so row numbers in error reports
+    are the same as for a single DataFrame.
+    """
+    try:
+        reader = read_csv_chunks(file, REQUIRED_COLUMNS, chunk_size or CSV_CHUNK_SIZE)
+    except Exception as e:
+        raise CsvReadError(str(e)) from e
+    try:
+        while True:
+            try:
+                chunk = next(reader)
+            except StopIteration:
+                return
+            except Exception as e:
+                raise CsvReadError(str(e)) from e
+            yield chunk
+    finally:
+        reader.close()
+
+
+def iter_frames(file, name=None, chunk_size=None):
+    """
+    Yield the upload as DataFrames of at most ``chunk_size`` rows, whatever
+    its format. Parquet, Arrow and NDJSON come back with only the required
+    columns loaded. Uploads Django spooled to disk are parsed from their path,
+    memory-mapped, rather than through the upload's file object.
+    """
+    name = name or upload_name(file)
+    fmt = columnar.input_format(name)
+    source = parse_source(file)
+    if fmt == 'csv':
+        with open_csv(source, name) as stream:
+            yield from iter_chunks(stream, chunk_size)
+        return
+    try:
+        yield from columnar.iter_frames(source, fmt, REQUIRED_COLUMNS, chunk_size or CSV_CHUNK_SIZE)
+    except columnar.ColumnarReadError as e:
+        raise CsvReadError(str(e)) from e
+
+
+def import_csv(file, chunk_size=None, progress=None, upsert=False, name=None, timer=None, dry_run=False):
+    """
+    Stream ``file`` through validation and insert it chunk by chunk.
+
+    Only one chunk is held in memory at a time; emails accepted by earlier
+    chunks are tracked so duplicates across chunk boundaries are still skipped.
+    The whole import runs in one transaction, so a parse error half way
+    through leaves nothing behind. Compressed files (see read_header) are
+    decompressed as they are parsed, and Parquet, Arrow and NDJSON files go
+    through the same validation with their column types. ``progress``, if
+    given, is called after every chunk with the number of rows processed so
+    far and the summary. ``timer``, an UploadTimer, gets the time spent in
+    the parse, validate, duplicates and insert stages. Row counts of
+    committed imports go to the upload_rows_total metric, and cached pages
+    of /users/ are invalidated once an import that wrote rows commits.
+
+    With ``upsert`` rows whose email is already stored update that user's
+    name and age instead of being skipped; duplicates within the file are
+    still skipped.
+
+    With ``dry_run`` every row is validated and checked against the stored
+    emails, but nothing is written; the summary counts what would have been
+    saved and updated.
+
+    Raises:
+        CsvReadError: if a chunk cannot be parsed.
+
+    Only the first UPLOAD_INLINE_ERRORS row errors are returned; when there
+    are more, the summary's ``error_report`` points at the full report (see
+    error_reports.ErrorReport). ``error_counts`` counts failures by type.
+
+    Returns:
+        dict: Summary of saved, updated and conflicting records, failed records, skipped duplicates, and errors.
+    """
+    timer = timer or UploadTimer()
+    summary = ImportSummary()
+    seen_emails = set()
+    rows_processed = 0
+    existing_emails = None if upsert else timer.timed('duplicates', find_existing_emails)
+    try:
+        with transaction.atomic():
+            chunks = iter_frames(file, name, chunk_size)
+            while True:
+                with timer.stage('parse'):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                with timer.stage('validate'):
+                    outcome = validate_dataframe(
+                        chunk,
+                        existing_emails=existing_emails,
+                        seen_emails=seen_emails,
+                        checks=check_chunk(chunk),
+                    )
+                with timer.stage('insert'):
+                    if dry_run:
+                        loaded = count_users(outcome.emails, upsert=upsert)
+                    else:
+                        loaded = load_users(outcome.names, outcome.emails, outcome.ages, upsert=upsert)
+                summary.add(outcome, loaded)
+                rows_processed += len(chunk)
+                if progress is not None:
+                    progress(rows_processed, summary)
+            if summary.saved_records and not dry_run:
+                transaction.on_commit(invalidate_user_pages)
+    except BaseException:
+        summary.report.discard()
+        raise
+    summary.report.close()
+    if not dry_run:
+        summary.observe()
+    return summary.as_dict()
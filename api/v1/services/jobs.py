@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from api.v1.services.compression import upload_suffix
+from api.v1.services.importer import CsvReadError, import_csv
+from api.v1.services.spooled import spooled_path
+from api.v1.services.timing import UploadTimer
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+_executor = None
+_request_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process-wide pool background upload jobs run on, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_JOB_WORKERS, thread_name_prefix='upload-job'
+            )
+    return _executor
+
+
+def get_request_executor():
+    """
+    Return the process-wide pool uploads sent to the async endpoint are
+    processed on, creating it on first use. It is separate from the job
+    pool, so requests waiting for their response never queue behind
+    background imports, nor the other way round.
+    """
+    global _request_executor
+    with _executor_lock:
+        if _request_executor is None:
+            _request_executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_REQUEST_WORKERS, thread_name_prefix='upload-request'
+            )
+    return _request_executor
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    """
+    Await ``fn(*args, **kwargs)`` run on the request pool (see
+    get_request_executor), closing the database connections it opened on
+    that thread afterwards.
+
+    Returns: what ``fn`` returns.
+    """
+    def call():
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            connections.close_all()
+
+    return await asyncio.wrap_future(get_request_executor().submit(call))
+
+
+def _job_key(job_id):
+    return f'upload-job-{job_id}'
+
+
+def _store(job_id, **state):
+    cache.set(_job_key(job_id), {'job_id': str(job_id), **state}, timeout=settings.UPLOAD_JOB_TTL)
+
+
+def get_job(job_id):
+    """
+    Returns: dict with the job state, or None if it is unknown or expired.
+    """
+    return cache.get(_job_key(job_id))
+
+
+def _spool(upload, job_id):
+    """
+    Copy the uploaded file to the job directory so it outlives the request.
+    Spooled uploads are copied file to file, which lets the kernel do it.
+    """
+    directory = Path(settings.UPLOAD_JOB_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{job_id}{upload_suffix(upload.name or "")}'
+    source = spooled_path(upload)
+    if source is not None:
+        shutil.copyfile(source, path)
+        return path
+    with open(path, 'wb') as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+    return path
+
+
+def _run(job_id, path, upsert=False, dry_run=False):
+    def progress(rows_processed, summary):
+        _store(
+            job_id,
+            status=RUNNING,
+            rows_processed=rows_processed,
+            saved_records=summary.saved_records,
+            failed_records=summary.failed_records,
+            result=None,
+        )
+
+    _store(job_id, status=RUNNING, rows_processed=0, saved_records=0, failed_records=0, result=None)
+    timer = UploadTimer()
+    try:
+        with timer.counting_queries():
+            result = import_csv(str(path), progress=progress, upsert=upsert, timer=timer, dry_run=dry_run)
+        timer.observe()
+        job = get_job(job_id) or {}
+        _store(
+            job_id,
+            status=COMPLETED,
+            rows_processed=job.get('rows_processed', 0),
+            saved_records=result['saved_records'],
+            failed_records=result['failed_records'],
+            result=result,
+            timings=timer.as_dict(),
+        )
+    except CsvReadError as e:
+        _store(job_id, status=FAILED, message=f"Error reading CSV file: {str(e)}", result=None)
+    except Exception as e:
+        logger.exception("Upload job %s failed", job_id)
+        _store(job_id, status=FAILED, message=str(e), result=None)
+    finally:
+        connections.close_all()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def submit_upload(upload, upsert=False, dry_run=False):
+    """
+    Store the upload and queue it for import (or, with ``dry_run``, only
+    validation) on the worker pool.
+
+    Returns:
+        str: the job id to poll
+    """
+    job_id = uuid.uuid4()
+    return _enqueue(job_id, _spool(upload, job_id), upsert, dry_run)
+
+
+def submit_file(path, upsert=False, name=None):
+    """
+    Queue a CSV already on disk for import, moving it into the job directory.
+    ``name`` is the original file name, which tells whether it is compressed.
+
+    Returns:
+        str: the job id to poll
+    """
+    job_id = uuid.uuid4()
+    directory = Path(settings.UPLOAD_JOB_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    destination = directory / f'{job_id}{upload_suffix(name or str(path))}'
+    shutil.move(path, destination)
+    return _enqueue(job_id, destination, upsert)
+
+
+def _enqueue(job_id, path, upsert, dry_run=False):
+    _store(job_id, status=QUEUED, rows_processed=0, saved_records=0, failed_records=0, result=None)
+    get_executor().submit(_run, job_id, path, upsert, dry_run)
+    return str(job_id)
@@ -0,0 +1,85 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from django.conf import settings
+
+from api.v1.services.validation import ColumnChecks, check_columns
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def validation_workers():
+    return settings.PARALLEL_VALIDATION_WORKERS or os.cpu_count() or 1
+
+
+def get_pool():
+    """
+    Return the process-wide validation pool, creating it on first use.
+
+    Workers are spawned rather than forked so they never inherit open
+    database or Redis connections from the web process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=validation_workers(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def check_columns_parallel(df, partitions):
+    """
+    Split ``df`` into contiguous partitions and check them on the process pool.
+
+    Results are concatenated in partition order, so masks line up with the
+    rows of ``df`` exactly as if it had been checked in one piece.
+
+    Returns:
+        ColumnChecks
+    """
+    columns = df[['name', 'email', 'age']]
+    bounds = np.array_split(np.arange(len(columns)), partitions)
+    parts = [columns.iloc[index[0]:index[-1] + 1] for index in bounds if len(index)]
+    pool = get_pool()
+    return ColumnChecks.concat(list(pool.map(check_columns, parts)))
+
+
+def check_chunk(df):
+    """
+    Run the column checks for one chunk, in parallel when it is large enough.
+
+    Chunks below PARALLEL_VALIDATION_THRESHOLD rows are checked in process so
+    small uploads don't pay the pool overhead. If the pool breaks the chunk is
+    checked serially instead.
+
+    Returns:
+        ColumnChecks
+    """
+    threshold = settings.PARALLEL_VALIDATION_THRESHOLD
+    workers = validation_workers()
+    if not threshold or len(df) < threshold or workers < 2:
+        return check_columns(df)
+    try:
+        return check_columns_parallel(df, workers)
+    except BrokenProcessPool:
+        logger.exception("Validation pool broke, checking chunk serially")
+        _reset_pool()
+        return check_columns(df)
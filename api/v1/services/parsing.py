@@ -0,0 +1,181 @@
+import os
+import re
+
+import pandas as pd
+from django.conf import settings
+
+from api.v1.services.spooled import memory_bytes
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional, the pandas C parser is used without it
+    pa = None
+
+# columns read as plain strings instead of letting the parser guess their type
+TEXT_COLUMNS = ('name', 'email')
+ARROW_BLOCK_SIZE = 8 * 1024 * 1024  # bytes of CSV the pyarrow reader parses per block
+# pyarrow's error for a row with missing or extra fields, which the pandas C parser accepts
+ARROW_FIELD_COUNT_ERROR = re.compile(r'Expected \d+ columns, got \d+')
+
+
+def csv_engine():
+    """
+    Returns: 'pyarrow' or 'c', resolving CSV_PARSE_ENGINE = 'auto'.
+    """
+    engine = settings.CSV_PARSE_ENGINE
+    if engine == 'auto':
+        return 'c' if pa is None else 'pyarrow'
+    return engine
+
+
+def _path(file):
+    if isinstance(file, (str, os.PathLike)):
+        return os.fspath(file)
+    return None
+
+
+def _read_pandas(file, columns, chunk_size):
+    wanted = set(columns)
+    return pd.read_csv(
+        file,
+        chunksize=chunk_size,
+        usecols=lambda column: column in wanted,
+        dtype={column: str for column in TEXT_COLUMNS if column in wanted},
+    )
+
+
+def _arrow_source(file):
+    path = _path(file)
+    if path is not None:
+        return pa.memory_map(path) if settings.CSV_MEMORY_MAP else path
+    data = memory_bytes(file)
+    if data is not None:
+        return pa.BufferReader(data)
+    return pa.PythonFile(file, mode='r')
+
+
+def _read_arrow(file, columns, chunk_size):
+    """
+    Stream the CSV through pyarrow's multi-threaded reader.
+
+    Every projected column is read as a string: a streaming reader fixes
+    column types from the first block, so a later 'abc' age would abort
+    the whole file instead of failing one row (_frame types them per
+    chunk). Blocks are regrouped into DataFrames of ``chunk_size`` rows
+    with a running index, like pandas'.
+    """
+    reader = pa_csv.open_csv(
+        _arrow_source(file),
+        read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(columns),
+            include_missing_columns=True,
+            column_types={column: pa.string() for column in columns},
+            strings_can_be_null=True,
+        ),
+    )
+    start = 0
+    pending = []
+    pending_rows = 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows < chunk_size:
+            continue
+        table = pa.Table.from_batches(pending)
+        emitted = 0
+        while pending_rows - emitted >= chunk_size:
+            yield _frame(table.slice(emitted, chunk_size), start + emitted)
+            emitted += chunk_size
+        start += emitted
+        pending = table.slice(emitted).to_batches()
+        pending_rows -= emitted
+    if pending_rows:
+        yield _frame(pa.Table.from_batches(pending), start)
+
+
+def _restart_position(file):
+    """
+    Returns: where parsing of ``file`` can start over, or None if it cannot
+    be read again (e.g. a decompressing stream).
+    """
+    if _path(file) is not None or memory_bytes(file) is not None:
+        return 0
+    try:
+        if file.seekable():
+            return file.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    return None
+
+
+def _read_arrow_or_pandas(file, columns, chunk_size, position):
+    """
+    _read_arrow, switching to the pandas C parser at the row where pyarrow
+    fails on a row with missing or extra fields. The C parser reads the file
+    again from ``position`` and drops the rows already yielded, so such rows
+    become row errors (e.g. "Age is required.") with either engine.
+    """
+    emitted = 0
+    try:
+        for frame in _read_arrow(file, columns, chunk_size):
+            yield frame
+            emitted += len(frame)
+        return
+    except pa.ArrowInvalid as e:
+        if not ARROW_FIELD_COUNT_ERROR.search(str(e)):
+            raise
+    if _path(file) is None and memory_bytes(file) is None:
+        file.seek(position)
+    for frame in _read_pandas(file, columns, chunk_size):
+        if frame.index[-1] < emitted:
+            continue
+        yield frame[frame.index >= emitted]
+
+
+def _frame(table, start):
+    """
+    Convert to pandas, giving the non-text columns the type pandas would
+    have inferred for the chunk: numeric when every value parses, left as
+    strings otherwise, so both engines validate ages the same way.
+    """
+    frame = table.to_pandas()
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    for column in frame.columns:
+        if column in TEXT_COLUMNS:
+            continue
+        numeric = pd.to_numeric(frame[column], errors='coerce')
+        if numeric.isna().sum() == frame[column].isna().sum():
+            frame[column] = numeric
+    return frame
+
+
+def read_csv_chunks(file, columns, chunk_size):
+    """
+    Iterate over the CSV as DataFrames of at most ``chunk_size`` rows,
+    holding only ``columns``.
+
+    Unused columns are skipped by the parser rather than parsed and thrown
+    away, and name and email are read as strings without type inference.
+    CSVs on disk are read from their path; the pyarrow engine memory-maps
+    them when CSV_MEMORY_MAP is on (the C parser gains nothing from a map,
+    it only adds the mapped pages to RSS). With
+    pyarrow installed (CSV_PARSE_ENGINE = 'auto') parsing runs on its
+    multi-threaded reader. pyarrow rejects rows with missing or extra
+    fields, which the pandas 'c' engine accepts (missing ones as NaN), so
+    under 'auto' such a file carries on with the C parser and gives the same
+    row errors; streams that cannot be re-read, like decompressed uploads,
+    go to the C parser directly. CSV_PARSE_ENGINE = 'pyarrow' keeps pyarrow's
+    strict behaviour.
+
+    Returns:
+        iterator of DataFrames
+    """
+    if csv_engine() == 'pyarrow':
+        if settings.CSV_PARSE_ENGINE != 'auto':
+            return _read_arrow(file, columns, chunk_size)
+        position = _restart_position(file)
+        if position is not None:
+            return _read_arrow_or_pandas(file, columns, chunk_size, position)
+    return _read_pandas(file, columns, chunk_size)
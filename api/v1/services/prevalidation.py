@@ -0,0 +1,137 @@
+import io
+import os
+import random
+from collections import Counter
+
+from api.v1.services import columnar
+from api.v1.services.compression import compression_for, upload_name
+from api.v1.services.error_reports import error_keys
+from api.v1.services.importer import CsvReadError, iter_chunks, iter_frames
+from api.v1.services.spooled import spooled_path
+from api.v1.services.validation import validate_dataframe
+
+
+class SampleReport:
+    """
+    Validation outcome of the rows pre-validation looked at.
+
+    errors: row errors as validate_dataframe reports them; rows from the
+        random sample carry their byte ``offset`` in the file instead of a
+        row number, which is not known without reading everything before it.
+    error_counts: number of failures per (field, message) over all checked rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.invalid = 0
+        self.errors = []
+        self.error_counts = Counter()
+
+    @property
+    def error_rate(self):
+        return self.invalid / self.rows if self.rows else 0.0
+
+    def add(self, frame, offsets=None):
+        outcome = validate_dataframe(frame)
+        self.rows += len(frame)
+        self.invalid += len(outcome.errors)
+        for error in outcome.errors:
+            self.error_counts.update(error_keys(error))
+            if offsets is not None:
+                error = {'offset': offsets[error['row'] - 2], 'errors': error['errors']}
+            self.errors.append(error)
+
+    def as_dict(self, max_errors):
+        return {
+            'checked_rows': self.rows,
+            'invalid_rows': self.invalid,
+            'error_rate': round(self.error_rate, 4),
+            'error_counts': dict(self.error_counts.most_common()),
+            'errors': self.errors[:max_errors],
+        }
+
+
+def _head(file, name, rows):
+    chunks = iter_frames(file, name, chunk_size=rows)
+    try:
+        return next(chunks, None)
+    finally:
+        chunks.close()
+        if hasattr(file, 'seek'):
+            file.seek(0)
+
+
+def _sample_lines(handle, count, rng):
+    """
+    Read up to ``count`` lines starting at random byte offsets, skipping the header.
+
+    Returns:
+        tuple: (header line, list of (offset, line))
+    """
+    handle.seek(0)
+    header = handle.readline()
+    size = handle.seek(0, os.SEEK_END)
+    lines = {}
+    if size <= len(header):
+        return header, []
+    for _ in range(count):
+        handle.seek(rng.randrange(len(header), size))
+        handle.readline()  # the rest of the line the offset landed in
+        offset = handle.tell()
+        line = handle.readline()
+        if line.strip():
+            lines[offset] = line if line.endswith(b'\n') else line + b'\n'
+    return header, sorted(lines.items())
+
+
+def _sample(file, name, count, rng):
+    """
+    Parse a random sample of the rows of a plain CSV by seeking to random
+    offsets, so the cost does not grow with the size of the file.
+
+    Returns:
+        tuple: (DataFrame, byte offsets of its rows), or None when the
+        upload is not a plain CSV or the sample cannot be parsed.
+    """
+    if columnar.input_format(name) != 'csv' or compression_for(name) is not None:
+        return None
+    path = spooled_path(file)
+    if path is not None:
+        with open(path, 'rb') as handle:
+            header, lines = _sample_lines(handle, count, rng)
+    else:
+        try:
+            header, lines = _sample_lines(file, count, rng)
+        finally:
+            file.seek(0)
+    if not lines:
+        return None
+    stream = io.BytesIO(header + b''.join(line for _, line in lines))
+    try:
+        frame = next(iter_chunks(stream, chunk_size=len(lines)), None)
+    except CsvReadError:
+        return None  # e.g. a quoted field spanning lines; the head is still checked
+    if frame is None or len(frame) != len(lines):
+        return None
+    return frame, [offset for offset, _ in lines]
+
+
+def prevalidate(file, name=None, head_rows=1000, sample_rows=1000, rng=None):
+    """
+    Validate the first ``head_rows`` rows of ``file`` plus, for plain CSVs,
+    about ``sample_rows`` rows picked at random offsets. Nothing is written
+    and the database is not queried, so duplicates are not counted as errors.
+
+    Returns:
+        SampleReport
+    """
+    name = name or upload_name(file)
+    report = SampleReport()
+    head = _head(file, name, head_rows)
+    if head is not None:
+        report.add(head)
+    if sample_rows:
+        sample = _sample(file, name, sample_rows, rng or random.Random())
+        if sample is not None:
+            report.add(*sample)
+    return report
@@ -0,0 +1,59 @@
+import hashlib
+import io
+import os
+
+
+def spooled_path(file):
+    """
+    Returns: the path of an upload Django already spooled to disk
+    (TemporaryUploadedFile), or of a plain path; None for anything else.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        return os.fspath(file)
+    if hasattr(file, 'temporary_file_path'):
+        return file.temporary_file_path()
+    return None
+
+
+def memory_bytes(file):
+    """
+    Returns: the content of an upload Django kept in memory
+    (InMemoryUploadedFile), or None.
+
+    BytesIO.getvalue() hands back the buffer it already holds instead of
+    copying it, and unlike getbuffer() leaves no export that would stop
+    Django from closing the file at the end of the request.
+    """
+    inner = getattr(file, 'file', file)
+    if isinstance(inner, io.BytesIO):
+        return inner.getvalue()
+    return None
+
+
+def parse_source(file):
+    """
+    What the parsers should read: the path of a spooled upload, so it can be
+    memory-mapped instead of going through Python file wrappers, otherwise
+    ``file`` itself.
+    """
+    return spooled_path(file) or file
+
+
+def sha256(file):
+    """
+    Hash an upload without reading it into Python in chunks: spooled files
+    go through hashlib.file_digest's reused buffer, in-memory ones are
+    hashed in place.
+    """
+    path = spooled_path(file)
+    if path is not None:
+        with open(path, 'rb') as handle:
+            return hashlib.file_digest(handle, 'sha256').hexdigest()
+    data = memory_bytes(file)
+    if data is not None:
+        return hashlib.sha256(data).hexdigest()
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
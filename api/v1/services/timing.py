@@ -0,0 +1,89 @@
+import functools
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+
+from core.metrics import registry
+
+UPLOAD_STAGE_SECONDS = registry.histogram(
+    'upload_stage_seconds', 'Wall time spent in each stage of an upload.', ('stage',)
+)
+UPLOAD_QUERIES = registry.histogram(
+    'upload_queries', 'SQL queries run per upload.', buckets=(1, 5, 10, 50, 100, 500, 1000, 5000)
+)
+
+
+class UploadTimer:
+    """
+    Wall time per stage of one upload, plus the SQL queries it ran.
+
+    Stages nest: time spent in an inner stage (e.g. ``duplicates`` inside
+    ``validate``) is only counted for the inner one, so the stages add up
+    to the time measured.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.queries = 0
+        self._nested = 0.0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        outer_nested, self._nested = self._nested, 0.0
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - self._nested
+            self._nested = outer_nested + elapsed
+
+    def timed(self, name, function):
+        """
+        Returns: ``function`` wrapped so every call is counted under stage ``name``.
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def counting_queries(self, using='default'):
+        def count(execute, sql, params, many, context):
+            self.queries += 1
+            return execute(sql, params, many, context)
+
+        with connections[using].execute_wrapper(count):
+            yield
+
+    def total(self):
+        return sum(self.stages.values())
+
+    def as_dict(self):
+        """
+        Returns: dict of stage -> milliseconds, with ``total`` and ``queries``.
+        """
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+        timings['total'] = round(self.total() * 1000, 1)
+        timings['queries'] = self.queries
+        return timings
+
+    def server_timing(self):
+        """
+        Returns: the stages as a Server-Timing header value.
+        """
+        metrics = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.stages.items()]
+        metrics.append(f'total;dur={self.total() * 1000:.1f}')
+        metrics.append(f'db;desc="{self.queries} queries"')
+        return ', '.join(metrics)
+
+    def observe(self):
+        """
+        Record this upload in the upload_stage_seconds and upload_queries histograms.
+        """
+        for name, seconds in self.stages.items():
+            UPLOAD_STAGE_SECONDS.observe(seconds, stage=name)
+        UPLOAD_STAGE_SECONDS.observe(self.total(), stage='total')
+        UPLOAD_QUERIES.observe(self.queries)
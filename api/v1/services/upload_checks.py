@@ -0,0 +1,148 @@
+import csv
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import FileUploadHandler
+
+from api.v1.services import columnar
+from api.v1.services.compression import compression_for
+from core.constants import ALLOWED_EXTENSION, MAX_FILE_SIZE
+from core.metrics import registry
+from core.validators import FileValidator
+
+try:
+    import magic
+except ImportError:  # python-magic is installed but libmagic is missing
+    magic = None
+
+# bytes of multipart framing and other form fields allowed on top of MAX_FILE_SIZE
+MULTIPART_ALLOWANCE = 64 * 1024
+# most of the first chunk that is looked at
+SNIFF_SIZE = 64 * 1024
+
+TEXT_TYPES = ('application/csv', 'application/json', 'application/x-ndjson')
+COMPRESSED_TYPES = {
+    'gzip': ('application/gzip', 'application/x-gzip'),
+    'bz2': ('application/x-bzip2',),
+    'zstd': ('application/zstd', 'application/x-zstd'),
+    'zip': ('application/zip',),
+}
+# libmagic reports these as application/octet-stream, so their own signatures are checked
+SIGNATURES = {
+    'parquet': (b'PAR1',),
+    'arrow': (b'ARROW1', b'\xff\xff\xff\xff', b'FEA1'),
+}
+
+UPLOAD_REJECTED = registry.counter(
+    'upload_rejected', 'Uploads rejected while they were still streaming in, by reason.', ('reason',)
+)
+
+
+class UploadRejected(Exception):
+    """Raised by EarlyRejectUploadHandler to stop reading the request body."""
+
+    def __init__(self, message, reason):
+        super().__init__(message)
+        self.reason = reason
+
+
+def check_declared(name, size):
+    """
+    Check ``name`` and ``size`` (bytes, or 0 when unknown) against the
+    limits the upload serializer applies; the extension is not checked when
+    ``name`` is None.
+
+    Raises:
+        UploadRejected: if the size or the extension is not allowed.
+    """
+    validator = FileValidator(max_size=MAX_FILE_SIZE, allowed_extensions=None if name is None else ALLOWED_EXTENSION)
+    try:
+        validator(SimpleNamespace(name=name or '', size=size))
+    except ValidationError as e:
+        raise UploadRejected(e.messages[0], 'size' if e.code == 'max_size' else 'extension')
+
+
+def check_head(name, head, required_columns=()):
+    """
+    Check the first bytes of a file named ``name``: the content type must
+    match the extension, and a plain CSV must have ``required_columns`` in
+    its header row (when the whole header row is in ``head``).
+
+    Raises:
+        UploadRejected: if the content does not fit the file name.
+    """
+    fmt = columnar.input_format(name)
+    compression = compression_for(name) if fmt == 'csv' else None
+    if fmt in SIGNATURES:
+        if not head.startswith(SIGNATURES[fmt]):
+            raise UploadRejected(f"File content is not {fmt.capitalize()} data.", 'type')
+        return
+    if magic is not None and head:
+        content_type = magic.from_buffer(head, mime=True)
+        if compression is not None:
+            expected = content_type in COMPRESSED_TYPES[compression]
+        else:
+            expected = content_type.startswith('text/') or content_type in TEXT_TYPES
+        if not expected:
+            raise UploadRejected(f"Files of type {content_type} are not supported.", 'type')
+    if fmt == 'csv' and compression is None and required_columns:
+        line, newline, _ = head.partition(b'\n')
+        if not newline:
+            return  # header row not complete in the first chunk; the serializer reads it properly
+        try:
+            header = next(csv.reader([line.decode('utf-8-sig')]), [])
+        except UnicodeDecodeError:
+            raise UploadRejected("Error reading CSV file: it is not UTF-8 encoded.", 'header')
+        if any(column not in header for column in required_columns):
+            raise UploadRejected(
+                f"CSV file must contain the following columns: {', '.join(required_columns)}", 'header'
+            )
+
+
+class EarlyRejectUploadHandler(FileUploadHandler):
+    """
+    Reject a bad upload while its first bytes stream in, not after Django
+    has received and spooled the whole body.
+
+    The declared Content-Length of the request and the file name are
+    checked before any of the file is read, and the first chunk is checked
+    with check_head before it reaches the next handler. Only the
+    ``field_name`` file is checked; chunks are passed on untouched.
+
+    Raising UploadRejected ends multipart parsing without reading the rest
+    of the request body.
+    """
+
+    def __init__(self, request=None, field_name='csv_file', required_columns=()):
+        super().__init__(request)
+        self.checked_field = field_name
+        self.required_columns = tuple(required_columns)
+
+    def _check(self, check, *args):
+        try:
+            check(*args)
+        except UploadRejected as e:
+            UPLOAD_REJECTED.inc(reason=e.reason)
+            raise
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > MAX_FILE_SIZE + MULTIPART_ALLOWANCE:
+            self._check(check_declared, None, content_length)
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, *args, **kwargs):
+        super().new_file(field_name, file_name, content_type, content_length, *args, **kwargs)
+        if field_name == self.checked_field:
+            self._check(check_declared, file_name, content_length or 0)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.field_name != self.checked_field:
+            return raw_data
+        if start + len(raw_data) > MAX_FILE_SIZE:
+            self._check(check_declared, self.file_name, start + len(raw_data))
+        if start == 0:
+            self._check(check_head, self.file_name, raw_data[:SNIFF_SIZE], self.required_columns)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from models.models import User
+
+USER_FIELDS = ('id', 'name', 'email', 'age')
+
+_GENERATION_KEY = 'users-page-generation'
+
+
+def user_queryset(email=None, age_min=None, age_max=None, fields=USER_FIELDS):
+    """
+    Users matching the filters, loading only ``fields`` (the id always).
+
+    Unordered; the paginator orders by id so every page is an index range
+    scan on the primary key. ``email`` is an exact match, served by the
+    unique index.
+
+    Returns:
+        QuerySet
+    """
+    queryset = User.objects.only('id', *fields)
+    if email is not None:
+        queryset = queryset.filter(email=email)
+    if age_min is not None:
+        queryset = queryset.filter(age__gte=age_min)
+    if age_max is not None:
+        queryset = queryset.filter(age__lte=age_max)
+    return queryset
+
+
+def page_key(url):
+    """
+    Cache key of the page for the full request ``url`` in the current cache
+    generation. Take it before querying and use it for both the lookup and
+    the store: if an import commits in between, the page is stored under the
+    old generation, where nobody looks any more, instead of being served as
+    current.
+    """
+    generation = cache.get(_GENERATION_KEY, 0)
+    digest = hashlib.sha256(url.encode()).hexdigest()
+    return f'users-page-{generation}-{digest}'
+
+
+def get_cached_page(key):
+    """
+    Returns: the page cached under ``key`` (see page_key), or None.
+    """
+    if not settings.USERS_PAGE_CACHE_TTL:
+        return None
+    return cache.get(key)
+
+
+def cache_page(key, page):
+    if settings.USERS_PAGE_CACHE_TTL:
+        cache.set(key, page, timeout=settings.USERS_PAGE_CACHE_TTL)
+
+
+def invalidate_user_pages():
+    """
+    Make every cached page stale at once by moving to a new cache
+    generation; the old entries are left to expire.
+    """
+    cache.add(_GENERATION_KEY, 0, timeout=None)
+    cache.incr(_GENERATION_KEY)
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+INTEGER_PATTERN = r'\s*[+-]?[0-9]+\s*'
+MIN_AGE = 1
+MAX_AGE = 120
+
+NAME_ERROR = "Name must be a non-empty string."
+EMAIL_ERROR = "Invalid email format."
+AGE_REQUIRED_ERROR = 'Age is required.'
+AGE_RANGE_ERROR = 'Age must be between 1 and 120.'
+AGE_INTEGER_ERROR = 'Age must be an integer.'
+
+
+class ValidationResult:
+    """
+    Outcome of validating one DataFrame (or one chunk of it).
+
+    Valid rows are kept as plain column lists so callers can build model
+    instances or write them in bulk without going back to the DataFrame.
+    """
+
+    def __init__(self, names=None, emails=None, ages=None, errors=None, duplicates=0):
+        self.names = names if names is not None else []
+        self.emails = emails if emails is not None else []
+        self.ages = ages if ages is not None else []
+        self.errors = errors if errors is not None else []
+        self.duplicates = duplicates
+
+    def __len__(self):
+        return len(self.emails)
+
+
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def check_names(series):
+    """
+    Check the name column as a whole.
+
+    Returns:
+        tuple: (boolean mask of valid names, stripped names)
+    """
+    if not _is_text(series):
+        return np.zeros(len(series), dtype=bool), series.to_numpy(dtype=object)
+    stripped = series.str.strip()
+    valid = stripped.str.len().fillna(0).to_numpy() > 0
+    return valid, stripped.to_numpy(dtype=object)
+
+
+def check_emails(series):
+    """
+    Check the email column against EMAIL_PATTERN.
+
+    Returns:
+        numpy.ndarray: boolean mask of well formed emails
+    """
+    if not _is_text(series):
+        return np.zeros(len(series), dtype=bool)
+    return series.str.match(EMAIL_PATTERN, na=False).to_numpy(dtype=bool)
+
+
+def check_ages(series):
+    """
+    Coerce the age column to integers and flag the rows that fail.
+
+    Numeric columns are truncated the same way int() would, text columns
+    only accept plain integer literals.
+
+    Returns:
+        tuple: (ages as float array, missing mask, not-integer mask, out-of-range mask)
+    """
+    missing = series.isna().to_numpy()
+    if _is_text(series):
+        integer_like = series.str.fullmatch(INTEGER_PATTERN, na=False)
+        numeric = pd.to_numeric(series.where(integer_like), errors="coerce")
+    else:
+        numeric = pd.to_numeric(series, errors="coerce")
+
+    ages = np.trunc(numeric.to_numpy(dtype=float, na_value=np.nan))
+    not_integer = ~missing & np.isnan(ages)
+    with np.errstate(invalid="ignore"):
+        out_of_range = ~missing & ~not_integer & ((ages < MIN_AGE) | (ages > MAX_AGE))
+    return ages, missing, not_integer, out_of_range
+
+
+class ColumnChecks:
+    """
+    Per-row masks produced by the column checks, in row order.
+
+    Holds only numpy arrays so partitions can be checked in worker processes
+    and stitched back together with ``concat``.
+    """
+
+    def __init__(self, name_ok, names, email_ok, ages, age_missing, age_not_integer, age_out_of_range):
+        self.name_ok = name_ok
+        self.names = names
+        self.email_ok = email_ok
+        self.ages = ages
+        self.age_missing = age_missing
+        self.age_not_integer = age_not_integer
+        self.age_out_of_range = age_out_of_range
+
+    @classmethod
+    def concat(cls, parts):
+        return cls(*(
+            np.concatenate([getattr(part, field) for part in parts])
+            for field in ('name_ok', 'names', 'email_ok', 'ages',
+                          'age_missing', 'age_not_integer', 'age_out_of_range')
+        ))
+
+
+def check_columns(df):
+    """
+    Run the name, email and age checks over whole columns.
+
+    This is the CPU heavy part of validation and does not touch the database.
+
+    Returns:
+        ColumnChecks
+    """
+    name_ok, names = check_names(df['name'])
+    email_ok = check_emails(df['email'])
+    ages, age_missing, age_not_integer, age_out_of_range = check_ages(df['age'])
+    return ColumnChecks(name_ok, names, email_ok, ages, age_missing, age_not_integer, age_out_of_range)
+
+
+def validate_dataframe(df, existing_emails=None, seen_emails=None, checks=None):
+    """
+    Validate every row of ``df`` with column-wise masks.
+
+    Rows whose email is valid but already present (earlier in the file, in
+    ``seen_emails`` or in ``existing_emails``) are skipped without an error,
+    exactly like the row-by-row implementation did.
+
+    Args:
+        df: DataFrame with name, email and age columns.
+        existing_emails: callable taking the candidate emails and returning
+            the ones that already exist in the database, or a set of them.
+        seen_emails: set of emails accepted by previous chunks, updated in place.
+        checks: ColumnChecks already computed for ``df``, e.g. in parallel.
+
+    Returns:
+        ValidationResult
+    """
+    if checks is None:
+        checks = check_columns(df)
+    name_ok = checks.name_ok
+    email_ok = checks.email_ok
+    age_missing = checks.age_missing
+    age_not_integer = checks.age_not_integer
+    age_out_of_range = checks.age_out_of_range
+
+    emails = df['email']
+    duplicated = np.zeros(len(df), dtype=bool)
+    if email_ok.any():
+        duplicated[email_ok] = emails[email_ok].duplicated(keep='first').to_numpy()
+        if seen_emails:
+            duplicated |= email_ok & emails.isin(seen_emails).to_numpy()
+
+        candidates = email_ok & ~duplicated
+        if existing_emails is not None and candidates.any():
+            if callable(existing_emails):
+                existing_emails = existing_emails(emails[candidates].tolist())
+            if existing_emails:
+                duplicated |= candidates & emails.isin(existing_emails).to_numpy()
+
+    skipped = email_ok & duplicated
+    accepted = email_ok & ~duplicated
+    if seen_emails is not None:
+        seen_emails.update(emails[accepted].tolist())
+
+    age_ok = ~(age_missing | age_not_integer | age_out_of_range)
+    failed = ~skipped & ~(name_ok & email_ok & age_ok)
+    valid = accepted & name_ok & age_ok
+
+    # --- Error report, built only for the failing rows ---
+    errors = []
+    row_numbers = df.index.to_numpy()
+    for position in np.flatnonzero(failed):
+        row_errors = {}
+        if not name_ok[position]:
+            row_errors['name'] = NAME_ERROR
+        if not email_ok[position]:
+            row_errors['email'] = EMAIL_ERROR
+        if age_missing[position]:
+            row_errors['age'] = AGE_REQUIRED_ERROR
+        elif age_not_integer[position]:
+            row_errors['age'] = AGE_INTEGER_ERROR
+        elif age_out_of_range[position]:
+            row_errors['age'] = AGE_RANGE_ERROR
+        errors.append({"row": int(row_numbers[position]) + 2, "errors": row_errors})  # +2 for header and 0-index
+
+    return ValidationResult(
+        names=checks.names[valid].tolist(),
+        emails=[email.strip() for email in emails[valid].tolist()],
+        ages=checks.ages[valid].astype(np.int64).tolist(),
+        errors=errors,
+        duplicates=int(skipped.sum()),
+    )
@@ -0,0 +1,51 @@
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from api.v1.services.jobs import run_in_pool
+from api.v1.views.uploader import FileUploadView
+
+
+class AsyncFileUploadView(View):
+
+    """
+    FileUploadView for ASGI servers.
+
+    endpoint: /v1/api/async/upload-file/
+    Method: POST
+    it takes the same form fields, query parameters and headers as
+    /v1/api/upload-file/ and returns the same responses.
+    Under ASGI Django reads the request body from the client on the event
+    loop, spooling large bodies to disk, before the view runs, so a slow
+    upload holds no thread while it streams in. The multipart parsing, CSV
+    parsing and import then run on their own pool (UPLOAD_REQUEST_WORKERS
+    threads, separate from the background job pool) rather than on the
+    single thread Django runs every sync view on under ASGI.
+
+    Returns:
+        dict: success status, message, and data or errors.
+    """
+
+    upload_view = staticmethod(FileUploadView.as_view())
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # same as the DRF view it wraps: authentication classes enforce CSRF where needed
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request, *args, **kwargs):
+        return await run_in_pool(self._upload, request, *args, **kwargs)
+
+    def _upload(self, request, *args, **kwargs):
+        """
+        Run the sync view and render its response on the calling thread.
+
+        returns: HttpResponse; a plain one, as Django would otherwise hop to
+        a thread again to render the DRF Response.
+        """
+        response = self.upload_view(request, *args, **kwargs)
+        response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
@@ -0,0 +1,216 @@
+from django.urls import reverse
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.v1.serializers.chunked_uploads import UploadSessionSerializer
+from api.v1.services.chunked_uploads import (
+    ChunkError, SessionBusy, TooManySessions, claim_session, create_session, delete_session, get_session,
+    parse_content_range, session_path, write_chunk,
+)
+from api.v1.services.importer import (
+    CsvReadError, REQUIRED_COLUMNS, UPLOAD_SIZE_BYTES, import_csv, missing_columns, read_header,
+)
+from api.v1.services.jobs import QUEUED, submit_file
+from api.v1.views.uploader import FileUploadView
+
+
+def _session_data(session):
+    upload_id = session['upload_id']
+    return {
+        'upload_id': upload_id,
+        'filename': session['filename'],
+        'size': session['size'],
+        'offset': session['offset'],
+        'upload_url': reverse('upload-session', kwargs={'upload_id': upload_id}),
+        'complete_url': reverse('upload-session-complete', kwargs={'upload_id': upload_id}),
+    }
+
+
+def _not_found():
+    return Response({
+        'success': False,
+        'message': 'Upload not found.'
+    }, status=status.HTTP_404_NOT_FOUND)
+
+
+def _bad_request(message):
+    return Response({
+        'success': False,
+        'errors': {'non_field_errors': message}
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UploadSessionCreateView(APIView):
+
+    """
+    Start a resumable upload.
+
+    endpoint: /v1/api/uploads/
+    Method: POST
+    it takes ``filename``, ``size`` (bytes) and optionally ``upsert``, checks
+    them like a direct upload would, and returns the upload id and the URLs
+    to send chunks to and to complete the upload.
+
+    Returns:
+        dict: success status and upload data (201), field errors (400), or
+        503 if UPLOAD_SESSION_MAX_OPEN uploads are unfinished.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = UploadSessionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': {key: serializer.errors[key][0] for key in serializer.errors.keys()}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session = create_session(**serializer.validated_data)
+        except TooManySessions:
+            return Response({
+                'success': False,
+                'message': 'Too many unfinished uploads, try again later.'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({
+            'success': True,
+            'data': _session_data(session)
+        }, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(APIView):
+
+    """
+    Send, inspect or abandon the bytes of a resumable upload.
+
+    endpoint: /v1/api/uploads/<upload_id>/
+    Method: PUT
+    the raw request body is appended to the upload; ``Content-Range:
+    bytes <first>-<last>/<size>`` says where it belongs. Chunks must be
+    sent in order, bytes already received are ignored, and the body is
+    streamed to disk rather than buffered.
+    Method: GET
+    returns ``offset``, the number of bytes received, to resume from after
+    a dropped connection.
+    Method: DELETE
+    abandons the upload and removes what was received.
+
+    Returns:
+        dict: success status and upload data with the current ``offset``.
+    """
+
+    def get(self, request, upload_id, *args, **kwargs):
+        session = get_session(upload_id)
+        if session is None:
+            return _not_found()
+        return Response({
+            'success': True,
+            'data': _session_data(session)
+        }, status=status.HTTP_200_OK)
+
+    def put(self, request, upload_id, *args, **kwargs):
+        session = get_session(upload_id)
+        if session is None:
+            return _not_found()
+        try:
+            first, last = parse_content_range(request.headers.get('Content-Range'), session['size'])
+            session['offset'] = write_chunk(upload_id, request.stream, first, last)
+        except ValueError as e:
+            return _bad_request(str(e))
+        except SessionBusy:
+            return Response({
+                'success': False,
+                'message': 'Another chunk of this upload is still being written.'
+            }, status=status.HTTP_409_CONFLICT)
+        except ChunkError as e:
+            session['offset'] = e.offset
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': _session_data(session)
+            }, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'success': True,
+            'data': _session_data(session)
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request, upload_id, *args, **kwargs):
+        if get_session(upload_id) is None:
+            return _not_found()
+        delete_session(upload_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionCompleteView(APIView):
+
+    """
+    Import a resumable upload once every byte has arrived.
+
+    endpoint: /v1/api/uploads/<upload_id>/complete/
+    Method: POST
+    the assembled file is checked for the required columns and streamed
+    through the importer straight from disk. With ``async=true`` it is
+    handed to the background worker pool instead and 202 is returned with
+    a job id, as for /v1/api/upload-file/.
+
+    Returns:
+        dict: success status, message, and data or errors; 409 with the
+        current ``offset`` if bytes are still missing, or 409 if another
+        request is already completing the upload.
+    """
+
+    def post(self, request, upload_id, *args, **kwargs):
+        session = get_session(upload_id)
+        if session is None:
+            return _not_found()
+        if session['offset'] < session['size']:
+            return Response({
+                'success': False,
+                'message': f"Upload is incomplete: {session['offset']} of {session['size']} bytes received.",
+                'data': _session_data(session)
+            }, status=status.HTTP_409_CONFLICT)
+        try:
+            claimed = claim_session(upload_id)
+        except SessionBusy:
+            claimed = False
+        if not claimed:
+            return Response({
+                'success': False,
+                'message': 'This upload is already being completed.'
+            }, status=status.HTTP_409_CONFLICT)
+
+        path = session_path(upload_id)
+        try:
+            columns = read_header(str(path), name=session['filename'])
+        except CsvReadError as e:
+            delete_session(upload_id)
+            return _bad_request(f"Error reading CSV file: {str(e)}")
+        if missing_columns(columns):
+            delete_session(upload_id)
+            return _bad_request(f"CSV file must contain the following columns: {', '.join(REQUIRED_COLUMNS)}")
+        UPLOAD_SIZE_BYTES.observe(session['size'], source='resumable')
+
+        if FileUploadView._is_async(request):
+            job_id = submit_file(path, upsert=session['upsert'], name=session['filename'])
+            delete_session(upload_id, remove_file=False)
+            return Response({
+                'success': True,
+                'message': 'File accepted for processing.',
+                'data': {
+                    'job_id': job_id,
+                    'status': QUEUED,
+                    'status_url': reverse('upload-job', kwargs={'job_id': job_id}),
+                }
+            }, status=status.HTTP_202_ACCEPTED)
+
+        try:
+            result = import_csv(str(path), upsert=session['upsert'], name=session['filename'])
+        except CsvReadError as e:
+            delete_session(upload_id)
+            return _bad_request(f"Error reading CSV file: {str(e)}")
+        delete_session(upload_id)
+        return Response({
+            'success': True,
+            'message': 'File processed successfully.',
+            'data': result
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,77 @@
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.v1.services.error_reports import get_report, iter_csv, iter_ndjson, page_range
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class UploadReportView(APIView):
+
+    """
+    Stream the full error report of an import.
+
+    endpoint: /v1/api/upload-reports/<report_id>/
+    Method: GET
+    it streams the row errors one JSON object per line, or with
+    ``output=csv`` as CSV rows of row number and message per field.
+    ``page`` (from 1) limits it to UPLOAD_REPORT_PAGE_SIZE errors; the
+    ``X-Total-Count`` and ``X-Page-Count`` headers give the totals and a
+    ``Link`` header points at the neighbouring pages.
+
+    Returns:
+        the report as a streamed response, 400 for bad parameters, or 404
+        if the report or page is unknown or expired.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        # the body is never rendered by DRF; don't refuse Accept: text/csv
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, report_id, *args, **kwargs):
+        report = get_report(report_id)
+        if report is None:
+            return Response({
+                'success': False,
+                'message': 'Error report not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        output = request.query_params.get('output', 'ndjson')
+        page = request.query_params.get('page')
+        if output not in CONTENT_TYPES or (page is not None and not page.isdigit()):
+            return Response({
+                'success': False,
+                'errors': {'non_field_errors': 'output must be ndjson or csv and page a positive number.'}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        page = int(page) if page is not None else None
+        byte_range = page_range(report, page)
+        if byte_range is None:
+            return Response({
+                'success': False,
+                'message': 'Page not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        stream = iter_csv if output == 'csv' else iter_ndjson
+        response = StreamingHttpResponse(stream(report_id, *byte_range), content_type=CONTENT_TYPES[output])
+        response['X-Total-Count'] = str(report['total'])
+        response['X-Page-Count'] = str(len(report['pages']))
+        if output == 'csv':
+            response['Content-Disposition'] = f'attachment; filename="errors-{report_id}.csv"'
+        if page is not None:
+            url = reverse('upload-report', kwargs={'report_id': report_id})
+            links = []
+            if page > 1:
+                links.append(f'<{url}?output={output}&page={page - 1}>; rel="prev"')
+            if page < len(report['pages']):
+                links.append(f'<{url}?output={output}&page={page + 1}>; rel="next"')
+            if links:
+                response['Link'] = ', '.join(links)
+        return response
@@ -0,0 +1,32 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.v1.services.jobs import get_job
+
+
+class UploadJobView(APIView):
+
+    """
+    Report the progress of a background upload.
+
+    endpoint: /v1/api/upload-jobs/<job_id>/
+    Method: GET
+    it returns the job status, the rows processed, saved and failed so far,
+    and once the job is completed the same summary the synchronous upload returns.
+
+    Returns:
+        dict: success status and job data, or 404 if the job is unknown or expired.
+    """
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = get_job(job_id)
+        if job is None:
+            return Response({
+                'success': False,
+                'message': 'Upload job not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'success': True,
+            'data': job
+        }, status=status.HTTP_200_OK)
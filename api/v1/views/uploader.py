@@ -1,10 +1,23 @@
+import logging
+
 from django.db import transaction
+from django.urls import reverse
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 
 from api.v1.serializers.uploader import FileUploadSerializer
+from api.v1.services.fingerprint import (
+    HashingUploadHandler, IdempotencyKeyReused, client_scope, get_cached_result, result_cache_keys, store_result,
+    upload_digest, upload_fingerprint,
+)
+from api.v1.services.importer import REQUIRED_COLUMNS, UPLOAD_SIZE_BYTES
+from api.v1.services.jobs import QUEUED, submit_upload
+from api.v1.services.timing import UploadTimer
+from api.v1.services.upload_checks import EarlyRejectUploadHandler, UploadRejected
+
+logger = logging.getLogger(__name__)
 
 
 class FileUploadView(APIView):
@@ -15,28 +28,136 @@ class FileUploadView(APIView):
     endpoint: /v1/api/upload-file/
     Method: POST
     it accepts a csv file and processes it using FileUploadSerializer.
+    With ``async=true`` (query string or form field) the file is queued on the
+    background worker pool instead and 202 is returned with a job id to poll
+    at /v1/api/upload-jobs/<job_id>/.
+    Uploads are fingerprinted with sha256 while they stream in; re-sending
+    identical content with the same options, or repeating an
+    ``Idempotency-Key`` header, replays the earlier response without
+    importing again (marked with ``Idempotent-Replayed: true``). Results are
+    only replayed to the same client, and an Idempotency-Key sent again with
+    a different file or options is rejected with 422.
+    Unless ``dry_run=true`` is sent, the first rows and a random sample are
+    validated before the import, and a file with too many invalid rows is
+    rejected with 400 and the sample's errors in ``data``. ``dry_run=true``
+    validates the whole file and reports what would be saved, writing nothing.
+    Files with a disallowed size, extension, content type or CSV header are
+    rejected from their first chunk, without reading the rest of the body.
+    Every response carries a ``Server-Timing`` header with the time spent
+    in multipart parsing, header checks, CSV parsing, validation, duplicate
+    lookups and inserts, plus the SQL query count; ``timings=true`` in the
+    query string adds the same figures as a ``timings`` block.
     
     Returns:
         dict: success status, message, and data or errors.
     """
     
+    @staticmethod
+    def _is_async(request):
+        value = request.query_params.get('async', request.data.get('async', ''))
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    @staticmethod
+    def _with_timings(request, response, timer):
+        timer.observe()
+        response['Server-Timing'] = timer.server_timing()
+        if str(request.query_params.get('timings', '')).lower() in ('1', 'true', 'yes') \
+                and isinstance(response.data, dict):
+            response.data['timings'] = timer.as_dict()
+        logger.info(
+            "Upload finished with status %s in %.1f ms", response.status_code, timer.total() * 1000,
+            extra={'status_code': response.status_code, 'timings': timer.as_dict()},
+        )
+        return response
+
     with transaction.atomic():
         def post(self, request, *args,  **kwargs):
+            timer = UploadTimer()
+            with timer.counting_queries():
+                response = self._process(request, timer)
+            return self._with_timings(request, response, timer)
+
+        def _process(self, request, timer):
             try:
-                serializer = FileUploadSerializer(data=request.data)
-                if serializer.is_valid():
+                request.upload_handlers.insert(0, HashingUploadHandler(request._request))
+                request.upload_handlers.insert(
+                    0, EarlyRejectUploadHandler(request._request, 'csv_file', REQUIRED_COLUMNS)
+                )
+                with timer.stage('multipart'):
+                    try:
+                        data = request.data
+                    except UploadRejected as e:
+                        # same shape as the serializer's error for the same problem
+                        key = 'non_field_errors' if e.reason == 'header' else 'csv_file'
+                        return Response({
+                            'success': False,
+                            'errors': {key: str(e)}
+                        }, status=status.HTTP_400_BAD_REQUEST)
+                serializer = FileUploadSerializer(data=data, context={'timer': timer})
+                with timer.stage('header'):
+                    is_valid = serializer.is_valid()
+                if is_valid:
+                    UPLOAD_SIZE_BYTES.observe(serializer.validated_data['csv_file'].size, source='form')
+                    is_async = self._is_async(request)
+                    fingerprint = upload_fingerprint(
+                        upload_digest(request, 'csv_file', serializer.validated_data['csv_file']),
+                        upsert=serializer.validated_data['upsert'],
+                        is_async=is_async,
+                        dry_run=serializer.validated_data['dry_run'],
+                    )
+                    cache_keys = result_cache_keys(
+                        client_scope(request), fingerprint, request.headers.get('Idempotency-Key'),
+                    )
+                    try:
+                        cached = get_cached_result(cache_keys, fingerprint)
+                    except IdempotencyKeyReused as e:
+                        return Response({
+                            'success': False,
+                            'message': str(e)
+                        }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                    if cached is not None:
+                        code, body = cached
+                        return Response(body, status=code, headers={'Idempotent-Replayed': 'true'})
+                    if is_async:
+                        with timer.stage('spool'):
+                            job_id = submit_upload(
+                                serializer.validated_data['csv_file'],
+                                upsert=serializer.validated_data['upsert'],
+                                dry_run=serializer.validated_data['dry_run'],
+                            )
+                        response = {
+                            'success': True,
+                            'message': 'File accepted for processing.',
+                            'data': {
+                                'job_id': job_id,
+                                'status': QUEUED,
+                                'status_url': reverse('upload-job', kwargs={'job_id': job_id}),
+                            }
+                        }
+                        store_result(cache_keys, fingerprint, status.HTTP_202_ACCEPTED, response)
+                        return Response(response, status=status.HTTP_202_ACCEPTED)
                     result = serializer.save()
                     response = {
                         'success': True,
-                        'message': 'File processed successfully.',
+                        'message': 'File validated, nothing was saved.' if serializer.validated_data['dry_run']
+                        else 'File processed successfully.',
                         'data': result
                     }
+                    store_result(cache_keys, fingerprint, status.HTTP_200_OK, response)
                     return Response(response, status=status.HTTP_200_OK)
                 else:
-                    return Response({
+                    response = {
                         'success': False,
                         'errors': {key: serializer.errors[key][0] for key in serializer.errors.keys()}
-                    }, status=status.HTTP_400_BAD_REQUEST)
+                    }
+                    if hasattr(serializer, 'prevalidation'):
+                        response['data'] = serializer.prevalidation
+                    return Response(response, status=status.HTTP_400_BAD_REQUEST)
+            except serializers.ValidationError as e:
+                return Response({
+                    'success': False,
+                    'errors': {'non_field_errors': e.detail[0]}
+                }, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response({
                     'success': False,
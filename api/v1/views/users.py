@@ -0,0 +1,75 @@
+from django.conf import settings
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from api.v1.serializers.users import UserQuerySerializer, UserSerializer
+from api.v1.services.users import cache_page, get_cached_page, page_key, user_queryset
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key: a page is ``WHERE id > <last id>
+    ORDER BY id LIMIT <page_size + 1>``, however deep it is, and nothing is
+    counted.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        self.page_size = settings.USERS_PAGE_SIZE
+        self.max_page_size = settings.USERS_MAX_PAGE_SIZE
+        return super().get_page_size(request)
+
+
+class UserListView(APIView):
+
+    """
+    List imported users.
+
+    endpoint: /v1/api/users/
+    Method: GET
+    it returns users ordered by id, USERS_PAGE_SIZE per page (``page_size``
+    up to USERS_MAX_PAGE_SIZE), filtered by ``email`` (exact) or an
+    ``age_min``/``age_max`` range, with only the ``fields`` asked for.
+    ``next`` and ``previous`` are the links to the neighbouring pages; there
+    is no total count. Pages are cached for USERS_PAGE_CACHE_TTL seconds,
+    or until an import commits.
+
+    Returns:
+        dict: success status and the page, 400 for bad parameters, or 404 for an invalid cursor.
+    """
+
+    def get(self, request, *args, **kwargs):
+        query = UserQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({
+                'success': False,
+                'errors': query.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        key = page_key(request.build_absolute_uri())
+        page = get_cached_page(key)
+        if page is None:
+            fields = query.validated_data.pop('fields')
+            paginator = UserCursorPagination()
+            try:
+                users = paginator.paginate_queryset(user_queryset(fields=fields, **query.validated_data), request, view=self)
+            except NotFound:
+                return Response({
+                    'success': False,
+                    'message': 'Invalid cursor.'
+                }, status=status.HTTP_404_NOT_FOUND)
+            page = {
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
+                'results': UserSerializer(users, many=True, fields=fields).data,
+            }
+            cache_page(key, page)
+        return Response({
+            'success': True,
+            'data': page
+        }, status=status.HTTP_200_OK)
@@ -1,2 +1,8 @@
-MAX_FILE_SIZE = 1024*1024*10  # 10 MB
-ALLOWED_EXTENSION = ('csv',)
\ No newline at end of file
+MAX_FILE_SIZE = 1024*1024*500  # 500 MB, uploads are streamed in chunks; for compressed uploads the compressed size
+MAX_DECOMPRESSED_SIZE = 1024*1024*1024*5  # 5 GB, compressed uploads are cut off past this many decompressed bytes
+MAX_RESUMABLE_FILE_SIZE = 1024*1024*1024*20  # 20 GB, chunked uploads never sit in memory
+CSV_CHUNK_SIZE = 50_000  # rows parsed, validated and inserted per chunk
+# .csv.zst needs the optional zstandard package, .parquet/.arrow/.feather the optional pyarrow package
+ALLOWED_EXTENSION = ('csv', 'csv.gz', 'csv.bz2', 'csv.zst', 'zip', 'parquet', 'arrow', 'feather', 'ndjson', 'jsonl')
+EMAIL_LOOKUP_BATCH_SIZE = 900  # emails per email__in query, kept under SQLite's 999 parameter limit
+BULK_INSERT_BATCH_SIZE = 5000  # upper bound on rows per INSERT statement
@@ -0,0 +1,436 @@
+"""
+Metrics registry.
+
+Metrics are sharded per thread: a thread only ever writes to its own
+shard, so recording a value takes no lock, and reads add the shards up.
+When a thread ends its shard is folded into a retired total, so servers
+that start a thread per request do not pile up shards.
+
+Each worker process periodically writes a snapshot of its metrics to
+METRICS_DIR (see flush_if_due); the /metrics endpoint adds up the
+snapshots of all workers and renders them in the Prometheus text format.
+Snapshots of workers that have exited, or that stopped writing, are
+folded into one retired snapshot in the same directory, so the totals
+/metrics reports never go down when a worker is recycled.
+"""
+import bisect
+import fcntl
+import json
+import logging
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# seconds, for request and upload stage latencies
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class _ThreadToken:
+    """
+    Kept only in a metric's thread-local storage, so it is freed when its thread ends.
+    """
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        # reentrant: a finalizer may run _retire from a garbage collection inside collect
+        self._lock = threading.RLock()
+
+    def _series(self, labels):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = self._empty()
+        return series
+
+    def _new_shard(self):
+        shard = self._local.shard = {}
+        token = self._local.token = _ThreadToken()
+        weakref.finalize(token, self._retire, shard)
+        with self._lock:
+            self._shards.append(shard)
+        return shard
+
+    def _retire(self, shard):
+        # the thread is gone, nothing writes to its shard any more
+        with self._lock:
+            self._add(self._retired, shard)
+            self._shards.remove(shard)
+
+    def _empty(self):
+        raise NotImplementedError
+
+    def _add(self, totals, shard):
+        for key, series in list(shard.items()):
+            total = totals.setdefault(key, self._empty())
+            for i, value in enumerate(series):
+                total[i] += value
+
+    def collect(self):
+        """
+        Returns: dict of label values tuple -> list of values, summed over all threads.
+        """
+        totals = {}
+        with self._lock:
+            self._add(totals, self._retired)
+            for shard in list(self._shards):
+                self._add(totals, shard)
+        return totals
+
+
+class Counter(Metric):
+    """
+    Stored per label set as [total].
+    """
+    kind = 'counter'
+
+    def _empty(self):
+        return [0]
+
+    def inc(self, amount=1, **labels):
+        self._series(labels)[0] += amount
+
+
+class Histogram(Metric):
+    """
+    Stored per label set as [count in each bucket ..., count above the last bucket, sum].
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _empty(self):
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value, **labels):
+        series = self._series(labels)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def metrics(self):
+        return list(self._metrics.values())
+
+    def snapshot(self):
+        """
+        Returns: JSON-serialisable dict of metric name -> description and series.
+        """
+        snapshot = {}
+        for metric in self.metrics():
+            snapshot[metric.name] = {
+                'kind': metric.kind,
+                'documentation': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'series': [[list(key), values] for key, values in metric.collect().items()],
+            }
+        return snapshot
+
+    def flush(self, directory):
+        """
+        Write this process's snapshot to ``directory``/snapshot_name().
+
+        The file is written next to its final name and renamed over it, so a
+        scrape never reads a half-written snapshot.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as handle:
+                json.dump(self.snapshot(), handle)
+            os.replace(tmp, directory / snapshot_name())
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+registry = Registry()
+_flushed_at = 0.0
+_flush_executor = None
+_flush_lock = threading.Lock()
+_snapshot_names = {}
+
+
+def snapshot_name():
+    """
+    Returns: the file name of this process's snapshot, <host>_<pid>_<start
+    time in ms>.json, so a later process reusing the PID gets a file of its own.
+    """
+    pid = os.getpid()
+    name = _snapshot_names.get(pid)
+    if name is None:
+        name = _snapshot_names[pid] = f'{socket.gethostname()}_{pid}_{int(time.time() * 1000)}.json'
+    return name
+
+
+def _pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # e.g. EPERM: it exists but belongs to another user
+    return True
+
+
+RETIRED_NAME = 'retired.json'
+
+
+def _worker_state(path, stale_after, now):
+    """
+    Returns: 'dead' for the snapshot of a worker on this host whose PID no
+    longer exists, 'idle' for one from another host sharing the directory
+    that has not been written for ``stale_after`` seconds (it may be idle
+    rather than gone), else 'live'. A live worker on this host that is idle
+    stays 'live'.
+    """
+    host, _, pid = path.stem.rpartition('_')[0].rpartition('_')
+    if host == socket.gethostname() and pid.isdigit():
+        return 'live' if _pid_exists(int(pid)) else 'dead'
+    return 'idle' if now - path.stat().st_mtime > stale_after else 'live'
+
+
+class _RetiredLock:
+    """
+    Exclusive lock on the retired snapshot of ``directory``, so two scrapes
+    never fold the same worker twice or overwrite each other's folds.
+    """
+
+    def __init__(self, directory):
+        self.path = Path(directory) / 'retired.lock'
+
+    def __enter__(self):
+        self.handle = open(self.path, 'a')
+        fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+def _read_retired(directory):
+    """
+    Returns: the retired snapshot of ``directory``: 'total', the sum of the
+    workers known to have exited, and 'idle', the last snapshot of each
+    worker from another host that stopped writing, by file name.
+    """
+    try:
+        retired = json.loads((Path(directory) / RETIRED_NAME).read_text())
+    except FileNotFoundError:
+        return {'total': {}, 'idle': {}}
+    return retired
+
+
+def _write_retired(directory, retired):
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(retired, handle)
+        os.replace(tmp, Path(directory) / RETIRED_NAME)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _get_flush_executor():
+    """
+    Returns: the single thread snapshots are written on, created per process
+    so a worker forked after first use gets its own.
+    """
+    global _flush_executor
+    with _flush_lock:
+        if _flush_executor is None or _flush_executor[0] != os.getpid():
+            _flush_executor = (os.getpid(), ThreadPoolExecutor(max_workers=1, thread_name_prefix='metrics-flush'))
+        return _flush_executor[1]
+
+
+def _flush(directory):
+    try:
+        registry.flush(directory)
+    except OSError:
+        logger.warning("Could not write metrics to %s", directory, exc_info=True)
+
+
+def flush_if_due(now=None):
+    """
+    Flush the registry to METRICS_DIR if METRICS_FLUSH_INTERVAL seconds have
+    passed since the last flush. The file is written on a background
+    thread, so this does no I/O and is safe to call on every request, also
+    on the event loop.
+
+    Returns: the Future of the flush, or None if none was due.
+    """
+    global _flushed_at
+    from django.conf import settings
+
+    if not settings.METRICS_DIR:
+        return None
+    now = time.monotonic() if now is None else now
+    if now - _flushed_at < settings.METRICS_FLUSH_INTERVAL:
+        return None
+    _flushed_at = now
+    return _get_flush_executor().submit(_flush, settings.METRICS_DIR)
+
+
+def merge(snapshots):
+    """
+    Add up snapshots from several processes.
+
+    Returns: one snapshot with the series of equal metric and labels summed.
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, series={}))
+            for key, values in metric['series']:
+                total = target['series'].setdefault(tuple(key), [0] * len(values))
+                if len(total) != len(values):
+                    continue  # buckets changed between deploys
+                for i, value in enumerate(values):
+                    total[i] += value
+    for metric in merged.values():
+        metric['series'] = [[list(key), values] for key, values in metric['series'].items()]
+    return merged
+
+
+def collect_all(directory=None, stale_after=None):
+    """
+    Returns: the merged snapshot of every worker that flushed to
+    ``directory``, with this process's current values in place of its own
+    (possibly stale) file, plus the workers retired before.
+
+    Counters must not go down when a worker goes away, so the snapshots of
+    workers that are gone (see _worker_state; ``stale_after`` defaults to
+    METRICS_STALE_AFTER) are folded into the retired snapshot before their
+    files are deleted. Those of exited workers are added to its total; those
+    of other hosts' silent workers are kept by name, and dropped from it
+    again if the worker writes a new (cumulative) snapshot after all.
+    """
+    snapshots = [registry.snapshot()]
+    if not directory:
+        return merge(snapshots)
+    if stale_after is None:
+        from django.conf import settings
+        stale_after = settings.METRICS_STALE_AFTER
+    own = snapshot_name()
+    now = time.time()
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    with _RetiredLock(directory):
+        retired = _read_retired(directory)
+        changed = retired['idle'].pop(own, None) is not None
+        folded = []
+        for path in Path(directory).glob('*.json'):
+            if path.name in (own, RETIRED_NAME):
+                continue
+            try:
+                snapshot = json.loads(path.read_text())
+                state = _worker_state(path, stale_after, now)
+            except (OSError, ValueError):
+                continue  # removed or replaced while we were reading it
+            if retired['idle'].pop(path.name, None) is not None:
+                changed = True  # written again since it was retired
+            if state == 'live':
+                snapshots.append(snapshot)
+                continue
+            if state == 'dead':
+                retired['total'] = merge([retired['total'], snapshot])
+            else:
+                retired['idle'][path.name] = snapshot
+            folded.append(path)
+        if folded or changed:
+            # a crash before the files are gone counts them twice rather than losing them
+            _write_retired(directory, retired)
+        for path in folded:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    snapshots.append(retired['total'])
+    snapshots.extend(retired['idle'].values())
+    return merge(snapshots)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return '+Inf' if value == math.inf else repr(value)
+
+
+def render(snapshot):
+    """
+    Returns: ``snapshot`` in the Prometheus text exposition format (0.0.4).
+    """
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        labelnames = metric['labelnames']
+        full_name = f'{name}_total' if metric['kind'] == 'counter' else name
+        lines.append(f'# HELP {full_name} {metric["documentation"]}')
+        lines.append(f'# TYPE {full_name} {metric["kind"]}')
+        for key, values in sorted(metric['series']):
+            if metric['kind'] == 'counter':
+                lines.append(f'{full_name}{_labels(labelnames, key)} {_number(values[0])}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'] + [math.inf], values):
+                cumulative += count
+                le = (('le', _number(float(bound))),)
+                lines.append(f'{name}_bucket{_labels(labelnames, key, le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labelnames, key)} {_number(values[-1])}')
+            lines.append(f'{name}_count{_labels(labelnames, key)} {cumulative}')
+    return '\n'.join(lines) + '\n'
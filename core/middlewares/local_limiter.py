@@ -0,0 +1,125 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from core.middlewares.rate_limit_backends import RateLimitResult
+
+
+class _Counter:
+    __slots__ = ('count', 'pending', 'expires_at', 'synced_at')
+
+    def __init__(self, count, expires_at, synced_at):
+        self.count = count
+        self.pending = 0
+        self.expires_at = expires_at
+        self.synced_at = synced_at
+
+
+class LocalRateLimiter:
+    """
+    Per-worker tier in front of a Redis rate limit backend.
+
+    It keeps two bounded LRU maps:
+
+    - clients Redis has already rejected, with the time their window resets.
+      Further requests from them get a 429 without touching Redis until then.
+    - the last count Redis reported for each client, plus the hits seen
+      locally since. With ``batch_size`` > 1 those hits are sent to Redis in
+      one weighted call once ``batch_size`` of them have piled up, once
+      ``sync_interval`` seconds have passed, or once the local estimate gets
+      within ``batch_size`` of the limit.
+
+    Each worker holds back at most ``batch_size - 1`` hits per client, so the
+    global count lags the true one by at most that times the number of
+    workers. With ``batch_size`` = 1 every allowed request still reaches Redis
+    and only the blocked-client shortcut applies. ``ahit`` does the same
+    through the backend's ``ahit``.
+    """
+
+    def __init__(self, backend, max_entries=10000, batch_size=1, sync_interval=1.0, clock=time.monotonic):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.batch_size = max(1, batch_size)
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._blocked = OrderedDict()
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, mapping, key, value):
+        mapping[key] = value
+        mapping.move_to_end(key)
+        while len(mapping) > self.max_entries:
+            mapping.popitem(last=False)
+
+    def _count_locally(self, key, limit, cost, now):
+        """
+        Record the hit locally if no sync is due.
+
+        Returns:
+            RateLimitResult, or None when the hit has to go to the backend.
+        """
+        counter = self._counters.get(key)
+        if counter is None or self.batch_size == 1:
+            return None
+        if counter.expires_at <= now:
+            del self._counters[key]
+            return None
+        pending = counter.pending + cost
+        if (
+            pending >= self.batch_size
+            or now - counter.synced_at >= self.sync_interval
+            or counter.count + pending + self.batch_size > limit
+        ):
+            return None
+        counter.pending = pending
+        self._counters.move_to_end(key)
+        return RateLimitResult(counter.count + pending, limit, math.ceil(counter.expires_at - now))
+
+    def _before(self, key, limit, cost, now):
+        """
+        Returns:
+            (RateLimitResult, None) when the hit is answered locally, else
+            (None, cost) with the cost, plus held back hits, to send to the backend.
+        """
+        with self._lock:
+            blocked_until = self._blocked.get(key)
+            if blocked_until is not None:
+                if blocked_until > now:
+                    self._blocked.move_to_end(key)
+                    return RateLimitResult(limit + 1, limit, math.ceil(blocked_until - now)), None
+                del self._blocked[key]
+
+            result = self._count_locally(key, limit, cost, now)
+            if result is not None:
+                return result, None
+
+            counter = self._counters.get(key)
+            if counter is not None:
+                cost += counter.pending
+                counter.pending = 0
+        return None, cost
+
+    def _after(self, key, result, now):
+        with self._lock:
+            if not result.allowed and result.retry_after > 0:
+                self._counters.pop(key, None)
+                self._remember(self._blocked, key, now + result.retry_after)
+            elif self.batch_size > 1 and result.retry_after > 0:
+                self._remember(self._counters, key, _Counter(result.count, now + result.retry_after, now))
+        return result
+
+    def hit(self, key, limit, window, cost=1):
+        now = self._clock()
+        result, cost = self._before(key, limit, cost, now)
+        if result is not None:
+            return result
+        return self._after(key, self.backend.hit(key, limit, window, cost=cost), now)
+
+    async def ahit(self, key, limit, window, cost=1):
+        now = self._clock()
+        result, cost = self._before(key, limit, cost, now)
+        if result is not None:
+            return result
+        return self._after(key, await self.backend.ahit(key, limit, window, cost=cost), now)
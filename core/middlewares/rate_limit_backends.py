@@ -0,0 +1,332 @@
+import asyncio
+import itertools
+import math
+import os
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from core.metrics import registry
+
+REDIS_SECONDS = registry.histogram(
+    'rate_limit_redis_seconds', 'Round trip of one rate limit script call to Redis.', ('backend',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+
+class RateLimitResult:
+    """
+    Outcome of counting one request against a limit.
+
+    retry_after is the number of seconds until the window resets, as
+    reported by Redis (0 or negative when unknown).
+    """
+
+    def __init__(self, count, limit, retry_after):
+        self.count = count
+        self.limit = limit
+        self.retry_after = retry_after
+
+    @property
+    def allowed(self):
+        return self.count <= self.limit
+
+    @property
+    def remaining(self):
+        return max(self.limit - self.count, 0)
+
+
+class RateLimitBackend:
+    """
+    Base class for rate limit backends.
+
+    Subclasses count ``cost`` hits for ``key`` and return a RateLimitResult.
+    ``ahit`` is the same for async callers; backends without a native async
+    client run ``hit`` on a worker thread.
+    """
+
+    def hit(self, key, limit, window, cost=1):
+        raise NotImplementedError
+
+    async def ahit(self, key, limit, window, cost=1):
+        return await sync_to_async(self.hit, thread_sensitive=False)(key, limit, window, cost)
+
+
+class CacheRateLimitBackend(RateLimitBackend):
+    """
+    Fixed window on top of Django's cache API.
+
+    Works with any cache backend: the time the window ends is stored next
+    to the count, as not every cache can report a key's TTL. Costs two
+    round trips per request (get_many, then incr or set_many) and can lose
+    counts when two requests race on a cold key.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+
+    def hit(self, key, limit, window, cost=1):
+        expires_key = f'{key}-expires'
+        values = cache.get_many([key, expires_key])
+        now = self._clock()
+        request_count = values.get(key)
+        expires = values.get(expires_key)
+
+        if request_count is not None and expires is not None:
+            try:
+                request_count = cache.incr(key, cost)
+            except ValueError:
+                request_count = None  # expired since the get
+
+        if request_count is None or expires is None:
+            # start a new window
+            expires = now + window
+            cache.set_many({key: cost, expires_key: expires}, timeout=window)
+            request_count = cost
+
+        return RateLimitResult(request_count, limit, math.ceil(expires - now))
+
+
+def async_connection_kwargs(options):
+    """
+    Connection arguments for a redis.asyncio client reaching the same server
+    as django-redis configured with ``options`` (the cache's OPTIONS):
+    PASSWORD, SOCKET_TIMEOUT, SOCKET_CONNECT_TIMEOUT and
+    CONNECTION_POOL_KWARGS (SSL settings and the like), with the pool size
+    from RATE_LIMIT_REDIS_MAX_CONNECTIONS. A ``connection_class`` in the
+    pool arguments is left out, it is a sync class.
+
+    Returns:
+        dict
+    """
+    kwargs = dict(options.get('CONNECTION_POOL_KWARGS', {}))
+    kwargs.pop('connection_class', None)
+    for option, name in (
+        ('PASSWORD', 'password'),
+        ('SOCKET_TIMEOUT', 'socket_timeout'),
+        ('SOCKET_CONNECT_TIMEOUT', 'socket_connect_timeout'),
+    ):
+        if options.get(option):
+            kwargs[name] = options[option]
+    kwargs['max_connections'] = settings.RATE_LIMIT_REDIS_MAX_CONNECTIONS
+    return kwargs
+
+
+class RedisScriptBackend(RateLimitBackend):
+    """
+    Base class for backends that run a Lua script on the Redis server.
+
+    The script is registered once and called with EVALSHA, so each request
+    costs a single round trip and runs atomically on the server. Subclasses
+    define ``script`` and ``arguments``; the script returns the count and
+    the seconds until the client may retry.
+
+    ``ahit`` goes through a redis.asyncio client with its own connection
+    pool (RATE_LIMIT_REDIS_MAX_CONNECTIONS), one per event loop, so async
+    requests wait on Redis without holding a thread. It connects with the
+    default cache's LOCATION and OPTIONS (see async_connection_kwargs).
+    """
+
+    script = None
+
+    def __init__(self, client=None, clock=time.time, async_client=None):
+        self._client = client
+        self._clock = clock
+        self._script = None
+        self._async_client = async_client
+        self._async_scripts = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from django_redis import get_redis_connection
+
+            self._client = get_redis_connection('default')
+        return self._client
+
+    def _async_script(self):
+        loop = asyncio.get_running_loop()
+        script = self._async_scripts.get(loop)
+        if script is None:
+            client = self._async_client
+            if client is None:
+                import redis.asyncio
+
+                location = settings.CACHES['default']['LOCATION']
+                if not isinstance(location, str):
+                    location = location[0]
+                client = redis.asyncio.from_url(
+                    location.split(',')[0], **async_connection_kwargs(settings.CACHES['default'].get('OPTIONS', {}))
+                )
+            script = self._async_scripts[loop] = client.register_script(self.script)
+        return script
+
+    def arguments(self, key, limit, window, cost):
+        """
+        Returns: (keys, args) for one call of the script.
+        """
+        raise NotImplementedError
+
+    def run(self, keys, *args):
+        if self._script is None:
+            self._script = self.client.register_script(self.script)
+        if isinstance(keys, str):
+            keys = [keys]
+        start = time.perf_counter()
+        try:
+            return self._script(keys=[cache.make_key(key) for key in keys], args=list(args))
+        finally:
+            REDIS_SECONDS.observe(time.perf_counter() - start, backend=type(self).__name__)
+
+    async def arun(self, keys, *args):
+        script = self._async_script()
+        if isinstance(keys, str):
+            keys = [keys]
+        start = time.perf_counter()
+        try:
+            return await script(keys=[cache.make_key(key) for key in keys], args=list(args))
+        finally:
+            REDIS_SECONDS.observe(time.perf_counter() - start, backend=type(self).__name__)
+
+    def hit(self, key, limit, window, cost=1):
+        keys, args = self.arguments(key, limit, window, cost)
+        count, retry_after = self.run(keys, *args)
+        return RateLimitResult(int(count), limit, int(retry_after))
+
+    async def ahit(self, key, limit, window, cost=1):
+        keys, args = self.arguments(key, limit, window, cost)
+        count, retry_after = await self.arun(keys, *args)
+        return RateLimitResult(int(count), limit, int(retry_after))
+
+
+class AtomicRateLimitBackend(RedisScriptBackend):
+    """
+    Fixed window counter: INCRBY, EXPIRE on the first hit and TTL in one step.
+    """
+
+    script = """
+    local count = redis.call('INCRBY', KEYS[1], ARGV[2])
+    if count == tonumber(ARGV[2]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[1])
+    end
+    local ttl = redis.call('TTL', KEYS[1])
+    if ttl < 0 then
+        redis.call('EXPIRE', KEYS[1], ARGV[1])
+        ttl = tonumber(ARGV[1])
+    end
+    return {count, ttl}
+    """
+
+    def arguments(self, key, limit, window, cost):
+        return key, (window, cost)
+
+
+class SlidingWindowCounterBackend(RedisScriptBackend):
+    """
+    Sliding window counter: the previous window's count is weighted by how
+    much of it still overlaps the sliding window and added to the current one.
+
+    Smooths the 2x burst a fixed window allows at its boundary while keeping
+    two small integer keys per client.
+    """
+
+    script = """
+    local window = tonumber(ARGV[1])
+    local elapsed = tonumber(ARGV[2])
+    local current = redis.call('INCRBY', KEYS[1], ARGV[3])
+    if current == tonumber(ARGV[3]) then
+        redis.call('EXPIRE', KEYS[1], window * 2)
+    end
+    local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+    local count = math.floor(previous * (window - elapsed) / window) + current
+    return {count, math.ceil(window - elapsed)}
+    """
+
+    def arguments(self, key, limit, window, cost):
+        now = self._clock()
+        index = int(now // window)
+        elapsed = now - index * window
+        return [f'{key}:{index}', f'{key}:{index - 1}'], (window, elapsed, cost)
+
+
+class SlidingLogBackend(RedisScriptBackend):
+    """
+    Sliding log: a sorted set of the timestamps of allowed requests.
+
+    Exact, but stores one entry per allowed request in the window, so memory
+    grows with the limit. Rejected requests are not logged, so a client that
+    keeps hammering is let back in as soon as its oldest entry ages out.
+    """
+
+    script = """
+    local now = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local limit = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[5])
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+    local count = redis.call('ZCARD', KEYS[1])
+    if count + cost <= limit then
+        for i = 1, cost do
+            redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. i)
+        end
+        redis.call('EXPIRE', KEYS[1], math.ceil(window))
+        count = count + cost
+    else
+        count = limit + 1
+    end
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local retry_after = window
+    if oldest[2] then
+        retry_after = tonumber(oldest[2]) + window - now
+    end
+    return {count, math.ceil(retry_after)}
+    """
+
+    def __init__(self, client=None, clock=time.time, async_client=None):
+        super().__init__(client, clock, async_client)
+        self._sequence = itertools.count()
+        self._prefix = f'{os.getpid()}-{id(self)}'
+
+    def arguments(self, key, limit, window, cost):
+        member = f'{self._prefix}-{next(self._sequence)}'
+        return key, (self._clock(), window, limit, member, cost)
+
+
+class TokenBucketBackend(RedisScriptBackend):
+    """
+    Token bucket holding ``limit`` tokens, refilled at ``limit / window`` per second.
+
+    Allows bursts up to the limit, then a steady rate. The bucket is a hash
+    of two numbers per client. retry_after is the time until the bucket is
+    full again, or until enough tokens for the request when it is rejected.
+    """
+
+    script = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local count
+    local retry_after
+    if tokens >= cost then
+        tokens = tokens - cost
+        count = capacity - math.floor(tokens)
+        retry_after = (capacity - tokens) / rate
+    else
+        count = capacity + 1
+        retry_after = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+    return {count, math.ceil(retry_after)}
+    """
+
+    def arguments(self, key, limit, window, cost):
+        return key, (limit, limit / window, self._clock(), cost)
@@ -0,0 +1,153 @@
+import functools
+import hashlib
+import math
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import get_resolver
+from django.utils.module_loading import import_string
+
+MEGABYTE = 1024 * 1024
+
+
+def client_ip(request):
+    """
+    Retrieve client IP address from request headers.
+
+    returns: str - Client IP address
+    """
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def _digest(api_key):
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def api_key_checker(api_keys):
+    """
+    Build the check for X-Api-Key values from RATE_LIMIT_API_KEYS: either
+    the accepted keys themselves or the dotted path of a callable taking a
+    key and returning whether it is valid.
+
+    Returns:
+        callable: key -> bool
+    """
+    if isinstance(api_keys, str):
+        return import_string(api_keys)
+    digests = frozenset(_digest(key) for key in api_keys)
+    return lambda api_key: _digest(api_key) in digests
+
+
+class RateLimitPolicy:
+    """
+    One quota: ``limit`` units per ``period`` seconds, per client.
+
+    key: what identifies a client, 'ip', 'user' (authenticated user, falling
+        back to the IP) or 'api_key' (the X-Api-Key header if ``valid_api_key``
+        accepts it, else the IP, so made-up keys do not get a quota of their own).
+    valid_api_key: callable checking an X-Api-Key value, by default built from
+        RATE_LIMIT_API_KEYS (see api_key_checker).
+    cost: units charged per request.
+    cost_per_mb: extra units charged per started megabyte of request body, so
+        large uploads use up the quota faster. The total is capped at the
+        limit so a single maximum-size request is still allowed once.
+    """
+
+    def __init__(self, name, limit, period, key='ip', cost=1, cost_per_mb=0, valid_api_key=None):
+        if key not in ('ip', 'user', 'api_key'):
+            raise ImproperlyConfigured(f"Rate limit policy {name!r} has unknown key {key!r}.")
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.key = key
+        self.cost = cost
+        self.cost_per_mb = cost_per_mb
+        if key == 'api_key' and valid_api_key is None:
+            valid_api_key = api_key_checker(settings.RATE_LIMIT_API_KEYS)
+        self.valid_api_key = valid_api_key
+
+    def client_id(self, request, ip, user=None):
+        """
+        ``user`` is the already resolved request user, if the caller has it;
+        async callers must pass it (from ``await request.auser()``), as
+        reading request.user loads the session and user synchronously.
+        """
+        if self.key == 'user':
+            if user is None:
+                user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                return f'user-{user.pk}'
+        elif self.key == 'api_key':
+            api_key = request.META.get('HTTP_X_API_KEY')
+            if api_key and self.valid_api_key(api_key):
+                return 'key-' + _digest(api_key)[:16]
+        return ip
+
+    def cache_key(self, client_id):
+        if self.name is None:
+            return f'rate-limit-{client_id}'
+        return f'rate-limit-{self.name}-{client_id}'
+
+    def cost_for(self, request):
+        cost = self.cost
+        if self.cost_per_mb:
+            try:
+                size = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                size = 0
+            cost += math.ceil(math.ceil(size / MEGABYTE) * self.cost_per_mb)
+        return max(1, min(cost, self.limit))
+
+
+class PolicyTable:
+    """
+    Maps request paths to policies.
+
+    ``RATE_LIMIT_POLICIES`` entries match either URL names (compiled from the
+    URLconf) or path prefixes starting with '/', and take the RateLimitPolicy
+    arguments plus an optional ``name`` used in the counter keys. All of them are compiled into
+    one alternation at init, tried in the configured order, and the answer per
+    path is kept in an LRU cache, so a request costs a dict lookup in the
+    common case and a single regex match otherwise. Paths that match nothing
+    use the global RATE_LIMIT / RATE_LIMIT_TIME_PERIOD policy.
+    """
+
+    def __init__(self, policies, default, urlconf=None, cache_size=4096):
+        self.default = default
+        self.policies = []
+        alternatives = []
+        resolver = get_resolver(urlconf)
+        for index, options in enumerate(policies):
+            options = dict(options)
+            match = options.pop('match')
+            patterns = []
+            for target in ([match] if isinstance(match, str) else match):
+                patterns.extend(self._compile_target(resolver, target))
+            options.setdefault('name', match if isinstance(match, str) else match[0])
+            self.policies.append(RateLimitPolicy(**options))
+            alternatives.append(f"(?P<p{index}>{'|'.join(patterns)})")
+        self._regex = re.compile('|'.join(alternatives)) if alternatives else None
+        self.match = functools.lru_cache(maxsize=cache_size)(self._match)
+
+    @staticmethod
+    def _compile_target(resolver, target):
+        if target.startswith('/'):
+            return [re.escape(target[1:])]
+        entries = resolver.reverse_dict.getlist(target)
+        if not entries:
+            raise ImproperlyConfigured(f"Rate limit policy matches unknown URL name {target!r}.")
+        # named groups would clash between alternatives, only the shape matters here
+        return [re.sub(r'\(\?P<\w+>', '(?:', pattern) for _, pattern, _, _ in entries]
+
+    def _match(self, path):
+        if self._regex is not None:
+            found = self._regex.match(path.lstrip('/'))
+            if found:
+                for group, value in found.groupdict().items():
+                    if value is not None:
+                        return self.policies[int(group[1:])]
+        return self.default
@@ -1,13 +1,44 @@
 import logging
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.utils.deprecation import MiddlewareMixin
-from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from core.metrics import flush_if_due, registry
+from core.renderers import dumps
+from core.middlewares.local_limiter import LocalRateLimiter
+from core.middlewares.rate_limit_policies import PolicyTable, RateLimitPolicy, client_ip
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_REQUESTS = registry.counter(
+    'rate_limit_requests', 'Requests seen by the rate limiter, by policy and outcome.', ('policy', 'result')
+)
+
+# the 429 body never changes, so it is serialized once
+RATE_LIMITED_BODY = dumps({
+    'success': False,
+    'message': 'Rate limit exceeded. Try again later.'
+})
+
 
 class RateLimitMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        backend = import_string(settings.RATE_LIMIT_BACKEND)()
+        if settings.RATE_LIMIT_LOCAL_CACHE_SIZE:
+            backend = LocalRateLimiter(
+                backend,
+                max_entries=settings.RATE_LIMIT_LOCAL_CACHE_SIZE,
+                batch_size=settings.RATE_LIMIT_LOCAL_BATCH,
+                sync_interval=settings.RATE_LIMIT_LOCAL_SYNC_INTERVAL,
+            )
+        self.backend = backend
+        self.policies = PolicyTable(
+            settings.RATE_LIMIT_POLICIES,
+            default=RateLimitPolicy(None, settings.RATE_LIMIT, settings.RATE_LIMIT_TIME_PERIOD),
+        )
+
     def _get_client_ip(self, request):
         """
         Retrieve client IP address from request headers.
@@ -15,66 +46,101 @@ class RateLimitMiddleware(MiddlewareMixin):
         returns: str - Client IP address
         
         """
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            return x_forwarded_for.split(',')[0].strip()
-        return request.META.get('REMOTE_ADDR')
+        return client_ip(request)
+
+    def _prepare(self, request, user=None):
+        """
+        Work out the policy, cache key and cost of a request. ``user`` is
+        passed on to RateLimitPolicy.client_id.
+
+        returns: (ip, policy, key, cost)
+        """
+        ip = self._get_client_ip(request)
+        policy = self.policies.match(request.path_info)
+        key = policy.cache_key(policy.client_id(request, ip, user=user))
+        return ip, policy, key, policy.cost_for(request)
+
+    def _apply(self, request, ip, policy, result):
+        """
+        returns: HttpResponse with 429 status if ``result`` is over the limit, else None
+        """
+        policy_name = policy.name or 'default'
+        limit = policy.limit
+        request_count = result.count
+
+        logger.debug("IP: %s, Request count: %s", ip, request_count)
+
+        remaining = result.remaining
+        ttl = result.retry_after  # how many seconds until reset
+
+        # check if request count exceeds limit
+        if not result.allowed:
+            RATE_LIMIT_REQUESTS.inc(policy=policy_name, result='blocked')
+            logger.warning("Rate limit exceeded for IP: %s", ip)
+            response = HttpResponse(RATE_LIMITED_BODY, content_type='application/json', status=429)
+            response["X-RateLimit-Limit"] = str(limit)
+            response["X-RateLimit-Remaining"] = "0"
+            if ttl > 0:
+                response["Retry-After"] = str(ttl)
+            return response
+
+        RATE_LIMIT_REQUESTS.inc(policy=policy_name, result='allowed')
+
+        # Attach headers for allowed requests
+        request.rate_limit_info = {
+            "limit": limit,
+            "remaining": remaining,
+            "retry_after": ttl,
+        }
+        return None
 
     def process_request(self, request):
         """
-        Middleware to limit the number of requests from a single IP address.
-        It uses Django's caching framework to track request counts and enforce limits.
+        Middleware to limit the number of requests from a single client.
+        The quota comes from the first RATE_LIMIT_POLICIES entry matching the
+        path (or the global RATE_LIMIT), and counts are tracked by the backend
+        configured in RATE_LIMIT_BACKEND.
         
-        returns: JsonResponse with 429 status if rate limit exceeded, else None
+        returns: HttpResponse with 429 status if rate limit exceeded, else None
         """
+        policy = None
         try:
-            ip = self._get_client_ip(request)
-            key = f'rate-limit-{ip}'
-
-            limit = settings.RATE_LIMIT
-            window = settings.RATE_LIMIT_TIME_PERIOD
-
-            request_count = cache.get(key)
-
-            if request_count is None:
-                # initialize or increment request count
-                cache.set(key, 1, timeout=window)
-                request_count = 1
-            else:
-                # increment
-                request_count = cache.incr(key)
-
-            logger.info(f"IP: {ip}, Request count: {request_count}")
-
-            remaining = max(limit - request_count, 0)
-            ttl = cache.ttl(key)  # how many seconds until reset
-
-            # check if request count exceeds limit
-            if request_count > limit:
-                logger.warning(f"Rate limit exceeded for IP: {ip}")
-                response = JsonResponse(
-                    {
-                        'success': False,
-                        'message': 'Rate limit exceeded. Try again later.'
-                    },
-                    status=429
-                )
-                response["X-RateLimit-Limit"] = str(limit)
-                response["X-RateLimit-Remaining"] = "0"
-                if ttl > 0:
-                    response["Retry-After"] = str(ttl)
-                return response
-
-            # Attach headers for allowed requests
-            request.rate_limit_info = {
-                "limit": limit,
-                "remaining": remaining,
-                "retry_after": ttl,
-            }
+            ip, policy, key, cost = self._prepare(request)
+            result = self.backend.hit(key, policy.limit, policy.period, cost=cost)
+            return self._apply(request, ip, policy, result)
+        except Exception as e:
+            RATE_LIMIT_REQUESTS.inc(policy=getattr(policy, 'name', None) or 'default', result='error')
+            logger.exception("Error in RateLimitMiddleware")
 
+    async def aprocess_request(self, request):
+        """
+        process_request for ASGI: the backend is awaited through ``ahit``
+        instead of running the whole check on a sync_to_async thread.
+
+        returns: HttpResponse with 429 status if rate limit exceeded, else None
+        """
+        policy = None
+        try:
+            user = None
+            if self.policies.match(request.path_info).key == 'user' and hasattr(request, 'auser'):
+                # request.user would query the session and user tables on the event loop
+                user = await request.auser()
+            ip, policy, key, cost = self._prepare(request, user)
+            result = await self.backend.ahit(key, policy.limit, policy.period, cost=cost)
+            return self._apply(request, ip, policy, result)
         except Exception as e:
+            RATE_LIMIT_REQUESTS.inc(policy=getattr(policy, 'name', None) or 'default', result='error')
             logger.exception("Error in RateLimitMiddleware")
 
+    async def __acall__(self, request):
+        # MiddlewareMixin would run process_request/process_response through
+        # sync_to_async; neither waits on the network or the disk (flush_if_due
+        # writes on a background thread), so both run on the event loop here.
+        response = await self.aprocess_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
     def process_response(self, request, response):
         """
         Add rate limit headers to the response.
@@ -86,4 +152,5 @@ class RateLimitMiddleware(MiddlewareMixin):
             response["X-RateLimit-Remaining"] = str(info["remaining"])
             if info["retry_after"] > 0:
                 response["Retry-After"] = str(info["retry_after"])
+        flush_if_due()
         return response
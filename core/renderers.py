@@ -0,0 +1,89 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib json module is used without it
+    orjson = None
+
+# datetimes go through DRF's encoder so they keep its format (milliseconds, "Z")
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+_LINE_SEPARATORS = (b'\xe2\x80\xa8', b'\xe2\x80\xa9')  # U+2028 and U+2029 in UTF-8
+
+_encoder = JSONEncoder()
+
+
+def json_engine():
+    """
+    Returns: 'orjson' when it is installed, else 'stdlib'.
+    """
+    return 'stdlib' if orjson is None else 'orjson'
+
+
+def dumps(data):
+    """
+    Serialize ``data`` to compact UTF-8 JSON, handling the same types as
+    DRF's JSONEncoder (lazy strings, Decimal, datetimes, UUIDs, numpy values).
+
+    Returns:
+        bytes
+    """
+    if orjson is None:
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+    return orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+
+
+def loads(data):
+    """
+    Parse JSON from bytes or str.
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that serializes with orjson when it is installed.
+
+    The output is the same as JSONRenderer's with the default COMPACT_JSON
+    and UNICODE_JSON settings, except that NaN and infinities become null.
+    Indented output (``Accept: application/json; indent=4``, the browsable
+    API) and non-default settings go through JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = dumps(data)
+        # escaped like JSONRenderer does, so the output is valid javascript too
+        if _LINE_SEPARATORS[0] in ret or _LINE_SEPARATORS[1] in ret:
+            ret = ret.replace(_LINE_SEPARATORS[0], b'\\u2028').replace(_LINE_SEPARATORS[1], b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser that parses with orjson when it is installed. Bodies in
+    another encoding than UTF-8, or with STRICT_JSON off (which accepts
+    NaN), go through JSONParser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding') or 'utf-8'
+        if orjson is None or not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
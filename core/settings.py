@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -128,9 +129,84 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+#API responses
+# orjson is used when it is installed (pip install orjson), else DRF's stdlib json renderer and parser
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
 #rate limit variables
 RATE_LIMIT = 100 # number of requests, change as needed
 RATE_LIMIT_TIME_PERIOD = 300  # in seconds, change as needed
+# AtomicRateLimitBackend needs django-redis; CacheRateLimitBackend works with any cache
+RATE_LIMIT_BACKEND = 'core.middlewares.rate_limit_backends.AtomicRateLimitBackend'
+# per-route quotas, first match wins; paths matching none use RATE_LIMIT / RATE_LIMIT_TIME_PERIOD
+# e.g. {'match': 'upload-file', 'limit': 20, 'period': 300, 'cost_per_mb': 1}
+#      {'match': '/admin/', 'limit': 300, 'period': 300, 'key': 'user'}
+RATE_LIMIT_POLICIES = []
+# X-Api-Key values 'api_key' policies accept, or the dotted path of a callable(key) -> bool;
+# requests with any other key are limited by IP
+RATE_LIMIT_API_KEYS = []
+# per-worker tier: blocked IPs are rejected without Redis, counts can be batched
+RATE_LIMIT_LOCAL_CACHE_SIZE = 10000  # IPs tracked per worker, 0 disables the local tier
+RATE_LIMIT_LOCAL_BATCH = 1  # hits batched per IP before syncing to Redis; allowed drift is (batch - 1) per worker
+RATE_LIMIT_LOCAL_SYNC_INTERVAL = 1.0  # seconds before a partial batch is synced anyway
+RATE_LIMIT_REDIS_MAX_CONNECTIONS = 50  # async Redis connections per event loop, used under ASGI
+
+#background upload jobs
+UPLOAD_JOB_WORKERS = 2  # threads importing async uploads per process
+UPLOAD_REQUEST_WORKERS = 8  # threads processing uploads sent to async/upload-file/ per process, apart from the jobs
+UPLOAD_JOB_DIR = Path(tempfile.gettempdir()) / 'upload_jobs'  # where queued uploads are stored
+UPLOAD_JOB_TTL = 60 * 60 * 24  # seconds a job status stays pollable
+
+#resumable chunked uploads
+UPLOAD_SESSION_DIR = Path(tempfile.gettempdir()) / 'upload_sessions'  # part files, must be shared by all workers
+UPLOAD_SESSION_TTL = 60 * 60 * 24  # seconds an unfinished upload can be resumed, part files idle longer are removed
+UPLOAD_SESSION_MAX_OPEN = 1000  # unfinished uploads with a part file before new ones get 503
+UPLOAD_SESSION_LOCK_TIMEOUT = 60 * 10  # seconds one chunk may take to write before its lock expires
+
+#repeated uploads
+UPLOAD_RESULT_CACHE_TTL = 60 * 60  # seconds an identical upload (or Idempotency-Key) replays its result, 0 disables
+
+#error reports
+UPLOAD_INLINE_ERRORS = 100  # row errors returned in the upload response, the rest only in the report file
+UPLOAD_REPORT_DIR = Path(tempfile.gettempdir()) / 'upload_reports'  # full error reports, must be shared by all workers
+UPLOAD_REPORT_TTL = 60 * 60 * 24  # seconds a report can be downloaded
+UPLOAD_REPORT_PAGE_SIZE = 1000  # row errors per page of /upload-reports/<id>/
+
+#users read API
+USERS_PAGE_SIZE = 100  # users per page of /users/
+USERS_MAX_PAGE_SIZE = 1000  # largest page_size a client may ask for
+USERS_PAGE_CACHE_TTL = 60  # seconds a page is cached, 0 disables; imports invalidate pages when they commit
+
+#pre-validation of uploads, skipped for dry runs
+PREVALIDATION_MAX_ERROR_RATE = 0.5  # reject uploads with more invalid sampled rows than this, None disables
+PREVALIDATION_HEAD_ROWS = 1000  # first rows always checked
+PREVALIDATION_SAMPLE_ROWS = 1000  # rows picked at random offsets of plain CSVs
+PREVALIDATION_MIN_ROWS = 100  # files with fewer checked rows are never rejected, they are cheap to import
+PREVALIDATION_MAX_ERRORS = 20  # row errors returned with a rejection
+
+#CSV parsing
+CSV_PARSE_ENGINE = 'auto'  # 'pyarrow' when it is installed, else 'c'; 'auto' falls back to 'c' for rows with missing or extra fields, 'pyarrow' rejects them
+CSV_MEMORY_MAP = True  # let the pyarrow engine memory-map CSVs that are parsed from a file on disk
+
+#parallel validation of large chunks
+PARALLEL_VALIDATION_THRESHOLD = 20_000  # rows per chunk before validation moves to the process pool, 0 disables
+PARALLEL_VALIDATION_WORKERS = None  # worker processes, defaults to the number of CPUs
+
+#metrics
+METRICS_DIR = Path(tempfile.gettempdir()) / 'app_metrics'  # per-worker snapshots added up by /metrics, None keeps them per process
+METRICS_FLUSH_INTERVAL = 5  # seconds between snapshots of a worker's metrics
+METRICS_STALE_AFTER = 60  # seconds without a snapshot before another host's worker is folded into retired.json
 
 #Redis settings
 CACHES = {
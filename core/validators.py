@@ -55,10 +55,12 @@ class FileValidator(object):
                                    'content_type', params)
         
         if self.allowed_extensions:
-            extension = Path(data.name).suffix[1:].lower()
+            # compound extensions such as "csv.gz" are matched against the end of the name
+            name = data.name.lower()
+            extension = ''.join(Path(name).suffixes)[1:]
             if (
                 self.allowed_extensions is not None
-                and extension not in self.allowed_extensions
+                and not any(name.endswith('.' + allowed) for allowed in self.allowed_extensions)
             ):
                 raise ValidationError(
                     self.error_messages['allowed_extensions'],
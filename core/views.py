@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from core.metrics import collect_all, render
+
+
+@require_GET
+def metrics(request):
+    """
+    Metrics of all workers in the Prometheus text format.
+
+    returns: HttpResponse with the merged counters and histograms
+    """
+    return HttpResponse(
+        render(collect_all(settings.METRICS_DIR)),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
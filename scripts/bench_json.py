@@ -0,0 +1,114 @@
+"""
+JSON render/parse benchmark for upload responses.
+
+Builds the response FileUploadView returns for an import with --errors row
+errors (every one of them inline, as with UPLOAD_INLINE_ERRORS >= --errors)
+and times, without any request handling:
+
+    render     DRF's JSONRenderer vs core.renderers.FastJSONRenderer
+    parse      DRF's JSONParser vs core.renderers.FastJSONParser, on the rendered body
+    429        JsonResponse built per request vs the pre-rendered RATE_LIMITED_BODY
+
+FastJSONRenderer and FastJSONParser use orjson when it is installed
+(pip install orjson) and otherwise fall back to the stdlib json module, in
+which case both columns measure the same thing.
+
+Usage:
+    python scripts/bench_json.py
+    python scripts/bench_json.py --errors 100000 --repeat 10
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+
+django.setup()
+
+from django.http import HttpResponse, JsonResponse
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.middlewares.rate_limiting_middleware import RATE_LIMITED_BODY
+from core.renderers import FastJSONParser, FastJSONRenderer, json_engine
+
+MESSAGES = (
+    ('email', 'Invalid email format.'),
+    ('age', 'Age must be between 1 and 120.'),
+    ('name', 'Name must not be empty.'),
+)
+
+
+def upload_payload(errors):
+    rows = []
+    for i in range(errors):
+        field, message = MESSAGES[i % len(MESSAGES)]
+        rows.append({'row': i + 2, 'errors': {field: message}})
+    return {
+        'success': True,
+        'message': 'File uploaded successfully.',
+        'data': {
+            'saved_records': errors * 9,
+            'updated_records': 0,
+            'failed_records': errors,
+            'error_counts': {f'{field}: {message}': errors // len(MESSAGES) for field, message in MESSAGES},
+            'errors': rows,
+        },
+    }
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--errors', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    payload = upload_payload(args.errors)
+    body = JSONRenderer().render(payload)
+    blocked = {'success': False, 'message': 'Rate limit exceeded. Try again later.'}
+    cases = [
+        ('render', 'JSONRenderer', lambda: JSONRenderer().render(payload)),
+        ('render', 'FastJSONRenderer', lambda: FastJSONRenderer().render(payload)),
+        ('parse', 'JSONParser', lambda: JSONParser().parse(io.BytesIO(body))),
+        ('parse', 'FastJSONParser', lambda: FastJSONParser().parse(io.BytesIO(body))),
+        ('429 x1000', 'JsonResponse', lambda: [JsonResponse(blocked, status=429) for _ in range(1000)]),
+        ('429 x1000', 'RATE_LIMITED_BODY', lambda: [
+            HttpResponse(RATE_LIMITED_BODY, content_type='application/json', status=429) for _ in range(1000)
+        ]),
+    ]
+
+    results = []
+    for operation, name, fn in cases:
+        results.append({'operation': operation, 'implementation': name, 'seconds': round(timed(fn, args.repeat), 4)})
+
+    if args.json:
+        print(json.dumps({'errors': args.errors, 'engine': json_engine(), 'results': results}, indent=2))
+        return
+    print(f"{args.errors} row errors, {len(body) / 1024 / 1024:.1f} MB of JSON, "
+          f"json engine: {json_engine()}, median of {args.repeat}")
+    baseline = {}
+    for r in results:
+        baseline.setdefault(r['operation'], r['seconds'])
+        speedup = baseline[r['operation']] / r['seconds']
+        print(f"{r['operation']:<11}{r['implementation']:<19}{r['seconds'] * 1000:>10.1f} ms  x{speedup:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+CSV parse-time benchmark for wide files.
+
+Writes a synthetic CSV with --extra-columns unused filler columns and times
+parsing it chunk by chunk (no validation, no database) with:
+
+    baseline   pd.read_csv(chunksize=...), every column, inferred types
+    c          the pandas C parser with usecols + string dtypes (CSV_PARSE_ENGINE = 'c')
+    pyarrow    pyarrow's streaming reader (CSV_PARSE_ENGINE = 'pyarrow'), if installed
+
+each from a path (memory-mapped) and from an open file object.
+
+Usage:
+    python scripts/bench_parse.py
+    python scripts/bench_parse.py --rows 200000 --extra-columns 100 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+
+django.setup()
+
+import pandas as pd
+from django.test.utils import override_settings
+
+from api.v1.services import parsing
+from api.v1.services.importer import iter_chunks
+from core.constants import CSV_CHUNK_SIZE
+from create_csv import write_synthetic
+
+
+def parse_baseline(source):
+    for _ in pd.read_csv(source, chunksize=CSV_CHUNK_SIZE):
+        pass
+
+
+def parse_engine(engine):
+    def parse(source):
+        with override_settings(CSV_PARSE_ENGINE=engine):
+            for _ in iter_chunks(source):
+                pass
+    return parse
+
+
+def timed(parse, path, from_path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if from_path:
+            parse(path)
+        else:
+            with open(path, 'rb') as handle:
+                parse(handle)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--extra-columns', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    cases = {'baseline': parse_baseline, 'c': parse_engine('c')}
+    if parsing.pa is not None:
+        cases['pyarrow'] = parse_engine('pyarrow')
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic(os.path.join(tmp, 'wide.csv'), args.rows, extra_columns=args.extra_columns)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        for name, parse in cases.items():
+            for from_path in (True, False):
+                seconds = timed(parse, path, from_path, args.repeat)
+                results.append({
+                    'parser': name,
+                    'source': 'path' if from_path else 'file object',
+                    'seconds': round(seconds, 3),
+                    'rows_per_sec': round(args.rows / seconds, 1),
+                    'mb_per_sec': round(size_mb / seconds, 1),
+                })
+
+    if args.json:
+        print(json.dumps({'rows': args.rows, 'extra_columns': args.extra_columns, 'results': results}, indent=2))
+        return
+    print(f"{args.rows} rows, {args.extra_columns + 3} columns, {size_mb:.1f} MB, median of {args.repeat}")
+    baseline = {r['source']: r['seconds'] for r in results if r['parser'] == 'baseline'}
+    for r in results:
+        speedup = baseline[r['source']] / r['seconds']
+        print(f"{r['parser']:<10}{r['source']:<13}{r['seconds']:>8.3f} s {r['rows_per_sec']:>12} rows/s "
+              f"{r['mb_per_sec']:>8} MB/s  x{speedup:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Microbenchmark for the rate limit backends in core/middlewares/rate_limit_backends.py.
+
+For every algorithm it sends --requests hits spread over --clients IPs and
+reports the per-request latency and the Redis memory used per tracked IP.
+
+Usage:
+    python scripts/bench_rate_limit.py
+    python scripts/bench_rate_limit.py --redis-url redis://127.0.0.1:6379/15 --requests 50000
+
+Without --redis-url it runs offline against fakeredis, which is good for
+comparing the algorithms with each other; use a real Redis for absolute
+latency and for MEMORY USAGE figures (fakeredis falls back to DUMP sizes).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+
+django.setup()
+
+from django.core.cache import cache
+
+from core.middlewares.rate_limit_backends import (
+    AtomicRateLimitBackend,
+    SlidingLogBackend,
+    SlidingWindowCounterBackend,
+    TokenBucketBackend,
+)
+
+BACKENDS = {
+    'fixed_window': AtomicRateLimitBackend,
+    'sliding_window_counter': SlidingWindowCounterBackend,
+    'sliding_log': SlidingLogBackend,
+    'token_bucket': TokenBucketBackend,
+}
+KEY_PREFIX = 'bench-rate-limit-'
+
+
+def get_client(redis_url):
+    if redis_url:
+        import redis
+
+        return redis.Redis.from_url(redis_url)
+    import fakeredis
+
+    return fakeredis.FakeRedis()
+
+
+def key_memory(client, key):
+    try:
+        return client.memory_usage(key) or 0, 'memory_usage'
+    except Exception:
+        pass
+    try:
+        dumped = client.dump(key)
+        return (len(dumped) if dumped else 0), 'dump'
+    except Exception:
+        return 0, 'unavailable'
+
+
+def run(name, backend_class, client, requests, clients, limit, window):
+    client.flushdb()
+    backend = backend_class(client=client)
+    backend.hit(f'{KEY_PREFIX}warmup', limit, window)  # loads the script
+    client.flushdb()
+
+    latencies = []
+    for i in range(requests):
+        key = f'{KEY_PREFIX}10.0.{(i % clients) // 256}.{(i % clients) % 256}'
+        start = time.perf_counter_ns()
+        backend.hit(key, limit, window)
+        latencies.append(time.perf_counter_ns() - start)
+
+    pattern = cache.make_key(KEY_PREFIX) + '*'
+    total, method = 0, 'memory_usage'
+    for key in client.scan_iter(match=pattern, count=1000):
+        size, method = key_memory(client, key)
+        total += size
+
+    latencies.sort()
+    return {
+        'algorithm': name,
+        'requests': requests,
+        'clients': clients,
+        'mean_us': round(statistics.fmean(latencies) / 1000, 2),
+        'p50_us': round(latencies[len(latencies) // 2] / 1000, 2),
+        'p99_us': round(latencies[int(len(latencies) * 0.99)] / 1000, 2),
+        'bytes_per_client': round(total / clients, 1),
+        'memory_method': method,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--redis-url', help='Redis to benchmark against (default: in-process fakeredis)')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--window', type=int, default=300)
+    parser.add_argument('--algorithm', choices=sorted(BACKENDS), action='append',
+                        help='only run these algorithms (repeatable)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    client = get_client(args.redis_url)
+    results = [
+        run(name, BACKENDS[name], client, args.requests, args.clients, args.limit, args.window)
+        for name in (args.algorithm or BACKENDS)
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'algorithm':<24}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'bytes/ip':>12}")
+    for result in results:
+        print(f"{result['algorithm']:<24}{result['mean_us']:>10}{result['p50_us']:>10}"
+              f"{result['p99_us']:>10}{result['bytes_per_client']:>12}")
+
+
+if __name__ == '__main__':
+    main()
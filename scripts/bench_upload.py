@@ -0,0 +1,185 @@
+"""
+Upload throughput benchmark.
+
+Generates reproducible CSVs with scripts/create_csv.py, runs each one through
+FileUploadSerializer and through the full /v1/api/upload-file/ endpoint, and
+reports rows/sec, peak RSS and the number of SQL queries. Every case runs in
+a fresh process against a fresh SQLite database, with an in-process
+fakeredis standing in for Redis, so it needs no services and peak RSS is
+per case.
+
+Usage:
+    python scripts/bench_upload.py                                  # 10k, 100k and 1M rows
+    python scripts/bench_upload.py --sizes 10000 --target serializer
+    python scripts/bench_upload.py --output before.json
+    python scripts/bench_upload.py --output after.json --compare before.json
+
+Results are written as JSON (default bench_results/upload-<commit>.json) so
+runs from different commits can be compared with --compare. Note that the
+endpoint cases build the multipart body in memory through Django's test
+client, which adds roughly the file size to their peak RSS.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from create_csv import write_synthetic
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+TARGETS = ('serializer', 'endpoint')
+
+
+def _setup_django(db_path, redis_url):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['testserver']
+    settings.DEBUG = False
+    settings.RATE_LIMIT = 10 ** 9
+    options = {'CLIENT_CLASS': 'django_redis.client.DefaultClient'}
+    if not redis_url:
+        import fakeredis
+
+        options['CONNECTION_POOL_KWARGS'] = {
+            'connection_class': fakeredis.FakeConnection,
+            'server': fakeredis.FakeServer(),
+        }
+    settings.CACHES = {'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': redis_url or 'redis://127.0.0.1:6379/1',
+        'OPTIONS': options,
+    }}
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def run_case(csv_path, rows, target, redis_url):
+    """
+    Import ``csv_path`` once through ``target`` in this (fresh) process.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup_django(os.path.join(tmp, 'bench.sqlite3'), redis_url)
+
+        from django.core.files.uploadedfile import UploadedFile
+        from django.db import connection
+        from django.test import Client
+
+        from api.v1.serializers.uploader import FileUploadSerializer
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with open(csv_path, 'rb') as handle, connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            if target == 'serializer':
+                upload = UploadedFile(handle, name=os.path.basename(csv_path), size=os.path.getsize(csv_path))
+                serializer = FileUploadSerializer(data={'csv_file': upload})
+                if not serializer.is_valid():
+                    raise RuntimeError(serializer.errors)
+                result = serializer.save()
+            else:
+                response = Client().post('/v1/api/upload-file/', {'csv_file': handle})
+                if response.status_code != 200:
+                    raise RuntimeError(response.content[:500])
+                result = response.json()['data']
+            seconds = time.perf_counter() - start
+
+    return {
+        'target': target,
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'queries': queries,
+        'saved_records': result['saved_records'],
+        'failed_records': result['failed_records'],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results, previous_path):
+    with open(previous_path) as handle:
+        previous = {(case['target'], case['rows']): case for case in json.load(handle)['cases']}
+    print(f"\ncompared with {previous_path}")
+    for case in results['cases']:
+        before = previous.get((case['target'], case['rows']))
+        if before:
+            change = (case['rows_per_sec'] / before['rows_per_sec'] - 1) * 100
+            print(f"{case['target']:<12}{case['rows']:>10}  rows/sec {change:+.1f}%  "
+                  f"rss {case['peak_rss_mb'] - before['peak_rss_mb']:+.1f} MB  "
+                  f"queries {case['queries'] - before['queries']:+d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--target', choices=TARGETS, action='append', help='serializer and/or endpoint (default both)')
+    parser.add_argument('--invalid-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--redis-url', help='use a real Redis instead of in-process fakeredis')
+    parser.add_argument('--output', help='JSON results file')
+    parser.add_argument('--compare', help='earlier JSON results to compare against')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'invalid_ratio': args.invalid_ratio,
+        'seed': args.seed,
+        'cases': [],
+    }
+    spawn = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            csv_path = write_synthetic(os.path.join(tmp, f'{rows}.csv'), rows, args.invalid_ratio, args.seed)
+            for target in args.target or TARGETS:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    case = pool.submit(run_case, csv_path, rows, target, args.redis_url).result()
+                results['cases'].append(case)
+                print(f"{target:<12}{rows:>10} rows  {case['rows_per_sec']:>12} rows/sec  "
+                      f"{case['peak_rss_mb']:>8} MB  {case['queries']:>6} queries")
+
+    output = args.output or os.path.join(BASE_DIR, 'bench_results', f'upload-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(results, handle, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,56 +1,128 @@
+"""
+Generate CSV files for the uploader.
+
+Without arguments it writes the 50-row sample test_files/test_data.csv.
+With --rows it writes a synthetic file of that size instead, with a chosen
+share of invalid rows, reproducible for a given --seed:
+
+    python scripts/create_csv.py --rows 100000 --invalid-ratio 0.1 --output /tmp/users_100k.csv
+"""
+import argparse
+import csv
 import os
+import random
+
 import pandas as pd
 
 output_dir = os.path.join(os.path.dirname(__file__), '../test_files')
-os.makedirs(output_dir, exist_ok=True)
-
-rows = []
-
-# 10 valid rows
-for i in range(10):
-    rows.append({
-        "name": f"ValidUser{i}",
-        "email": f"valid{i}@example.com",
-        "age": 25 + i
-    })
-
-# 10 rows with missing columns (no age)
-for i in range(10, 20):
-    rows.append({
-        "name": f"MissingAgeUser{i}",
-        "email": f"missingage{i}@example.com",
-        # "age" omitted
-    })
-
-# 10 rows with invalid email
-for i in range(20, 30):
-    rows.append({
-        "name": f"InvalidEmailUser{i}",
-        "email": f"invalidemail{i}",  # invalid email
-        "age": 30
-    })
-
-# 10 rows with duplicate emails (same as first valid)
-for i in range(30, 40):
-    rows.append({
-        "name": f"DuplicateEmailUser{i}",
-        "email": "valid0@example.com",  # duplicate of first valid
-        "age": 35
-    })
-
-# 10 rows with invalid age
-for i in range(40, 45):
-    rows.append({
-        "name": f"InvalidAgeUser{i}",
-        "email": f"invalidage{i}@example.com",
-        "age": -5  # invalid age
-    })
-for i in range(45, 50):
-    rows.append({
-        "name": f"InvalidAgeUser{i}",
-        "email": f"invalidage{i}@example.com",
-        "age": "abc"  # invalid age
-    })
-
-df = pd.DataFrame(rows)
-df.to_csv(os.path.join(output_dir, "test_data.csv"), index=False)
\ No newline at end of file
+
+# kinds of broken rows mixed into synthetic files, picked uniformly
+INVALID_KINDS = ('missing_age', 'invalid_email', 'duplicate_email', 'negative_age', 'text_age', 'empty_name')
+
+
+def write_sample(path):
+    rows = []
+
+    # 10 valid rows
+    for i in range(10):
+        rows.append({
+            "name": f"ValidUser{i}",
+            "email": f"valid{i}@example.com",
+            "age": 25 + i
+        })
+
+    # 10 rows with missing columns (no age)
+    for i in range(10, 20):
+        rows.append({
+            "name": f"MissingAgeUser{i}",
+            "email": f"missingage{i}@example.com",
+            # "age" omitted
+        })
+
+    # 10 rows with invalid email
+    for i in range(20, 30):
+        rows.append({
+            "name": f"InvalidEmailUser{i}",
+            "email": f"invalidemail{i}",  # invalid email
+            "age": 30
+        })
+
+    # 10 rows with duplicate emails (same as first valid)
+    for i in range(30, 40):
+        rows.append({
+            "name": f"DuplicateEmailUser{i}",
+            "email": "valid0@example.com",  # duplicate of first valid
+            "age": 35
+        })
+
+    # 10 rows with invalid age
+    for i in range(40, 45):
+        rows.append({
+            "name": f"InvalidAgeUser{i}",
+            "email": f"invalidage{i}@example.com",
+            "age": -5  # invalid age
+        })
+    for i in range(45, 50):
+        rows.append({
+            "name": f"InvalidAgeUser{i}",
+            "email": f"invalidage{i}@example.com",
+            "age": "abc"  # invalid age
+        })
+
+    df = pd.DataFrame(rows)
+    df.to_csv(path, index=False)
+
+
+def synthetic_rows(rows, invalid_ratio=0.1, seed=0, extra_columns=0):
+    """
+    Yield ``rows`` CSV records, about ``invalid_ratio`` of them broken in one
+    of the INVALID_KINDS ways. ``extra_columns`` adds unused filler columns.
+    """
+    rng = random.Random(seed)
+    filler = [f"filler-{n}" for n in range(extra_columns)]
+    for i in range(rows):
+        name, email, age = f"User{i}", f"user{i}@example.com", str(rng.randint(1, 120))
+        if rng.random() < invalid_ratio:
+            kind = rng.choice(INVALID_KINDS)
+            if kind == 'missing_age':
+                age = ''
+            elif kind == 'invalid_email':
+                email = f"user{i}.example.com"
+            elif kind == 'duplicate_email' and i:
+                email = f"user{rng.randrange(i)}@example.com"
+            elif kind == 'negative_age':
+                age = str(-rng.randint(1, 99))
+            elif kind == 'text_age':
+                age = 'abc'
+            elif kind == 'empty_name':
+                name = ''
+        yield [name, email, age, *filler]
+
+
+def write_synthetic(path, rows, invalid_ratio=0.1, seed=0, extra_columns=0):
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['name', 'email', 'age', *(f"extra_{n}" for n in range(extra_columns))])
+        writer.writerows(synthetic_rows(rows, invalid_ratio, seed, extra_columns))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, help='write a synthetic file with this many rows')
+    parser.add_argument('--invalid-ratio', type=float, default=0.1, help='share of broken rows (default 0.1)')
+    parser.add_argument('--extra-columns', type=int, default=0, help='unused filler columns to add')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write')
+    args = parser.parse_args()
+
+    if args.rows is None:
+        os.makedirs(output_dir, exist_ok=True)
+        write_sample(args.output or os.path.join(output_dir, "test_data.csv"))
+        return
+    output = args.output or os.path.join(output_dir, f"synthetic_{args.rows}.csv")
+    write_synthetic(output, args.rows, args.invalid_ratio, args.seed, args.extra_columns)
+
+
+if __name__ == '__main__':
+    main()
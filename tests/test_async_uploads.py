@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+from unittest.mock import patch
+import fakeredis
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from core.middlewares.local_limiter import LocalRateLimiter
+from core.middlewares.rate_limit_backends import (
+    AtomicRateLimitBackend,
+    SlidingLogBackend,
+    SlidingWindowCounterBackend,
+    TokenBucketBackend,
+)
+from core.middlewares.rate_limiting_middleware import RateLimitMiddleware
+from api.v1.services.jobs import run_in_pool
+from tests.test_rate_limit import FakeClock
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+
+async def run_on_test_thread(fn, *args, **kwargs):
+    """Stands in for run_in_pool so the test database sees the import."""
+    return await sync_to_async(fn)(*args, **kwargs)
+
+
+class AsyncBackendTests(SimpleTestCase):
+    async def test_ahit_matches_hit(self):
+        for backend_class in (AtomicRateLimitBackend, SlidingWindowCounterBackend, SlidingLogBackend, TokenBucketBackend):
+            sync_backend = backend_class(client=fakeredis.FakeRedis(), clock=FakeClock())
+            async_backend = backend_class(async_client=fakeredis.FakeAsyncRedis(), clock=FakeClock())
+            expected = [await sync_to_async(sync_backend.hit)("rate-limit-1.2.3.4", 3, 60) for _ in range(4)]
+            results = [await async_backend.ahit("rate-limit-1.2.3.4", 3, 60) for _ in range(4)]
+            self.assertEqual(
+                [(r.count, r.allowed, r.retry_after) for r in results],
+                [(r.count, r.allowed, r.retry_after) for r in expected],
+                backend_class.__name__,
+            )
+
+    async def test_local_tier_skips_backend_for_blocked_clients(self):
+        backend = AtomicRateLimitBackend(async_client=fakeredis.FakeAsyncRedis())
+        limiter = LocalRateLimiter(backend, clock=FakeClock())
+        with patch.object(backend, "arun", wraps=backend.arun) as arun:
+            results = [await limiter.ahit("rate-limit-1.2.3.4", 2, 60) for _ in range(6)]
+        self.assertEqual([result.allowed for result in results], [True, True] + [False] * 4)
+        self.assertEqual(arun.call_count, 3)
+
+    @override_settings(RATE_LIMIT_REDIS_MAX_CONNECTIONS=5, CACHES={"default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "rediss://redis.example.com:6380/1",
+        "OPTIONS": {
+            "PASSWORD": "secret",
+            "SOCKET_TIMEOUT": 2,
+            "CONNECTION_POOL_KWARGS": {"ssl_cert_reqs": None, "max_connections": 100},
+        },
+    }})
+    async def test_async_client_uses_cache_options(self):
+        with patch("redis.asyncio.from_url", return_value=fakeredis.FakeAsyncRedis()) as from_url:
+            result = await AtomicRateLimitBackend().ahit("rate-limit-1.2.3.4", 3, 60)
+        self.assertEqual(result.count, 1)
+        from_url.assert_called_once_with(
+            "rediss://redis.example.com:6380/1",
+            password="secret", socket_timeout=2, ssl_cert_reqs=None, max_connections=5,
+        )
+
+    def test_run_in_pool_uses_worker_thread(self):
+        name = threading.current_thread().name
+        worker = asyncio.run(run_in_pool(lambda: threading.current_thread().name))
+        self.assertNotEqual(worker, name)
+        self.assertTrue(worker.startswith("upload-request"))
+
+
+@patch("api.v1.views.async_uploader.run_in_pool", run_on_test_thread)
+class AsyncUploadViewTests(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        cache.clear()
+
+    def get_file(self, content):
+        return SimpleUploadedFile("test.csv", content.encode("utf-8"), content_type="text/csv")
+
+    async def test_upload_matches_sync_view(self):
+        csv_content = "name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\n"
+        response = await self.client.post("/v1/api/async/upload-file/", {"csv_file": self.get_file(csv_content)})
+        logger.debug(f"Async upload response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["saved_records"], 1)
+        self.assertEqual(data["failed_records"], 1)
+        self.assertIn("parse;dur=", response.headers["Server-Timing"])
+        self.assertIn("X-RateLimit-Remaining", response.headers)
+
+    async def test_invalid_upload_is_rejected(self):
+        response = await self.client.post("/v1/api/async/upload-file/", {"csv_file": self.get_file("name,email\nA,a@b.com\n")})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()["success"])
+
+    @override_settings(RATE_LIMIT=2, RATE_LIMIT_TIME_PERIOD=60)
+    async def test_middleware_counts_without_sync_hop(self):
+        with patch.object(RateLimitMiddleware, "process_request", side_effect=AssertionError("sync path used")):
+            statuses = []
+            for _ in range(3):
+                response = await self.client.get("/v1/api/async/upload-file/")
+                statuses.append(response.status_code)
+        self.assertEqual(statuses, [405, 405, 429])
+
+    @override_settings(RATE_LIMIT=100, RATE_LIMIT_POLICIES=[{"match": "/metrics", "limit": 2, "period": 60, "key": "user"}])
+    async def test_user_policy_counts_logged_in_clients(self):
+        user = await User.objects.acreate(username="alice")
+        await self.client.aforce_login(user)
+        statuses = []
+        for _ in range(4):
+            response = await self.client.get("/metrics")
+            statuses.append(response.status_code)
+        self.assertEqual(statuses, [200, 200, 429, 429])
@@ -0,0 +1,146 @@
+import logging
+import os
+import tempfile
+import time
+from unittest.mock import patch
+from django.test import TestCase, Client, override_settings
+from django.core.cache import cache
+from models.models import User
+from api.v1.services.chunked_uploads import session_path
+from api.v1.views import chunked_uploads as views
+from tests.test_upload_jobs import InlineExecutor
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+CSV_CONTENT = b"name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\nCarol,carol@example.com,41\n"
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(UPLOAD_SESSION_DIR=directory.name, UPLOAD_JOB_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def start(self, content=CSV_CONTENT, filename="users.csv"):
+        response = self.client.post('/v1/api/uploads/', {"filename": filename, "size": len(content)})
+        logger.debug(f"Init response: {response.content.decode()}")
+        return response
+
+    def put(self, url, content, first, total=len(CSV_CONTENT)):
+        return self.client.put(
+            url, content, content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {first}-{first + len(content) - 1}/{total}",
+        )
+
+    def test_chunks_are_assembled_and_imported(self):
+        data = self.start().json()["data"]
+        self.assertEqual(data["offset"], 0)
+
+        response = self.put(data["upload_url"], CSV_CONTENT[:30], 0)
+        self.assertEqual(response.json()["data"]["offset"], 30)
+        # the response was lost and the client re-sends an overlapping range
+        response = self.put(data["upload_url"], CSV_CONTENT[20:60], 20)
+        self.assertEqual(response.json()["data"]["offset"], 60)
+        self.assertEqual(self.client.get(data["upload_url"]).json()["data"]["offset"], 60)
+        response = self.put(data["upload_url"], CSV_CONTENT[60:], 60)
+        self.assertEqual(response.json()["data"]["offset"], len(CSV_CONTENT))
+
+        response = self.client.post(data["complete_url"])
+        logger.debug(f"Complete response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["saved_records"], 2)
+        self.assertEqual(response.json()["data"]["failed_records"], 1)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(self.client.get(data["upload_url"]).status_code, 404)
+
+    def test_gap_is_rejected_with_resume_offset(self):
+        data = self.start().json()["data"]
+        self.put(data["upload_url"], CSV_CONTENT[:10], 0)
+        response = self.put(data["upload_url"], CSV_CONTENT[20:30], 20)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["data"]["offset"], 10)
+
+    def test_bad_content_range(self):
+        data = self.start().json()["data"]
+        response = self.client.put(data["upload_url"], b"abc", content_type="application/octet-stream")
+        self.assertEqual(response.status_code, 400)
+        response = self.put(data["upload_url"], CSV_CONTENT, 0, total=len(CSV_CONTENT) + 1)
+        self.assertEqual(response.status_code, 400)
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        data = self.start().json()["data"]
+        self.put(data["upload_url"], CSV_CONTENT[:10], 0)
+        response = self.client.post(data["complete_url"])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["data"]["offset"], 10)
+
+    def test_declared_file_is_validated(self):
+        response = self.start(filename="users.xlsx")
+        self.assertEqual(response.status_code, 400)
+        response = self.start(content=b"")
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_columns_on_complete(self):
+        content = b"name,email\nA,a@b.com\n"
+        data = self.start(content).json()["data"]
+        self.put(data["upload_url"], content, 0, total=len(content))
+        response = self.client.post(data["complete_url"])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("must contain the following columns", response.json()["errors"]["non_field_errors"])
+
+    @patch("api.v1.services.jobs.get_executor", InlineExecutor)
+    @patch("api.v1.services.jobs.connections.close_all", lambda: None)
+    def test_async_complete_queues_job(self):
+        data = self.start().json()["data"]
+        self.put(data["upload_url"], CSV_CONTENT, 0)
+        response = self.client.post(data["complete_url"] + "?async=true")
+        self.assertEqual(response.status_code, 202)
+        job = self.client.get(response.json()["data"]["status_url"]).json()["data"]
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["saved_records"], 2)
+
+    def test_concurrent_complete_imports_once(self):
+        data = self.start().json()["data"]
+        self.put(data["upload_url"], CSV_CONTENT, 0)
+        import_csv = views.import_csv
+        concurrent = []
+
+        def importing(*args, **kwargs):
+            concurrent.append(self.client.post(data["complete_url"]))
+            return import_csv(*args, **kwargs)
+
+        with patch.object(views, "import_csv", side_effect=importing) as patched:
+            response = self.client.post(data["complete_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(patched.call_count, 1)
+        self.assertIn(concurrent[0].status_code, (404, 409))
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_abandoned_part_files_are_swept(self):
+        stale = session_path(self.start().json()["data"]["upload_id"])
+        old = time.time() - 2 * 60 * 60 * 24
+        os.utime(stale, (old, old))
+        fresh = session_path(self.start().json()["data"]["upload_id"])
+        self.assertFalse(stale.exists())
+        self.assertTrue(fresh.exists())
+
+    @override_settings(UPLOAD_SESSION_MAX_OPEN=1)
+    def test_open_sessions_are_capped(self):
+        self.assertEqual(self.start().status_code, 201)
+        self.assertEqual(self.start().status_code, 503)
+
+    def test_unknown_upload(self):
+        response = self.client.get('/v1/api/uploads/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,101 @@
+import io
+import logging
+import unittest
+from unittest.mock import patch
+from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from api.v1.serializers.uploader import FileUploadSerializer
+from api.v1.services import columnar
+from models.models import User
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+ROWS = {
+    "name": ["Alice", "Bob", "Carol"],
+    "email": ["alice@example.com", "bademail", "carol@example.com"],
+    "age": [25, 30, 200],
+    "department": ["a", "b", "c"],
+}
+
+requires_pyarrow = unittest.skipIf(columnar.pa is None, "pyarrow is not installed")
+
+
+def arrow_table():
+    return columnar.pa.table(ROWS)
+
+
+class ColumnarUploadTests(TestCase):
+    def upload(self, file):
+        serializer = FileUploadSerializer(data={"csv_file": file})
+        if not serializer.is_valid():
+            logger.warning("Validation errors: %s", serializer.errors)
+            return serializer
+        result = serializer.save()
+        logger.debug("Upload result: %s", result)
+        return result
+
+    def assert_imported(self, result):
+        self.assertEqual(result["saved_records"], 1)
+        self.assertEqual(result["failed_records"], 2)
+        self.assertEqual(result["errors"], [
+            {"row": 3, "errors": {"email": "Invalid email format."}},
+            {"row": 4, "errors": {"age": "Age must be between 1 and 120."}},
+        ])
+        self.assertEqual(list(User.objects.values_list("email", "age")), [("alice@example.com", 25)])
+
+    def test_ndjson(self):
+        lines = "\n".join(
+            f'{{"name": "{n}", "email": "{e}", "age": {a}, "department": "{d}"}}'
+            for n, e, a, d in zip(*ROWS.values())
+        )
+        self.assert_imported(self.upload(SimpleUploadedFile("users.ndjson", lines.encode())))
+
+    def test_ndjson_missing_columns(self):
+        serializer = self.upload(SimpleUploadedFile("users.jsonl", b'{"name": "A", "email": "a@b.com"}\n'))
+        self.assertIn("CSV file must contain the following columns", str(serializer.errors["non_field_errors"][0]))
+
+    @requires_pyarrow
+    def test_parquet(self):
+        buffer = io.BytesIO()
+        columnar.pq.write_table(arrow_table(), buffer)
+        self.assert_imported(self.upload(SimpleUploadedFile("users.parquet", buffer.getvalue())))
+
+    @requires_pyarrow
+    def test_parquet_reads_only_required_columns(self):
+        buffer = io.BytesIO()
+        columnar.pq.write_table(arrow_table(), buffer)
+        with patch.object(columnar.pq.ParquetFile, "iter_batches", autospec=True,
+                          side_effect=columnar.pq.ParquetFile.iter_batches) as iter_batches:
+            self.upload(SimpleUploadedFile("users.parquet", buffer.getvalue()))
+        self.assertEqual(iter_batches.call_args.kwargs["columns"], ["name", "email", "age"])
+
+    @requires_pyarrow
+    def test_arrow_file_from_disk_in_several_batches(self):
+        upload = TemporaryUploadedFile("users.arrow", "application/octet-stream", 0, None)
+        with columnar.pa.ipc.new_file(upload, arrow_table().schema) as writer:
+            for batch in arrow_table().to_batches(max_chunksize=2):
+                writer.write_batch(batch)
+        upload.size = upload.tell()
+        upload.seek(0)
+        with patch("api.v1.services.importer.CSV_CHUNK_SIZE", 1):
+            self.assert_imported(self.upload(upload))
+
+    @requires_pyarrow
+    def test_arrow_stream(self):
+        buffer = io.BytesIO()
+        with columnar.pa.ipc.new_stream(buffer, arrow_table().schema) as writer:
+            writer.write_table(arrow_table())
+        self.assert_imported(self.upload(SimpleUploadedFile("users.arrow", buffer.getvalue())))
+
+    @requires_pyarrow
+    def test_corrupt_parquet(self):
+        serializer = self.upload(SimpleUploadedFile("users.parquet", b"name,email,age\n"))
+        self.assertIn("Error reading CSV file", str(serializer.errors["non_field_errors"][0]))
@@ -0,0 +1,94 @@
+import bz2
+import gzip
+import io
+import logging
+import unittest
+import zipfile
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import serializers
+from api.v1.serializers.uploader import FileUploadSerializer
+from api.v1.services import compression
+from models.models import User
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+CSV_CONTENT = b"name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\nCarol,carol@example.com,41\n"
+
+
+def zipped(*members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+class CompressedUploadTests(TestCase):
+    def upload(self, name, content):
+        serializer = FileUploadSerializer(data={"csv_file": SimpleUploadedFile(name, content)})
+        if not serializer.is_valid():
+            logger.warning("Validation errors: %s", serializer.errors)
+            return serializer
+        return serializer.save()
+
+    def assert_imported(self, result):
+        logger.debug("Upload result: %s", result)
+        self.assertEqual(result["saved_records"], 2)
+        self.assertEqual(result["failed_records"], 1)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_gzip(self):
+        self.assert_imported(self.upload("users.csv.gz", gzip.compress(CSV_CONTENT)))
+
+    def test_bz2(self):
+        self.assert_imported(self.upload("users.CSV.BZ2", bz2.compress(CSV_CONTENT)))
+
+    def test_single_entry_zip(self):
+        self.assert_imported(self.upload("users.zip", zipped(("export/users.csv", CSV_CONTENT))))
+
+    @unittest.skipIf(compression.zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        data = compression.zstandard.ZstdCompressor().compress(CSV_CONTENT)
+        self.assert_imported(self.upload("users.csv.zst", data))
+
+    def test_streams_compressed_file_in_chunks(self):
+        with patch("api.v1.services.importer.CSV_CHUNK_SIZE", 1):
+            self.assert_imported(self.upload("users.csv.gz", gzip.compress(CSV_CONTENT)))
+
+    def test_zip_with_several_entries_is_rejected(self):
+        serializer = self.upload("users.zip", zipped(("a.csv", CSV_CONTENT), ("b.csv", CSV_CONTENT)))
+        self.assertIn("exactly one file", str(serializer.errors["non_field_errors"][0]))
+
+    def test_corrupt_archive_is_rejected(self):
+        serializer = self.upload("users.csv.gz", b"not gzip at all")
+        self.assertIn("Error reading CSV file", str(serializer.errors["non_field_errors"][0]))
+
+    def test_unsupported_extension(self):
+        serializer = self.upload("users.tar.gz", gzip.compress(CSV_CONTENT))
+        self.assertIn('"tar.gz" is not allowed', str(serializer.errors["csv_file"][0]))
+
+    @override_settings(PREVALIDATION_MAX_ERROR_RATE=None)  # the sampled head would hit the limit first
+    def test_decompressed_size_limit(self):
+        bomb = gzip.compress(CSV_CONTENT + b"Dan,dan@example.com,50\n" * 100_000)
+        # large enough for the header, far too small for the rows
+        with patch("api.v1.services.compression.MAX_DECOMPRESSED_SIZE", 512 * 1024):
+            serializer = FileUploadSerializer(data={"csv_file": SimpleUploadedFile("users.csv.gz", bomb)})
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            with self.assertRaisesMessage(serializers.ValidationError, "Decompressed file is larger than"):
+                serializer.save()
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_zip_declared_size_limit(self):
+        with patch("api.v1.services.compression.MAX_DECOMPRESSED_SIZE", 16):
+            serializer = self.upload("users.zip", zipped(("users.csv", CSV_CONTENT)))
+        self.assertIn("Decompressed file is larger than", str(serializer.errors["non_field_errors"][0]))
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import logging
+import shutil
+import tempfile
+import uuid
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from api.v1.services.error_reports import ErrorReport, report_path
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+REPORT_DIR = tempfile.mkdtemp(prefix="upload_reports_test_")
+
+
+def tearDownModule():
+    shutil.rmtree(REPORT_DIR, ignore_errors=True)
+
+
+def csv_bytes(good, bad):
+    rows = [f"User {i},user{i}@example.com,30" for i in range(good)]
+    rows += [f"Broken {i},not-an-email,{200 + i % 2}" for i in range(bad)]
+    return ("name,email,age\n" + "\n".join(rows) + "\n").encode("utf-8")
+
+
+def body(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@override_settings(UPLOAD_INLINE_ERRORS=10, UPLOAD_REPORT_PAGE_SIZE=100, UPLOAD_REPORT_DIR=REPORT_DIR)
+class ErrorReportTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def upload(self, content):
+        upload = SimpleUploadedFile("test.csv", content, content_type="text/csv")
+        response = self.client.post("/v1/api/upload-file/", {"csv_file": upload})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def test_inline_errors_are_capped_and_counted(self):
+        data = self.upload(csv_bytes(good=750, bad=250))
+        self.assertEqual(data["failed_records"], 250)
+        self.assertEqual(len(data["errors"]), 10)
+        self.assertEqual(data["errors"][0]["row"], 752)
+        self.assertEqual(data["error_counts"], {
+            "email: Invalid email format.": 250,
+            "age: Age must be between 1 and 120.": 250,
+        })
+        self.assertIn(data["error_report"]["report_id"], data["error_report"]["url"])
+
+    def test_report_is_streamed_in_pages(self):
+        url = self.upload(csv_bytes(good=750, bad=250))["error_report"]["url"]
+
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["X-Total-Count"], "250")
+        self.assertEqual(response["X-Page-Count"], "3")
+        lines = body(response).splitlines()
+        self.assertEqual(len(lines), 250)
+        self.assertEqual(json.loads(lines[-1])["row"], 1001)
+
+        response = self.client.get(url, {"page": 3})
+        self.assertEqual([json.loads(line)["row"] for line in body(response).splitlines()], list(range(952, 1002)))
+        self.assertIn('rel="prev"', response["Link"])
+        self.assertNotIn('rel="next"', response["Link"])
+
+        response = self.client.get(url, {"page": 2, "output": "csv"}, HTTP_ACCEPT="text/csv")
+        rows = list(csv.reader(io.StringIO(body(response))))
+        logger.debug(f"CSV page starts with: {rows[:2]}")
+        self.assertEqual(rows[0], ["row", "name", "email", "age"])
+        self.assertEqual(len(rows), 101)
+        self.assertEqual(rows[1], ["852", "", "Invalid email format.", "Age must be between 1 and 120."])
+
+    def test_unknown_report_or_page(self):
+        url = self.upload(csv_bytes(good=750, bad=250))["error_report"]["url"]
+        self.assertEqual(self.client.get(url, {"page": 4}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"output": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(f"/v1/api/upload-reports/{uuid.uuid4()}/").status_code, 404)
+
+    def test_few_errors_stay_inline(self):
+        data = self.upload(csv_bytes(good=100, bad=5))
+        self.assertEqual(len(data["errors"]), 5)
+        self.assertNotIn("error_report", data)
+
+
+@override_settings(UPLOAD_REPORT_DIR=REPORT_DIR)
+class ErrorReportFileTests(SimpleTestCase):
+    def test_failed_import_leaves_no_file(self):
+        report = ErrorReport(inline=1, page_size=10)
+        report.extend([{"row": row, "errors": {"email": "Invalid email format."}} for row in range(2, 5)])
+        path = report_path(report.report_id)
+        self.assertTrue(path.exists())
+        report.discard()
+        self.assertFalse(path.exists())
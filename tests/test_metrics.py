@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+import fakeredis
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from core import metrics
+from core.metrics import Registry, collect_all, merge, registry, render, snapshot_name
+from core.middlewares.rate_limit_backends import REDIS_SECONDS, AtomicRateLimitBackend
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+HOST = socket.gethostname()
+
+
+class RegistryTests(SimpleTestCase):
+    def test_counter_adds_up_threads(self):
+        counter = Registry().counter("hits", "test", ("result",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(result="allowed")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc(5, result="blocked")
+        self.assertEqual(counter.collect(), {("allowed",): [4000], ("blocked",): [5]})
+
+    def test_shards_of_finished_threads_are_retired(self):
+        histogram = Registry().histogram("latency", "test", buckets=(1,))
+        for _ in range(50):
+            thread = threading.Thread(target=histogram.observe, args=(0.5,))
+            thread.start()
+            thread.join()
+        self.assertEqual(len(histogram._shards), 0)
+        self.assertEqual(histogram.collect(), {(): [50, 0, 25.0]})
+
+    def test_render_prometheus_text(self):
+        metrics = Registry()
+        metrics.counter("hits", "Hits.", ("result",)).inc(result='say "hi"')
+        histogram = metrics.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+        text = render(metrics.snapshot())
+        logger.debug(text)
+        self.assertIn("# TYPE hits_total counter\n", text)
+        self.assertIn('hits_total{result="say \\"hi\\""} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3\n', text)
+        self.assertIn("latency_seconds_sum 5.55\n", text)
+        self.assertIn("latency_seconds_count 3\n", text)
+
+    def test_snapshots_of_workers_are_merged(self):
+        worker = Registry()
+        worker.counter("hits", "Hits.", ("result",)).inc(2, result="allowed")
+        other = Registry()
+        other.counter("hits", "Hits.", ("result",)).inc(3, result="allowed")
+        other.counter("hits", "Hits.", ("result",)).inc(result="blocked")
+        merged = merge([worker.snapshot(), json.loads(json.dumps(other.snapshot()))])
+        self.assertEqual(sorted(merged["hits"]["series"]), [[["allowed"], [5]], [["blocked"], [1]]])
+
+    def test_collect_all_reads_other_workers(self):
+        other = Registry()
+        other.counter("other_worker_hits", "Hits.").inc(7)
+        with tempfile.TemporaryDirectory() as tmp:
+            other.flush(tmp)
+            os.replace(os.path.join(tmp, snapshot_name()), os.path.join(tmp, f"{HOST}_{os.getppid()}_0.json"))
+            registry.flush(tmp)  # this process's own file is ignored in favour of its live values
+            merged = collect_all(tmp)
+        self.assertEqual(merged["other_worker_hits"]["series"], [[[], [7]]])
+
+    def test_flush_is_written_off_the_calling_thread(self):
+        written_on = []
+        with tempfile.TemporaryDirectory() as tmp, override_settings(METRICS_DIR=tmp, METRICS_FLUSH_INTERVAL=5), \
+                patch.object(metrics, "_flushed_at", 0.0), \
+                patch.object(metrics.registry, "flush", side_effect=lambda directory: written_on.append(
+                    threading.current_thread().name)):
+            metrics.flush_if_due(now=100.0).result()
+            self.assertIsNone(metrics.flush_if_due(now=104.0))
+        self.assertEqual(len(written_on), 1)
+        self.assertTrue(written_on[0].startswith("metrics-flush"))
+
+    def test_snapshots_of_gone_workers_are_retired(self):
+        other = Registry()
+        other.counter("gone_worker_hits", "Hits.").inc(7)
+        with tempfile.TemporaryDirectory() as tmp:
+            other.flush(tmp)
+            written = os.path.join(tmp, snapshot_name())
+            live = os.path.join(tmp, f"{HOST}_{os.getppid()}_0.json")
+            exited = os.path.join(tmp, f"{HOST}_999999999_0.json")
+            silent = os.path.join(tmp, "other-host_1_0.json")
+            for path in (live, exited, silent):
+                shutil.copy(written, path)
+            os.unlink(written)
+            old = time.time() - 120
+            os.utime(silent, (old, old))
+            os.utime(live, (old, old))  # idle, but still running
+
+            merged = collect_all(tmp, stale_after=60)
+            self.assertEqual(sorted(os.listdir(tmp)), sorted([os.path.basename(live), "retired.json", "retired.lock"]))
+            self.assertEqual(merged["gone_worker_hits"]["series"], [[[], [21]]])
+            self.assertEqual(collect_all(tmp, stale_after=60)["gone_worker_hits"]["series"], [[[], [21]]])
+
+            # the other host's worker was only idle: its new snapshot replaces the retired one
+            other.counter("gone_worker_hits", "Hits.").inc(1)
+            other.flush(tmp)
+            os.replace(written, silent)
+            self.assertEqual(collect_all(tmp, stale_after=60)["gone_worker_hits"]["series"], [[[], [22]]])
+
+    def test_totals_do_not_drop_when_a_worker_exits(self):
+        other = Registry()
+        other.counter("exiting_worker_hits", "Hits.").inc(7)
+        other.histogram("exiting_worker_seconds", "Latency.", buckets=(1,)).observe(0.5)
+        with tempfile.TemporaryDirectory() as tmp:
+            other.flush(tmp)
+            os.replace(os.path.join(tmp, snapshot_name()), os.path.join(tmp, f"{HOST}_4242_0.json"))
+            with patch.object(metrics, "_pid_exists", return_value=True):
+                before = render(collect_all(tmp))
+            with patch.object(metrics, "_pid_exists", return_value=False):
+                after_exit = render(collect_all(tmp))
+            after_next_scrape = render(collect_all(tmp))
+        self.assertEqual(sample(before, "exiting_worker_hits_total"), 7)
+        for text in (after_exit, after_next_scrape):
+            self.assertEqual(sample(text, "exiting_worker_hits_total"), sample(before, "exiting_worker_hits_total"))
+            self.assertEqual(sample(text, "exiting_worker_seconds_count"), 1)
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def scrape(self):
+        with override_settings(METRICS_DIR=self.tmp.name):
+            response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    @override_settings(RATE_LIMIT=100, RATE_LIMIT_POLICIES=[{"match": "upload-file", "limit": 1, "period": 60}])
+    def test_rate_limit_and_upload_metrics(self):
+        before = self.scrape()
+        csv_content = "name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\n"
+        upload = SimpleUploadedFile("test.csv", csv_content.encode("utf-8"), content_type="text/csv")
+        self.client.post("/v1/api/upload-file/", {"csv_file": upload})
+        upload.seek(0)
+        self.client.post("/v1/api/upload-file/", {"csv_file": upload})
+        after = self.scrape()
+
+        def delta(line_start):
+            return sample(after, line_start) - sample(before, line_start)
+
+        self.assertEqual(delta('rate_limit_requests_total{policy="upload-file",result="allowed"}'), 1)
+        self.assertEqual(delta('rate_limit_requests_total{policy="upload-file",result="blocked"}'), 1)
+        self.assertEqual(delta('upload_rows_total{result="imported"}'), 1)
+        self.assertEqual(delta('upload_rows_total{result="failed"}'), 1)
+        self.assertEqual(delta('upload_size_bytes_count{source="form"}'), 1)
+        self.assertEqual(delta('upload_size_bytes_sum{source="form"}'), len(csv_content))
+
+    def test_redis_latency_is_observed(self):
+        def calls():
+            series = REDIS_SECONDS.collect().get(("AtomicRateLimitBackend",))
+            return sum(series[:-1]) if series else 0
+
+        backend = AtomicRateLimitBackend(client=fakeredis.FakeRedis())
+        before = calls()
+        backend.hit("metrics-test", 10, 60)
+        self.assertEqual(calls(), before + 1)
+        self.assertIn('rate_limit_redis_seconds_bucket{backend="AtomicRateLimitBackend",le="0.0005"}', self.scrape())
+
+    def test_per_request_log_line_is_debug(self):
+        with self.assertLogs("core.middlewares.rate_limiting_middleware", level="DEBUG") as logs:
+            self.client.get("/metrics")
+        self.assertTrue(all(record.levelno == logging.DEBUG for record in logs.records))
@@ -0,0 +1,84 @@
+import logging
+import random
+from django.test import TestCase, Client, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from api.v1.services.prevalidation import prevalidate
+from models.models import User
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+
+def csv_bytes(good, bad):
+    rows = [f"User {i},user{i}@example.com,30" for i in range(good)]
+    rows += [f"Broken {i},not-an-email,abc" for i in range(bad)]
+    return ("name,email,age\n" + "\n".join(rows) + "\n").encode("utf-8")
+
+
+class PrevalidationTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def post(self, content, **fields):
+        upload = SimpleUploadedFile("test.csv", content, content_type="text/csv")
+        return self.client.post("/v1/api/upload-file/", {"csv_file": upload, **fields})
+
+    def test_mostly_broken_file_is_rejected_from_a_sample(self):
+        response = self.post(csv_bytes(good=500, bad=9500))
+        logger.debug(f"Rejection: {response.json()['errors']}")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("sampled rows are invalid", response.json()["errors"]["non_field_errors"])
+        data = response.json()["data"]
+        self.assertGreater(data["error_rate"], 0.5)
+        self.assertLessEqual(len(data["errors"]), 20)
+        self.assertIn("email: Invalid email format.", data["error_counts"])
+        self.assertEqual(User.objects.count(), 0)
+
+    @override_settings(PREVALIDATION_HEAD_ROWS=100)
+    def test_sampled_errors_point_at_their_offset(self):
+        content = csv_bytes(good=100, bad=9900)
+        response = self.post(content)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["data"]["errors"]
+        self.assertTrue(errors)
+        for error in errors:
+            self.assertTrue(content[error["offset"]:].startswith(b"Broken "), error)
+
+    def test_mostly_valid_file_is_imported(self):
+        response = self.post(csv_bytes(good=900, bad=100))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["failed_records"], 100)
+        self.assertEqual(User.objects.count(), 900)
+
+    def test_dry_run_validates_everything_and_writes_nothing(self):
+        User.objects.create(name="Existing", email="user0@example.com", age=40)
+        content = csv_bytes(good=50, bad=950)
+        response = self.post(content, dry_run="true", upsert="true")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["message"], "File validated, nothing was saved.")
+        data = response.json()["data"]
+        self.assertEqual(data["failed_records"], 950)
+        self.assertEqual(data["saved_records"], 50)
+        self.assertEqual(data["updated_records"], 1)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(User.objects.get().name, "Existing")
+
+        # the dry run's result is not replayed for the real upload, which pre-validation rejects
+        self.assertEqual(self.post(content, upsert="true").status_code, 400)
+
+    def test_prevalidate_checks_head_and_sample(self):
+        upload = SimpleUploadedFile("test.csv", csv_bytes(good=2000, bad=2000))
+        report = prevalidate(upload, head_rows=500, sample_rows=500, rng=random.Random(1))
+        self.assertIn("offset", report.errors[0])  # the first 500 rows are valid
+        self.assertGreater(report.rows, 900)
+        self.assertAlmostEqual(report.invalid / (report.rows - 500), 0.5, delta=0.1)
+        self.assertEqual(upload.tell(), 0)
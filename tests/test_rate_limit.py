@@ -1,9 +1,21 @@
 import io
 import logging
-from django.test import TestCase, Client, override_settings
+from unittest.mock import patch
+import fakeredis
+from django.test import RequestFactory, SimpleTestCase, TestCase, Client, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 from django.conf import settings
+from core.middlewares.local_limiter import LocalRateLimiter
+from core.middlewares.rate_limit_backends import (
+    AtomicRateLimitBackend,
+    CacheRateLimitBackend,
+    RateLimitResult,
+    SlidingLogBackend,
+    SlidingWindowCounterBackend,
+    TokenBucketBackend,
+)
+from core.middlewares.rate_limit_policies import PolicyTable, RateLimitPolicy
 
 # Configure logger for test module
 logger = logging.getLogger(__name__)
@@ -61,3 +73,241 @@ class RateLimitMiddlewareTests(TestCase):
 
         self.assertEqual(response.status_code, 429)
         self.assertIn("Rate limit exceeded", response.content.decode())
+
+
+class AtomicRateLimitBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.backend = AtomicRateLimitBackend(client=self.redis)
+
+    def test_counts_and_sets_window_on_first_hit(self):
+        first = self.backend.hit("rate-limit-1.2.3.4", 2, 60)
+        second = self.backend.hit("rate-limit-1.2.3.4", 2, 60)
+        third = self.backend.hit("rate-limit-1.2.3.4", 2, 60)
+        logger.debug(f"Counts: {first.count}, {second.count}, {third.count}")
+
+        self.assertEqual((first.count, first.remaining, first.allowed), (1, 1, True))
+        self.assertEqual((second.count, second.remaining, second.allowed), (2, 0, True))
+        self.assertEqual((third.count, third.remaining, third.allowed), (3, 0, False))
+        self.assertTrue(0 < third.retry_after <= 60)
+
+    def test_single_round_trip_per_hit(self):
+        self.backend.hit("rate-limit-1.2.3.4", 5, 60)  # loads the script
+        with patch.object(self.redis, "execute_command", wraps=self.redis.execute_command) as execute:
+            self.backend.hit("rate-limit-1.2.3.4", 5, 60)
+        self.assertEqual(execute.call_count, 1)
+        self.assertEqual(execute.call_args[0][0], "EVALSHA")
+
+    def test_repairs_key_without_expiry(self):
+        self.redis.set(cache.make_key("rate-limit-1.2.3.4"), 7)
+        result = self.backend.hit("rate-limit-1.2.3.4", 5, 60)
+        self.assertEqual(result.count, 8)
+        self.assertEqual(result.retry_after, 60)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimitAlgorithmTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.clock = FakeClock()
+
+    def hits(self, backend, count, limit=3, window=60):
+        return [backend.hit("rate-limit-1.2.3.4", limit, window) for _ in range(count)]
+
+    def test_sliding_window_counter_weights_previous_window(self):
+        backend = SlidingWindowCounterBackend(client=self.redis, clock=self.clock)
+        self.clock.now = 1000 * 60 + 50  # late in a window
+        self.assertTrue(all(result.allowed for result in self.hits(backend, 3)))
+
+        self.clock.now = 1001 * 60 + 15  # a quarter into the next window
+        result = self.hits(backend, 1)[0]
+        logger.debug(f"Sliding counter after boundary: {result.count}")
+        self.assertEqual(result.count, 3)  # floor(3 * 0.75) + 1
+        self.assertTrue(result.allowed)
+        self.assertFalse(self.hits(backend, 1)[0].allowed)
+        self.assertEqual(result.retry_after, 45)
+
+    def test_sliding_log_is_exact(self):
+        backend = SlidingLogBackend(client=self.redis, clock=self.clock)
+        results = self.hits(backend, 4)
+        self.assertEqual([result.allowed for result in results], [True, True, True, False])
+        self.assertEqual(results[-1].retry_after, 60)
+
+        self.clock.now += 61
+        result = self.hits(backend, 1)[0]
+        self.assertTrue(result.allowed)
+        self.assertEqual(result.remaining, 2)
+
+    def test_token_bucket_refills_gradually(self):
+        backend = TokenBucketBackend(client=self.redis, clock=self.clock)
+        results = self.hits(backend, 4)
+        self.assertEqual([result.remaining for result in results], [2, 1, 0, 0])
+        self.assertFalse(results[-1].allowed)
+        self.assertEqual(results[-1].retry_after, 20)  # one token every 20 seconds
+
+        self.clock.now += 20
+        self.assertTrue(self.hits(backend, 1)[0].allowed)
+        self.assertFalse(self.hits(backend, 1)[0].allowed)
+
+    def test_each_algorithm_costs_one_round_trip(self):
+        for backend_class in (SlidingWindowCounterBackend, SlidingLogBackend, TokenBucketBackend):
+            self.redis.flushdb()
+            backend = backend_class(client=self.redis, clock=self.clock)
+            self.hits(backend, 1)  # loads the script
+            with patch.object(self.redis, "execute_command", wraps=self.redis.execute_command) as execute:
+                self.hits(backend, 1)
+            self.assertEqual(execute.call_count, 1, backend_class.__name__)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CacheRateLimitBackendTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.backend = CacheRateLimitBackend(clock=self.clock)
+
+    def test_counts_without_ttl_support(self):
+        self.assertFalse(hasattr(cache, "ttl"))
+        results = [self.backend.hit("rate-limit-1.2.3.4", 2, 60) for _ in range(3)]
+        self.assertEqual([(r.count, r.allowed) for r in results], [(1, True), (2, True), (3, False)])
+        self.assertEqual(results[0].retry_after, 60)
+
+        self.clock.now += 45
+        self.assertEqual(self.backend.hit("rate-limit-1.2.3.4", 2, 60).retry_after, 15)
+
+
+class CountingBackend:
+    """Fixed window stand-in that records every call that would reach Redis."""
+
+    def __init__(self):
+        self.count = 0
+        self.calls = []
+
+    def hit(self, key, limit, window, cost=1):
+        self.calls.append(cost)
+        self.count += cost
+        return RateLimitResult(self.count, limit, window)
+
+
+class LocalRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = CountingBackend()
+
+    def test_blocked_client_is_rejected_without_backend(self):
+        limiter = LocalRateLimiter(self.backend, clock=self.clock)
+        results = [limiter.hit("rate-limit-1.2.3.4", 2, 60) for _ in range(10)]
+        self.assertEqual([result.allowed for result in results], [True, True] + [False] * 8)
+        self.assertEqual(len(self.backend.calls), 3)
+        self.assertEqual(results[-1].retry_after, 60)
+
+        self.clock.now += 61
+        limiter.hit("rate-limit-1.2.3.4", 2, 60)
+        self.assertEqual(len(self.backend.calls), 4)
+
+    def test_batches_hits_within_drift_bound(self):
+        limiter = LocalRateLimiter(self.backend, batch_size=5, sync_interval=10, clock=self.clock)
+        results = [limiter.hit("rate-limit-1.2.3.4", 100, 60) for _ in range(11)]
+        self.assertTrue(all(result.allowed for result in results))
+        self.assertEqual(self.backend.calls, [1, 5, 5])
+        self.assertEqual(results[-1].count, 11)
+
+    def test_syncs_every_hit_near_the_limit(self):
+        limiter = LocalRateLimiter(self.backend, batch_size=5, sync_interval=10, clock=self.clock)
+        results = [limiter.hit("rate-limit-1.2.3.4", 6, 60) for _ in range(8)]
+        self.assertEqual([result.allowed for result in results], [True] * 6 + [False] * 2)
+        self.assertEqual(self.backend.count, 7)
+
+    def test_lru_is_bounded(self):
+        limiter = LocalRateLimiter(self.backend, max_entries=2, clock=self.clock)
+        for ip in ("1", "2", "3"):
+            limiter.hit(f"rate-limit-{ip}", 0, 60)
+        self.assertEqual(list(limiter._blocked), ["rate-limit-2", "rate-limit-3"])
+
+
+class RateLimitPolicyTests(SimpleTestCase):
+    def setUp(self):
+        self.table = PolicyTable(
+            [
+                {"match": "upload-job", "limit": 50, "period": 60},
+                {"match": ["upload-file"], "limit": 5, "period": 60, "cost_per_mb": 2, "key": "api_key",
+                 "valid_api_key": lambda api_key: api_key == "secret"},
+                {"match": "/admin/", "limit": 300, "period": 60, "key": "user"},
+            ],
+            default=RateLimitPolicy(None, 100, 300),
+        )
+
+    def test_matches_url_names_and_prefixes(self):
+        self.assertEqual(self.table.match("/v1/api/upload-file/").name, "upload-file")
+        self.assertEqual(
+            self.table.match("/v1/api/upload-jobs/00000000-0000-0000-0000-000000000000/").name, "upload-job"
+        )
+        self.assertEqual(self.table.match("/admin/models/user/").name, "/admin/")
+        self.assertIsNone(self.table.match("/v1/api/upload-file/extra").name)
+        self.assertEqual(self.table.match("/elsewhere/").limit, 100)
+
+    def test_default_policy_keeps_ip_key(self):
+        policy = self.table.match("/elsewhere/")
+        self.assertEqual(policy.cache_key("1.2.3.4"), "rate-limit-1.2.3.4")
+
+    def test_cost_grows_with_body_size_and_is_capped(self):
+        policy = self.table.match("/v1/api/upload-file/")
+        factory = RequestFactory()
+        small = factory.post("/v1/api/upload-file/", data=b"x" * 10, content_type="text/csv")
+        large = factory.post("/v1/api/upload-file/", data=b"x" * (3 * 1024 * 1024), content_type="text/csv")
+        self.assertEqual(policy.cost_for(small), 3)  # 1 + 1 MB * 2
+        self.assertEqual(policy.cost_for(large), 5)  # capped at the limit
+
+    def test_api_key_gets_its_own_quota(self):
+        policy = self.table.match("/v1/api/upload-file/")
+        factory = RequestFactory()
+        anonymous = factory.post("/v1/api/upload-file/")
+        keyed = factory.post("/v1/api/upload-file/", HTTP_X_API_KEY="secret")
+        self.assertEqual(policy.client_id(anonymous, "1.2.3.4"), "1.2.3.4")
+        self.assertTrue(policy.client_id(keyed, "1.2.3.4").startswith("key-"))
+        unknown = factory.post("/v1/api/upload-file/", HTTP_X_API_KEY="made-up")
+        self.assertEqual(policy.client_id(unknown, "1.2.3.4"), "1.2.3.4")
+
+    @override_settings(RATE_LIMIT_API_KEYS=["secret"])
+    def test_api_keys_come_from_settings(self):
+        policy = RateLimitPolicy("uploads", 5, 60, key="api_key")
+        self.assertTrue(policy.valid_api_key("secret"))
+        self.assertFalse(policy.valid_api_key("other"))
+
+
+class RateLimitPolicyMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    @override_settings(RATE_LIMIT=100, RATE_LIMIT_POLICIES=[{"match": "upload-file", "limit": 1, "period": 60}])
+    def test_route_policy_is_enforced_separately(self):
+        csv_file = SimpleUploadedFile("test.csv", b"name,email,age\nTest,test@example.com,25\n", content_type="text/csv")
+        response = self.client.post('/v1/api/upload-file/', {"csv_file": csv_file})
+        self.assertEqual(response["X-RateLimit-Limit"], "1")
+
+        csv_file = SimpleUploadedFile("test.csv", b"name,email,age\nTest,test@example.com,25\n", content_type="text/csv")
+        response = self.client.post('/v1/api/upload-file/', {"csv_file": csv_file})
+        self.assertEqual(response.status_code, 429)
+
+        response = self.client.get('/v1/api/upload-jobs/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response["X-RateLimit-Limit"], "100")
+
+    @override_settings(
+        RATE_LIMIT=100, RATE_LIMIT_API_KEYS=["secret"],
+        RATE_LIMIT_POLICIES=[{"match": "upload-job", "limit": 2, "period": 60, "key": "api_key"}],
+    )
+    def test_rotating_unknown_api_keys_does_not_reset_the_count(self):
+        url = '/v1/api/upload-jobs/00000000-0000-0000-0000-000000000000/'
+        for api_key in ("made-up-1", "made-up-2"):
+            self.assertEqual(self.client.get(url, HTTP_X_API_KEY=api_key).status_code, 404)
+        self.assertEqual(self.client.get(url, HTTP_X_API_KEY="made-up-3").status_code, 429)
+        self.assertEqual(self.client.get(url, HTTP_X_API_KEY="secret").status_code, 404)
@@ -0,0 +1,95 @@
+import datetime
+import io
+import json
+import logging
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+import numpy as np
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from core import renderers
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+PAYLOAD = {
+    "success": True,
+    "message": _("File uploaded successfully."),
+    "data": {
+        "report_id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "created": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "ratio": Decimal("0.25"),
+        "rows": np.int64(3),
+        "errors": [{"row": 2, "errors": {"name": "Zoë\u2028"}}],
+        1: "non-string key",
+    },
+}
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_json_renderer(self):
+        expected = JSONRenderer().render(PAYLOAD)
+        rendered = FastJSONRenderer().render(PAYLOAD)
+        logger.debug(f"Rendered: {rendered}")
+        self.assertEqual(rendered, expected)
+        self.assertIn(b"\\u2028", rendered)
+
+    def test_indented_output_uses_json_renderer(self):
+        rendered = FastJSONRenderer().render({"a": [1]}, "application/json; indent=2")
+        self.assertEqual(rendered, b'{\n  "a": [\n    1\n  ]\n}')
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO(b'{"name": "Zo\xc3\xab"}')), {"name": "Zoë"})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"age": NaN}'))
+        with self.assertRaises(ParseError):
+            JSONParser().parse(io.BytesIO(b'{"age": NaN}'))
+
+
+class StdlibFallbackTests(SimpleTestCase):
+    def test_without_orjson(self):
+        with patch.object(renderers, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+            self.assertEqual(renderers.loads(renderers.dumps({"age": 3})), {"age": 3})
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"age": 3}')), {"age": 3})
+
+
+class JSONResponseTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_api_parses_and_renders_json(self):
+        response = self.client.post("/v1/api/uploads/", data=json.dumps({"filename": "test.csv"}),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("size", response.json()["errors"])
+
+        response = self.client.post("/v1/api/uploads/", data=b"{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("JSON parse error", response.json()["detail"])
+
+    @override_settings(RATE_LIMIT=1, RATE_LIMIT_LOCAL_CACHE_SIZE=0)
+    def test_rate_limited_body(self):
+        self.client.get("/v1/api/upload-file/")
+        response = self.client.get("/v1/api/upload-file/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json(), {"success": False, "message": "Rate limit exceeded. Try again later."})
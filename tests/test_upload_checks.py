@@ -0,0 +1,84 @@
+import gzip
+import logging
+from unittest import skipIf
+from unittest.mock import patch
+from django.test import SimpleTestCase, TestCase, Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from api.v1.services import upload_checks
+from api.v1.services.fingerprint import HashingUploadHandler
+from api.v1.services.upload_checks import EarlyRejectUploadHandler, UploadRejected, check_head
+from core.constants import MAX_FILE_SIZE
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+REQUIRED = ("name", "email", "age")
+
+
+class EarlyRejectUploadTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def post(self, name, content):
+        return self.client.post("/v1/api/upload-file/", {"csv_file": SimpleUploadedFile(name, content)})
+
+    def test_bad_header_is_rejected_on_the_first_chunk(self):
+        content = b"name,mail,age\n" + b"Alice,alice@example.com,25\n" * 100_000
+        with patch.object(HashingUploadHandler, "receive_data_chunk", autospec=True,
+                          side_effect=lambda self, raw_data, start: raw_data) as later_handler:
+            response = self.post("test.csv", content)
+        logger.debug(f"Rejected upload response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("must contain the following columns", response.json()["errors"]["non_field_errors"])
+        self.assertEqual(later_handler.call_count, 0)
+
+    @skipIf(upload_checks.magic is None, "libmagic is not available")
+    def test_content_type_must_match_extension(self):
+        response = self.post("test.csv", b"\x89PNG\r\n\x1a\n" + b"\x00" * 4096)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("are not supported", response.json()["errors"]["csv_file"])
+
+        response = self.post("test.csv.gz", b"name,email,age\nAlice,alice@example.com,25\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("text/plain", response.json()["errors"]["csv_file"])
+
+    def test_disallowed_extension_is_rejected_before_reading(self):
+        with patch.object(upload_checks, "check_head") as check:
+            response = self.post("test.exe", b"name,email,age\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('"exe" is not allowed', response.json()["errors"]["csv_file"])
+        check.assert_not_called()
+
+    def test_valid_uploads_pass_through(self):
+        csv_content = b"name,email,age\nAlice,alice@example.com,25\n"
+        self.assertEqual(self.post("test.csv", csv_content).status_code, 200)
+        self.assertEqual(self.post("other.csv.gz", gzip.compress(csv_content.replace(b"alice", b"bob"))).status_code, 200)
+
+
+class CheckHeadTests(SimpleTestCase):
+    def test_columnar_signatures(self):
+        check_head("data.parquet", b"PAR1\x15\x04", REQUIRED)
+        check_head("data.arrow", b"ARROW1\x00\x00", REQUIRED)
+        with self.assertRaises(UploadRejected) as raised:
+            check_head("data.parquet", b"name,email,age\n", REQUIRED)
+        self.assertEqual(raised.exception.reason, "type")
+
+    def test_incomplete_header_row_is_left_to_the_serializer(self):
+        check_head("data.csv", b"name,mail,a", REQUIRED)
+        with self.assertRaises(UploadRejected):
+            check_head("data.csv", b"name,mail,age\n", REQUIRED)
+
+    def test_declared_request_size(self):
+        upload_handler = EarlyRejectUploadHandler(None, "csv_file", REQUIRED)
+        with self.assertRaises(UploadRejected) as raised:
+            upload_handler.handle_raw_input(None, {}, MAX_FILE_SIZE * 2, b"boundary")
+        self.assertEqual(raised.exception.reason, "size")
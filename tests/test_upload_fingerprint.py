@@ -0,0 +1,133 @@
+import hashlib
+import logging
+from unittest.mock import patch
+from django.test import TestCase, Client, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.cache import cache
+from models.models import User
+from api.v1.services import spooled
+from api.v1.services.parsing import read_csv_chunks
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+CSV_CONTENT = "name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\n"
+
+
+class UploadFingerprintTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        logger.info("Cache cleared before test run")
+
+    def post(self, content, data=None, **extra):
+        upload = SimpleUploadedFile("test.csv", content.encode("utf-8"), content_type="text/csv")
+        return self.client.post('/v1/api/upload-file/', {"csv_file": upload, **(data or {})}, **extra)
+
+    def test_identical_upload_replays_result(self):
+        first = self.post(CSV_CONTENT)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", first.headers)
+
+        with patch("api.v1.serializers.uploader.import_csv") as import_csv:
+            second = self.post(CSV_CONTENT)
+        logger.debug(f"Replayed response: {second.content.decode()}")
+        import_csv.assert_not_called()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second.json()["data"]["saved_records"], 1)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_different_content_or_options_is_imported(self):
+        self.post(CSV_CONTENT)
+        response = self.post(CSV_CONTENT.replace("25", "26"))
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(response.json()["data"]["skipped_duplicates"], 1)
+
+        response = self.post(CSV_CONTENT, data={"upsert": "true"})
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+
+    def test_idempotency_key_replays_the_same_upload(self):
+        first = self.post(CSV_CONTENT, HTTP_IDEMPOTENCY_KEY="retry-1")
+        second = self.post(CSV_CONTENT, HTTP_IDEMPOTENCY_KEY="retry-1")
+        self.assertEqual(second.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(second.json(), first.json())
+
+    def test_reused_idempotency_key_with_another_upload_is_rejected(self):
+        self.post(CSV_CONTENT, data={"dry_run": "true"}, HTTP_IDEMPOTENCY_KEY="retry-1")
+        response = self.post(CSV_CONTENT, HTTP_IDEMPOTENCY_KEY="retry-1")
+        logger.debug(f"Reused key response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("Idempotency-Key", response.json()["message"])
+
+        response = self.post(CSV_CONTENT.replace("Alice", "Alicia"), HTTP_IDEMPOTENCY_KEY="retry-1")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_results_are_not_shared_between_clients(self):
+        first = self.post(CSV_CONTENT, HTTP_IDEMPOTENCY_KEY="retry-1", REMOTE_ADDR="10.0.0.1")
+        other = self.post(CSV_CONTENT.replace("25", "26"), HTTP_IDEMPOTENCY_KEY="retry-1", REMOTE_ADDR="10.0.0.2")
+        self.assertNotIn("Idempotent-Replayed", other.headers)
+        self.assertEqual(other.json()["data"]["skipped_duplicates"], 1)
+
+        response = self.post(CSV_CONTENT, REMOTE_ADDR="10.0.0.2")
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(self.post(CSV_CONTENT, REMOTE_ADDR="10.0.0.1").json(), first.json())
+
+    def test_failed_uploads_are_not_cached(self):
+        self.post("name,email\nA,a@b.com\n")
+        response = self.post("name,email\nA,a@b.com\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+
+    @override_settings(UPLOAD_RESULT_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        self.post(CSV_CONTENT)
+        response = self.post(CSV_CONTENT)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(response.json()["data"]["saved_records"], 0)
+
+
+class SpooledUploadTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def spooled(self, content):
+        upload = TemporaryUploadedFile("test.csv", "text/csv", len(content), None)
+        upload.write(content)
+        upload.seek(0)
+        self.addCleanup(upload.close)
+        return upload
+
+    def test_sha256_is_the_same_for_every_kind_of_upload(self):
+        content = CSV_CONTENT.encode()
+        expected = hashlib.sha256(content).hexdigest()
+        self.assertEqual(spooled.sha256(SimpleUploadedFile("test.csv", content)), expected)
+        self.assertEqual(spooled.sha256(self.spooled(content)), expected)
+
+    def test_in_memory_upload_is_not_copied(self):
+        upload = SimpleUploadedFile("test.csv", CSV_CONTENT.encode())
+        self.assertIs(spooled.memory_bytes(upload), spooled.memory_bytes(upload))
+        self.assertIsNone(spooled.memory_bytes(self.spooled(b"x")))
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_spooled_upload_is_parsed_from_its_path(self):
+        with patch("api.v1.services.importer.read_csv_chunks", wraps=read_csv_chunks) as parse:
+            response = self.client.post('/v1/api/upload-file/', {
+                "csv_file": SimpleUploadedFile("test.csv", CSV_CONTENT.encode(), content_type="text/csv"),
+            })
+        logger.debug(f"Spooled upload response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["saved_records"], 1)
+        source = parse.call_args.args[0]
+        self.assertIsInstance(source, str)
+        self.assertTrue(source.endswith(".upload.csv"))
@@ -0,0 +1,74 @@
+import logging
+from concurrent.futures import Future
+from unittest.mock import patch
+from django.test import TestCase, Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from models.models import User
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+
+class InlineExecutor:
+    """Runs submitted jobs immediately so the test database sees their writes."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+@patch("api.v1.services.jobs.get_executor", InlineExecutor)
+@patch("api.v1.services.jobs.connections.close_all", lambda: None)
+class UploadJobTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        logger.info("Cache cleared before test run")
+
+    def get_file(self, content):
+        return SimpleUploadedFile("test.csv", content.encode("utf-8"), content_type="text/csv")
+
+    def test_async_upload_reports_final_summary(self):
+        csv_content = "name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\n"
+        response = self.client.post('/v1/api/upload-file/?async=true', {"csv_file": self.get_file(csv_content)})
+        logger.debug(f"Submit response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["data"]["job_id"]
+
+        response = self.client.get(response.json()["data"]["status_url"])
+        logger.debug(f"Job response: {response.content.decode()}")
+        self.assertEqual(response.status_code, 200)
+        job = response.json()["data"]
+        self.assertEqual(job["job_id"], job_id)
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["rows_processed"], 2)
+        self.assertEqual(job["saved_records"], 1)
+        self.assertEqual(job["failed_records"], 1)
+        self.assertEqual(job["result"], {
+            "saved_records": 1,
+            "updated_records": 0,
+            "conflicting_records": 0,
+            "failed_records": 1,
+            "skipped_duplicates": 0,
+            "errors": [{"row": 3, "errors": {"email": "Invalid email format."}}],
+            "error_counts": {"email: Invalid email format.": 1},
+        })
+        self.assertIn("insert", job["timings"])
+        self.assertTrue(User.objects.filter(email="alice@example.com").exists())
+
+    def test_async_upload_still_validates_header(self):
+        response = self.client.post('/v1/api/upload-file/?async=true', {"csv_file": self.get_file("name,email\nA,a@b.com\n")})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_job(self):
+        response = self.client.get('/v1/api/upload-jobs/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
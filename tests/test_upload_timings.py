@@ -0,0 +1,82 @@
+import logging
+from unittest.mock import patch
+from django.test import TestCase, Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from api.v1.services.timing import UPLOAD_STAGE_SECONDS, UploadTimer
+from core.metrics import Histogram
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+CSV_CONTENT = "name,email,age\nAlice,alice@example.com,25\nBob,bademail,30\n"
+STAGES = ["multipart", "header", "prevalidate", "parse", "duplicates", "validate", "insert"]
+
+
+def stage_count(stage):
+    series = UPLOAD_STAGE_SECONDS.collect().get((stage,))
+    return sum(series[:-1]) if series else 0
+
+
+class UploadTimingTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def post(self, url='/v1/api/upload-file/'):
+        upload = SimpleUploadedFile("test.csv", CSV_CONTENT.encode("utf-8"), content_type="text/csv")
+        return self.client.post(url, {"csv_file": upload})
+
+    def test_server_timing_header_and_timings_block(self):
+        parsed_before = stage_count("parse")
+        response = self.post('/v1/api/upload-file/?timings=true')
+        logger.debug(f"Server-Timing: {response.headers['Server-Timing']}")
+        self.assertEqual(response.status_code, 200)
+
+        timings = response.json()["timings"]
+        for stage in STAGES:
+            self.assertIn(stage, timings)
+            self.assertIn(f"{stage};dur=", response.headers["Server-Timing"])
+        self.assertGreater(timings["queries"], 0)
+        self.assertIn(f'db;desc="{timings["queries"]} queries"', response.headers["Server-Timing"])
+        self.assertAlmostEqual(timings["total"], sum(timings[stage] for stage in STAGES), delta=0.5)
+        self.assertEqual(stage_count("parse"), parsed_before + 1)
+
+    def test_timings_block_is_opt_in(self):
+        response = self.post()
+        self.assertNotIn("timings", response.json())
+        self.assertIn("Server-Timing", response.headers)
+
+    def test_failed_upload_is_timed_too(self):
+        upload = SimpleUploadedFile("test.csv", b"name,email\nA,a@b.com\n", content_type="text/csv")
+        response = self.client.post('/v1/api/upload-file/', {"csv_file": upload})
+        self.assertEqual(response.status_code, 400)
+        # rejected by the upload handler while the body streams in, before the header stage
+        self.assertIn("multipart;dur=", response.headers["Server-Timing"])
+
+
+class UploadTimerTests(TestCase):
+    def test_nested_stages_are_exclusive(self):
+        clock = iter([0.0, 1.0, 3.0, 3.5, 10.0, 10.25])
+        timer = UploadTimer()
+        with patch("api.v1.services.timing.time.perf_counter", lambda: next(clock)):
+            with timer.stage("validate"):
+                with timer.stage("duplicates"):
+                    pass
+            with timer.stage("duplicates"):
+                pass
+        self.assertEqual(timer.stages, {"duplicates": 2.25, "validate": 1.5})
+        self.assertEqual(timer.total(), 3.75)
+
+    def test_histogram_buckets(self):
+        histogram = Histogram("test_seconds", "test", ("stage",), buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value, stage="parse")
+        self.assertEqual(histogram.collect(), {("parse",): [2, 1, 1, 5.65]})
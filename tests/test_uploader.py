@@ -1,10 +1,16 @@
 import io
 import logging
+import unittest
 import pandas as pd
-from django.test import TestCase
+from unittest.mock import patch
+from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from models.models import User
 from api.v1.serializers.uploader import FileUploadSerializer
+from api.v1.services.bulk_loader import load_users
+from api.v1.services import parsing
+from api.v1.services.importer import iter_chunks
+from api.v1.services.parallel import check_columns_parallel
 
 # Configure a logger for tests
 logger = logging.getLogger(__name__)
@@ -81,8 +87,25 @@ class FileUploadSerializerTests(TestCase):
         logger.debug(f"Upload result: {result}")
         self.assertEqual(result["saved_records"], 1)
         self.assertEqual(result["failed_records"], 0)
+        self.assertEqual(result["skipped_duplicates"], 2)
         self.assertEqual(result["errors"], [])
 
+    def test_duplicate_lookup_is_batched(self):
+        logger.info("Running test_duplicate_lookup_is_batched...")
+        User.objects.bulk_create([
+            User(name=f"Stored{i}", email=f"stored{i}@example.com", age=30) for i in range(5)
+        ])
+        data = [{"name": f"User{i}", "email": f"stored{i}@example.com", "age": 30} for i in range(5)]
+        data.append({"name": "Fresh", "email": "fresh@example.com", "age": 40})
+        file = self.make_csv(data)
+        serializer = FileUploadSerializer(data={"csv_file": file})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with patch("api.v1.services.duplicates.EMAIL_LOOKUP_BATCH_SIZE", 2), self.assertNumQueries(6):  # savepoint + 3 lookup batches + 1 insert + release
+            result = serializer.save()
+        logger.debug(f"Upload result: {result}")
+        self.assertEqual(result["saved_records"], 1)
+        self.assertEqual(result["skipped_duplicates"], 5)
+
     def test_invalid_age(self):
         logger.info("Running test_invalid_age...")
         data = [
@@ -98,3 +121,151 @@ class FileUploadSerializerTests(TestCase):
         self.assertEqual(result["failed_records"], 2)
         self.assertIn("age", result["errors"][0]["errors"])
         self.assertIn("age", result["errors"][1]["errors"])
+
+    def test_error_rows_keep_numbering_and_shape(self):
+        logger.info("Running test_error_rows_keep_numbering_and_shape...")
+        data = [
+            {"name": "Alice", "email": "alice@example.com", "age": 25},
+            {"name": " ", "email": "bademail", "age": 200},
+            {"name": "Bob", "email": "bob@example.com", "age": "abc"},
+            {"name": "Carol", "email": "carol@example.com", "age": None},
+        ]
+        file = self.make_csv(data)
+        serializer = FileUploadSerializer(data={"csv_file": file})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        result = serializer.save()
+        logger.debug(f"Upload result: {result}")
+        self.assertEqual(result["saved_records"], 1)
+        self.assertEqual(result["errors"], [
+            {"row": 3, "errors": {
+                "name": "Name must be a non-empty string.",
+                "email": "Invalid email format.",
+                "age": "Age must be between 1 and 120.",
+            }},
+            {"row": 4, "errors": {"age": "Age must be an integer."}},
+            {"row": 5, "errors": {"age": "Age is required."}},
+        ])
+
+    def test_streams_file_in_chunks(self):
+        logger.info("Running test_streams_file_in_chunks...")
+        data = [
+            {"name": "Alice", "email": "alice@example.com", "age": 25},
+            {"name": "Bob", "email": "bob@example.com", "age": 30},
+            {"name": "Alice2", "email": "alice@example.com", "age": 26},
+            {"name": "Bad", "email": "bademail", "age": 40},
+            {"name": "Carol", "email": "existing@example.com", "age": 22},
+            {"name": "Dave", "email": "dave@example.com", "age": 0},
+        ]
+        file = self.make_csv(data)
+        serializer = FileUploadSerializer(data={"csv_file": file})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with patch("api.v1.services.importer.CSV_CHUNK_SIZE", 2):
+            result = serializer.save()
+        logger.debug(f"Upload result: {result}")
+        self.assertEqual(result["saved_records"], 2)
+        self.assertEqual(result["skipped_duplicates"], 2)
+        self.assertEqual([error["row"] for error in result["errors"]], [5, 7])
+        self.assertTrue(User.objects.filter(email="bob@example.com").exists())
+
+    @override_settings(PARALLEL_VALIDATION_THRESHOLD=2, PARALLEL_VALIDATION_WORKERS=2)
+    def test_parallel_validation_matches_serial(self):
+        logger.info("Running test_parallel_validation_matches_serial...")
+        data = [
+            {"name": "Alice", "email": "alice@example.com", "age": 25},
+            {"name": "", "email": "bob@example.com", "age": 30},
+            {"name": "Carol", "email": "carol@example.com", "age": "abc"},
+            {"name": "Alice2", "email": "alice@example.com", "age": 26},
+            {"name": "Dave", "email": "existing@example.com", "age": 22},
+            {"name": "Erin", "email": "bademail", "age": 40},
+            {"name": "Carol2", "email": "carol@example.com", "age": 33},
+        ]
+        file = self.make_csv(data)
+        serializer = FileUploadSerializer(data={"csv_file": file})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with patch("api.v1.services.parallel.check_columns_parallel", wraps=check_columns_parallel) as parallel:
+            result = serializer.save()
+        logger.debug(f"Upload result: {result}")
+        self.assertTrue(parallel.called)
+        self.assertEqual(result["saved_records"], 1)
+        self.assertEqual(result["skipped_duplicates"], 3)
+        self.assertEqual([error["row"] for error in result["errors"]], [3, 4, 7])
+
+    def test_upsert_updates_existing_users(self):
+        logger.info("Running test_upsert_updates_existing_users...")
+        data = [
+            {"name": "Renamed", "email": "existing@example.com", "age": 41},
+            {"name": "Alice", "email": "alice@example.com", "age": 25},
+            {"name": "Alice2", "email": "alice@example.com", "age": 26},
+        ]
+        file = self.make_csv(data)
+        serializer = FileUploadSerializer(data={"csv_file": file, "upsert": True})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        result = serializer.save()
+        logger.debug(f"Upload result: {result}")
+        self.assertEqual(result["saved_records"], 2)
+        self.assertEqual(result["updated_records"], 1)
+        self.assertEqual(result["skipped_duplicates"], 1)
+        existing = User.objects.get(email="existing@example.com")
+        self.assertEqual((existing.name, existing.age), ("Renamed", 41))
+
+
+class BulkLoaderTests(TestCase):
+    def test_counts_rows_the_database_dropped(self):
+        User.objects.create(name="Existing", email="existing@example.com", age=30)
+        with patch("api.v1.services.bulk_loader.BULK_INSERT_BATCH_SIZE", 2):
+            loaded = load_users(
+                ["Alice", "Racer", "Bob"],
+                ["alice@example.com", "existing@example.com", "bob@example.com"],
+                [25, 40, 30],
+            )
+        self.assertEqual((loaded.inserted, loaded.updated, loaded.conflicts), (2, 0, 1))
+        self.assertEqual(User.objects.get(email="existing@example.com").name, "Existing")
+        self.assertEqual(User.objects.count(), 3)
+
+
+class ParseOptionsTests(TestCase):
+    CSV = (
+        "extra_1,name,email,age,extra_2\n"
+        "x,Alice,alice@example.com,25,y\n"
+        "x,123,bob@example.com,,y\n"
+        "x,Carol,carol@example.com,abc,y\n"
+        "x,Dave,dave@example.com,2.5,y\n"
+    )
+
+    def parse(self, engine, chunk_size):
+        with override_settings(CSV_PARSE_ENGINE=engine):
+            return list(iter_chunks(io.BytesIO(self.CSV.encode()), chunk_size))
+
+    def check_engine(self, engine):
+        chunks = self.parse(engine, 2)
+        for chunk in chunks:
+            self.assertEqual(list(chunk.columns), ["name", "email", "age"])
+        frame = pd.concat(chunks)
+        self.assertEqual(list(frame.index), [0, 1, 2, 3])
+        # names and emails are never type-inferred
+        self.assertEqual(frame["name"].tolist(), ["Alice", "123", "Carol", "Dave"])
+        return chunks
+
+    def test_c_engine_projects_required_columns(self):
+        self.check_engine("c")
+
+    @unittest.skipIf(parsing.pa is None, "pyarrow is not installed")
+    def test_pyarrow_engine_matches_c_engine(self):
+        for arrow, c in zip(self.check_engine("pyarrow"), self.parse("c", 2)):
+            pd.testing.assert_frame_equal(arrow, c)
+
+    @unittest.skipIf(parsing.pa is None, "pyarrow is not installed")
+    def test_auto_engine_handles_rows_with_wrong_field_count(self):
+        content = "name,email,age\n" + "".join(f"User {i},user{i}@example.com,30\n" for i in range(20))
+        content += "Short,short@example.com\nLong,long@example.com,40,extra\nLast,last@example.com,50\n"
+        with override_settings(CSV_PARSE_ENGINE="c"):
+            expected = pd.concat(list(iter_chunks(io.BytesIO(content.encode()), 4)))
+        with override_settings(CSV_PARSE_ENGINE="auto"), patch.object(parsing, "ARROW_BLOCK_SIZE", 256):
+            chunks = list(iter_chunks(io.BytesIO(content.encode()), 4))
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected, check_dtype=False)
+
+        upload = SimpleUploadedFile("test.csv", content.encode(), content_type="text/csv")
+        response = self.client.post("/v1/api/upload-file/", {"csv_file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["errors"], [{"row": 22, "errors": {"age": "Age is required."}}])
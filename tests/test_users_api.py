@@ -0,0 +1,98 @@
+import logging
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from unittest.mock import patch
+from api.v1.services.users import invalidate_user_pages, user_queryset
+from api.v1.views import users as views
+from models.models import User
+
+# Configure logger for test module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("[%(levelname)s] %(name)s - %(message)s")
+handler.setFormatter(formatter)
+if not logger.hasHandlers():
+    logger.addHandler(handler)
+
+URL = "/v1/api/users/"
+
+
+@override_settings(USERS_PAGE_SIZE=100, USERS_MAX_PAGE_SIZE=150)
+class UserListTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        User.objects.bulk_create(
+            User(name=f"User {i}", email=f"user{i}@example.com", age=20 + i % 50) for i in range(250)
+        )
+
+    def get(self, url=URL, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def test_pages_follow_the_id_keyset(self):
+        ids, url, pages = [], URL, 0
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.get(url)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn("COUNT", queries[0]["sql"].upper())
+            ids += [user["id"] for user in data["results"]]
+            url, pages = data["next"], pages + 1
+        logger.debug(f"Last page query: {queries[0]['sql']}")
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, list(User.objects.order_by("id").values_list("id", flat=True)))
+        self.assertIn('"models_user"."id" >', queries[0]["sql"])
+
+        self.assertEqual(len(self.get(page_size=1000)["results"]), 150)
+
+    def test_filters_and_fields(self):
+        data = self.get(age_min=30, age_max=31, fields="email,age")
+        self.assertEqual(len(data["results"]), 10)
+        self.assertTrue(all(set(user) == {"email", "age"} and user["age"] in (30, 31) for user in data["results"]))
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(email="user7@example.com", fields="name")
+        self.assertEqual(data["results"], [{"name": "User 7"}])
+        self.assertNotIn('"models_user"."age"', queries[0]["sql"])
+
+    def test_bad_parameters(self):
+        response = self.client.get(URL, {"fields": "name,password"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json()["errors"])
+        response = self.client.get(URL, {"age_min": 50, "age_max": 20})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(URL, {"cursor": "not-a-cursor"}).status_code, 404)
+
+    def test_pages_are_cached_until_an_import_commits(self):
+        first = self.get()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get(), first)
+        self.assertEqual(len(queries), 0)
+
+        User.objects.filter(id=first["results"][0]["id"]).update(name="Renamed")
+        self.assertEqual(self.get()["results"][0]["name"], "User 0")
+
+        upload = SimpleUploadedFile("test.csv", b"name,email,age\nNew,new@example.com,30\n", content_type="text/csv")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post("/v1/api/upload-file/", {"csv_file": upload}).status_code, 200)
+        self.assertEqual(self.get()["results"][0]["name"], "Renamed")
+
+    def test_page_queried_before_an_import_commits_is_not_cached_as_current(self):
+        def query_then_commit(*args, **kwargs):
+            queryset = user_queryset(*args, **kwargs)
+            list(queryset)  # the page is read ...
+            invalidate_user_pages()  # ... then an import commits before it is cached
+            return queryset
+
+        with patch.object(views, "user_queryset", side_effect=query_then_commit):
+            self.get()
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        self.assertEqual(len(queries), 1)